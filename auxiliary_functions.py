@@ -3,21 +3,45 @@ functions of the program: "slicer" and "run_slicer".
 
 This module contains the following functions:
     * dtm_iterator - returns a list with "asc" files
+    * dtm_open - opens an "asc" file, even if it is compressed
+    * is_compressed - tells whether an "asc" file is compressed
     * parent_dtm_creator - creates an instance of class "ParentDtm"
     * slicer_blueprint - calculates the number of slices along the x
     and y axis
+    * child_dtm_attributes - calculates the size and coordinates of a
+    child file
+    * child_dtm_window - calculates the cells of the parent file covered
+    by a child file with overlap
+    * child_dtm_name - returns the name of a child file
+    * dtm_header - returns the six lines of an "asc" header
+    * stats_printer - prints the processing stats of a parent file
 """
 
 
+import gzip
+import io
 import os
+import time
+import zipfile
 
 from data_objects import ParentDtm
 
 
+# every child file ends with the DOS end-of-file character
+END_OF_FILE = "\x1a"
+
+# extensions of the original files: "asc" files, "asc" files compressed
+# with gzip and zip files with an "asc" file
+DTM_EXTENSIONS = (".asc", ".asc.gz", ".zip")
+
+
 def dtm_iterator(input_path):
     """Iterates over the DTM files of a certain directory. Returns a
     list with the name and extension of each file.
 
+    Compressed files ("NAME.asc.gz" and "NAME.zip") are included too,
+    since "dtm_open" reads them without extracting them.
+
     Parameters
     ----------
     input_path : str
@@ -30,12 +54,64 @@ def dtm_iterator(input_path):
     """
     my_dtms = []
     for entry in os.scandir(input_path):
-        if entry.is_file() and entry.name.split(".")[1] == "asc":
+        if entry.is_file() and entry.name.endswith(DTM_EXTENSIONS):
             my_dtms.append(entry.name)
     return my_dtms
 
 
-def parent_dtm_creator(input_path, file_name):
+def dtm_open(file_path, mode="r"):
+    """Opens an "asc" file to read it from the beginning.
+
+    Files compressed with gzip ("NAME.asc.gz") are decompressed as they
+    are read. For zip files ("NAME.zip"), the first "asc" file they
+    contain is read in the same way. Compressed files can be read from
+    the beginning to the end, but moving backwards with "seek()" makes
+    them be decompressed again from the beginning.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    mode : str
+        "r" to read text or "rb" to read bytes.
+
+    Returns
+    -------
+    file object
+
+    Raises
+    ------
+    ValueError
+        If a zip file does not contain any "asc" file.
+    """
+    if file_path.endswith(".gz"):
+        return gzip.open(file_path, mode="rt" if mode == "r" else mode)
+
+    if file_path.endswith(".zip"):
+        my_zip = zipfile.ZipFile(file_path)
+        try:
+            my_members = [name for name in my_zip.namelist()
+                          if name.lower().endswith(".asc")]
+            if not my_members:
+                raise ValueError("{} does not contain any \"asc\" file".
+                                 format(file_path))
+            # the zip file is really closed once the member is closed
+            my_dtm = my_zip.open(my_members[0])
+        finally:
+            my_zip.close()
+        if mode == "r":
+            return io.TextIOWrapper(my_dtm)
+        return my_dtm
+
+    return open(file=file_path, mode=mode)
+
+
+def is_compressed(file_name):
+    """Returns whether an "asc" file is compressed."""
+    return not file_name.endswith(".asc")
+
+
+def parent_dtm_creator(input_path, file_name, catalog=None):
     """Creates an instance of class "ParentDtm".
 
     Opens an "asc" file, gets its attributes (name, number of columns,
@@ -49,12 +125,25 @@ def parent_dtm_creator(input_path, file_name):
     file_name : str
         The name of the "asc" file that will be use to create the
         instance.
+    catalog : HeaderCatalog instance, optional
+        If given, the attributes are taken from the catalog, and the file
+        is only opened if it is not there or it has changed.
 
     Returns
     -------
     ParentDtm instance
     """
-    my_dtm = open(file=os.path.join(input_path, file_name), mode="r")
+    if catalog is not None:
+        dtm_attributes, data_offset = catalog.header(
+            os.path.join(input_path, file_name))
+        return ParentDtm(name=file_name, n_cols=dtm_attributes[0],
+                         n_rows=dtm_attributes[1], x_coord=dtm_attributes[2],
+                         y_coord=dtm_attributes[3],
+                         cell_size=dtm_attributes[4],
+                         no_data_val=dtm_attributes[5],
+                         data_offset=data_offset)
+
+    my_dtm = dtm_open(os.path.join(input_path, file_name), mode="r")
 
     dtm_attributes = []
     line_counter = 0
@@ -92,3 +181,125 @@ def slicer_blueprint(ParentDtm, x_long, y_long):
         n_sliced_rows = (ParentDtm.get_n_rows() // y_long) + 1
 
     return (n_sliced_cols, n_sliced_rows)
+
+
+def child_dtm_attributes(ParentDtm, x_long, y_long, col, row):
+    """Calculates the number of columns, number of rows and UTM
+    coordinates of a child file.
+
+    The last block column and the top block row might be smaller than
+    "x_long" and "y_long" when the size of the parent file is not a
+    multiple of them.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    col : int
+        The block column of the child file, starting at 1 on the left.
+    row : int
+        The block row of the child file, starting at 1 at the bottom.
+
+    Returns
+    -------
+    tuple
+        Number of columns, number of rows, X and Y coordinates.
+    """
+    n_sliced_cols, n_sliced_rows = slicer_blueprint(ParentDtm, x_long, y_long)
+    last_x_cells = ParentDtm.get_n_cols() % x_long
+    last_y_cells = ParentDtm.get_n_rows() % y_long
+
+    n_cols = x_long
+    if col == n_sliced_cols and last_x_cells != 0:
+        n_cols = last_x_cells
+    n_rows = y_long
+    if row == n_sliced_rows and last_y_cells != 0:
+        n_rows = last_y_cells
+
+    x_coord = ParentDtm.get_x() + ((ParentDtm.get_cell_size() * x_long)
+                                   * (col - 1))
+    y_coord = ParentDtm.get_y() + ((ParentDtm.get_cell_size() * y_long)
+                                   * (row - 1))
+
+    return (n_cols, n_rows, x_coord, y_coord)
+
+
+def child_dtm_window(ParentDtm, x_long, y_long, col, row, overlap=0):
+    """Calculates the cells of the parent file covered by a child file
+    that overlaps its neighbours.
+
+    The child file is enlarged by "overlap" cells on every side, except
+    on the sides of the parent file, and its coordinates are moved to
+    its new lower left cell.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files, without
+        the overlap.
+    y_long : int
+        The maximum number of rows in the new "asc" files, without the
+        overlap.
+    col : int
+        The block column of the child file, starting at 1 on the left.
+    row : int
+        The block row of the child file, starting at 1 at the bottom.
+    overlap : int
+        The number of cells shared with each neighbour.
+
+    Returns
+    -------
+    tuple
+        First column (starting at 0 on the left), number of columns,
+        first row (starting at 0 at the top), number of rows, X and Y
+        coordinates.
+    """
+    n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+        ParentDtm, x_long, y_long, col, row)
+    first_col = (col - 1) * x_long
+    first_row = ParentDtm.get_n_rows() - (row - 1) * y_long - n_rows
+
+    left = max(first_col - overlap, 0)
+    right = min(first_col + n_cols + overlap, ParentDtm.get_n_cols())
+    top = max(first_row - overlap, 0)
+    bottom = min(first_row + n_rows + overlap, ParentDtm.get_n_rows())
+
+    return (left, right - left, top, bottom - top,
+            x_coord - ParentDtm.get_cell_size() * (first_col - left),
+            y_coord - ParentDtm.get_cell_size() * (bottom - first_row
+                                                   - n_rows))
+
+
+def child_dtm_name(ParentDtm, col, row):
+    """Returns the name of a child file ("NAME_col_row.asc"). Child files
+    are never compressed, whatever the extension of the parent file.
+    """
+    return "{}_{}_{}.asc".format(ParentDtm.get_name().split(".")[0], col,
+                                 row)
+
+
+def dtm_header(n_cols, n_rows, x_coord, y_coord, cell_size, no_data_val):
+    """Returns the six lines of an "asc" header as a single string."""
+    return ("NCOLS {}\nNROWS {}\nXLLCENTER {}\nYLLCENTER {}\nCELLSIZE {}\n"
+            "NODATA_VALUE {}\n".format(n_cols, n_rows, x_coord, y_coord,
+                                       cell_size, no_data_val))
+
+
+def stats_printer(ParentDtm, file_size_mb, abs_process_time):
+    """Prints the size and processing time of a parent file."""
+    rel_process_time = abs_process_time / file_size_mb
+    print("")
+    print("    File name: {}".format(ParentDtm.get_name()))
+    print("    File size: {} MB".format(round(file_size_mb, 2)))
+    print("    ABSOLUTE processing time: {} seconds".
+          format(round(abs_process_time, 2)))
+    print("    RELATIVE processing time: {} sec/MB".
+          format(round(rel_process_time, 2)))
+    print("    TIME: {}".format(time.strftime("%H:%M:%S", time.localtime())))
+    print("")
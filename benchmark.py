@@ -0,0 +1,327 @@
+"""This module measures how fast the "asc" files are sliced.
+
+It writes synthetic "asc" files of a given size, type of heights and
+share of cells without data, runs "run_slicer" (with several slicing
+modes and sizes of the new files) and the utilities over them, and
+stores the results in a JSON file, so the speed of different versions of
+the program can be compared.
+
+Every case runs in a new process, so its peak memory (resident set
+size) and its I/O counters (taken from "/proc/self/io" where it exists)
+belong to that case only. The peak memory is None where the "resource"
+module does not exist (Windows).
+
+This module contains the following functions:
+    * dtm_generator - writes a synthetic "asc" file
+    * peak_rss - returns the peak resident set size of the current process
+    * io_counters - returns the I/O counters of the current process
+    * case_runner - runs a single case and measures it
+    * benchmark - runs all the cases and writes the JSON file
+"""
+
+
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    # Windows has no "resource" module
+    resource = None
+
+from auxiliary_functions import dtm_header
+from raster_io import array_formatter
+
+
+# number of rows of a synthetic file that are built at once
+GENERATOR_ROWS = 256
+
+
+def dtm_generator(file_path, n_cols, n_rows, kind="int", no_data_density=0.0,
+                  decimals=3, x_coord=400000, y_coord=4400000, cell_size=5,
+                  no_data_val=-9999, seed=0):
+    """Writes a synthetic "asc" file.
+
+    The heights are random values between 0 and 3000, written as integers
+    or with "decimals" decimals. Cells without data are scattered at
+    random and written as integers, as in most DTM files.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the new "asc" file.
+    n_cols : int
+        The number of columns in the matrix of data.
+    n_rows : int
+        The number of rows in the matrix of data.
+    kind : str
+        "int" for integer heights or "float" for decimal heights.
+    no_data_density : float
+        The share of cells without data, between 0 and 1.
+    decimals : int
+        The number of decimals of the heights when "kind" is "float".
+    x_coord, y_coord : int
+        The UTM coordinates of the cell located at the lower left corner.
+    cell_size : int
+        Length of a cell along the x and y axis in meters.
+    no_data_val : int
+        Value that represents a cell without data.
+    seed : int
+        The seed of the random numbers.
+
+    Returns
+    -------
+    None
+    """
+    if kind not in ("int", "float"):
+        raise ValueError("unknown kind of heights: {}".format(kind))
+    if kind == "int":
+        decimals = 0
+    generator = np.random.default_rng(seed)
+
+    my_dtm = open(file=file_path, mode="wb")
+    my_dtm.write(dtm_header(n_cols, n_rows, x_coord, y_coord, cell_size,
+                            no_data_val).encode("ascii"))
+    for first_row in range(0, n_rows, GENERATOR_ROWS):
+        shape = (min(GENERATOR_ROWS, n_rows - first_row), n_cols)
+        if decimals:
+            block = np.round(generator.uniform(0, 3000, shape), decimals)
+        else:
+            block = generator.integers(0, 3000, shape)
+        block[generator.random(shape) < no_data_density] = no_data_val
+        my_dtm.write(array_formatter(block, decimals,
+                                     no_data_val if decimals else None))
+    my_dtm.close()
+
+
+def peak_rss():
+    """Returns the peak resident set size of the current process in kB,
+    or None if the "resource" module does not exist.
+    """
+    if resource is None:
+        return None
+    peak_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS gives it in bytes
+    if sys.platform == "darwin":
+        peak_rss_kb //= 1024
+
+    return peak_rss_kb
+
+
+def io_counters():
+    """Returns the I/O counters of the current process ("rchar",
+    "wchar", "syscr", "syscw", "read_bytes" and "write_bytes") as a
+    dictionary, or an empty one if "/proc/self/io" does not exist.
+    """
+    my_counters = {}
+    try:
+        my_io = open(file="/proc/self/io", mode="r")
+    except OSError:
+        return my_counters
+    for line in my_io:
+        key, value = line.split(":")
+        my_counters[key] = int(value)
+    my_io.close()
+
+    return my_counters
+
+
+def case_runner(task, input_path, output_path, options):
+    """Runs a single case and measures it.
+
+    Parameters
+    ----------
+    task : str
+        "run_slicer", "features_recorder" or "finder".
+    input_path : str
+        The path that contains the "asc" files.
+    output_path : str
+        The path that will store the results. It is emptied first.
+    options : dict
+        The keyword arguments of "run_slicer" ("x_long", "y_long",
+        "mode"...) or, for "finder", the height that is looked for
+        ("prop").
+
+    Returns
+    -------
+    dict
+        The processing time in seconds, the number of files created, the
+        peak resident set size in kB (and the one before running the
+        case, both None if it cannot be measured) and the I/O counters
+        of the case.
+    """
+    # the modules of the program are imported here so that they are not
+    # counted as part of the case
+    from running_function import run_slicer
+    from utilities.utilities import features_recorder, finder
+
+    shutil.rmtree(output_path, ignore_errors=True)
+    os.makedirs(output_path)
+    baseline_rss_kb = peak_rss()
+    io_before = io_counters()
+    start_time = time.time()
+
+    # the messages of the program are not printed
+    with contextlib.redirect_stdout(io.StringIO()):
+        if task == "run_slicer":
+            run_slicer(input_path, output_path, **options)
+        elif task == "features_recorder":
+            features_recorder(input_path, output_path)
+        elif task == "finder":
+            finder(input_path, output_path, options["prop"], "FOUND",
+                   numeric=True)
+        else:
+            raise ValueError("unknown task: {}".format(task))
+
+    seconds = time.time() - start_time
+    io_after = io_counters()
+    n_files = 0
+    for root, directories, files in os.walk(output_path):
+        n_files += len(files)
+
+    return {"seconds": seconds, "files": n_files,
+            "peak_rss_kb": peak_rss(),
+            "baseline_rss_kb": baseline_rss_kb,
+            "io": {key: io_after[key] - io_before[key] for key in io_after}}
+
+
+def benchmark(work_path, json_path, sizes=((2000, 2000),),
+              kinds=("int", "float"), no_data_densities=(0.0, 0.3),
+              tile_sizes=((100, 100), (500, 500)),
+              modes=("multi_pass", "single_pass"), label=None):
+    """Runs all the cases and writes their results in a JSON file.
+
+    For every size, kind of heights and share of cells without data, a
+    synthetic "asc" file is written in "work_path". Then, "run_slicer"
+    slices it with every mode and size of the new files, and
+    "features_recorder" and "finder" (looking for a height that is not
+    there, so the whole file is read) run over the results and the
+    original file.
+
+    Parameters
+    ----------
+    work_path : str
+        A directory for the synthetic files and the results. It is
+        emptied first.
+    json_path : str
+        The path of the JSON file.
+    sizes : list
+        The number of columns and rows of the synthetic files.
+    kinds : list
+        The kinds of heights ("int" or "float").
+    no_data_densities : list
+        The shares of cells without data.
+    tile_sizes : list
+        The values of "x_long" and "y_long".
+    modes : list
+        The slicing modes of "run_slicer".
+    label : str, optional
+        A name for the version that is measured.
+
+    Returns
+    -------
+    dict
+        The report written in the JSON file.
+    """
+    shutil.rmtree(work_path, ignore_errors=True)
+    input_path = os.path.join(work_path, "input")
+    output_path = os.path.join(work_path, "output")
+
+    report = {"label": label, "python": platform.python_version(),
+              "numpy": np.__version__, "platform": platform.platform(),
+              "cpu_count": os.cpu_count(),
+              "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "cases": []}
+    context = multiprocessing.get_context("spawn")
+
+    for n_cols, n_rows in sizes:
+        for kind in kinds:
+            for no_data_density in no_data_densities:
+                shutil.rmtree(input_path, ignore_errors=True)
+                os.makedirs(input_path)
+                file_path = os.path.join(input_path, "SYNTHETIC.asc")
+                dtm_generator(file_path, n_cols, n_rows, kind,
+                              no_data_density)
+                file_size_mb = os.stat(file_path)[6] / 1e+6
+                sheet = {"n_cols": n_cols, "n_rows": n_rows, "kind": kind,
+                         "no_data_density": no_data_density,
+                         "file_size_mb": file_size_mb}
+
+                my_cases = []
+                for mode in modes:
+                    for x_long, y_long in tile_sizes:
+                        my_cases.append(("run_slicer", input_path,
+                                         {"x_long": x_long,
+                                          "y_long": y_long, "mode": mode}))
+                my_cases.append(("features_recorder", output_path, {}))
+                my_cases.append(("finder", input_path, {"prop": -1}))
+
+                for task, case_path, options in my_cases:
+                    # the results of the last slicing are kept for
+                    # "features_recorder"
+                    case_output = output_path
+                    if task != "run_slicer":
+                        case_output = os.path.join(work_path, task)
+                    with ProcessPoolExecutor(max_workers=1,
+                                             mp_context=context) as executor:
+                        result = executor.submit(
+                            case_runner, task, case_path, case_output,
+                            options).result()
+
+                    case = dict(sheet, task=task, **options)
+                    case.update(result)
+                    case["mb_per_s"] = file_size_mb / result["seconds"]
+                    if task == "run_slicer":
+                        case["tiles_per_s"] = (result["files"]
+                                               / result["seconds"])
+                    report["cases"].append(case)
+                    print("{} {}: {} seconds".format(
+                        task, options, round(result["seconds"], 2)))
+
+    my_json = open(file=json_path, mode="w", encoding="utf-8")
+    json.dump(report, my_json, indent=2)
+    my_json.close()
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Measures how fast synthetic \"asc\" files are sliced.")
+    parser.add_argument("work_path",
+                        help="directory for the synthetic files")
+    parser.add_argument("json_path", help="path of the JSON report")
+    parser.add_argument("--sizes", nargs="+", default=["2000x2000"],
+                        help="columns and rows of the synthetic files, "
+                             "e.g. 2000x2000")
+    parser.add_argument("--kinds", nargs="+", default=["int", "float"],
+                        choices=["int", "float"],
+                        help="kinds of heights")
+    parser.add_argument("--no-data", nargs="+", type=float,
+                        default=[0.0, 0.3],
+                        help="shares of cells without data")
+    parser.add_argument("--tiles", nargs="+", default=["100x100", "500x500"],
+                        help="sizes of the new files, e.g. 100x100")
+    parser.add_argument("--modes", nargs="+",
+                        default=["multi_pass", "single_pass"],
+                        help="slicing modes")
+    parser.add_argument("--label", help="name of the measured version")
+    args = parser.parse_args()
+
+    benchmark(args.work_path, args.json_path,
+              [tuple(int(value) for value in size.split("x"))
+               for size in args.sizes],
+              args.kinds, args.no_data,
+              [tuple(int(value) for value in size.split("x"))
+               for size in args.tiles],
+              args.modes, args.label)
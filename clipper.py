@@ -0,0 +1,146 @@
+"""This module defines the "clip" function.
+
+Instead of slicing a whole "asc" file to get the area around a certain
+place, "clip" calculates which rows and columns of the original files
+are inside a bounding box, reads only those rows (jumping straight to
+them with the index of each file, see "dtm_index.row_index") and writes
+a single new "asc" file. The bounding box might cover several adjacent
+files.
+"""
+
+
+import math
+import os
+
+from auxiliary_functions import END_OF_FILE, dtm_header
+from dtm_index import row_index, rows_reader
+
+
+# maximum number of rows of the new file that are built at once
+CLIP_ROWS = 512
+
+
+def clip(ParentDtm, xmin, ymin, xmax, ymax, input_path, output_path,
+         clip_name="CLIP.asc"):
+    """Creates a new "asc" file with the cells of one or several "asc"
+    files whose centers are inside a bounding box.
+
+    All the files must have the same cell size and no data value and
+    their cells must be aligned. The cells of the bounding box that are
+    not covered by any file are filled with the no data value.
+
+    Parameters
+    ----------
+    ParentDtm : class instance or list
+        An instance of the "ParentDtm" class, or a list of them.
+    xmin, ymin, xmax, ymax : float
+        The UTM coordinates of the bounding box.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" file.
+    clip_name : str
+        The name of the new "asc" file.
+
+    Returns
+    -------
+    str
+        The path of the new "asc" file.
+
+    Raises
+    ------
+    ValueError
+        If the files are not aligned, their no data values differ or the
+        bounding box does not have the center of any of their cells.
+    """
+    if isinstance(ParentDtm, (list, tuple)):
+        my_parent_dtms = list(ParentDtm)
+    else:
+        my_parent_dtms = [ParentDtm]
+
+    # the grid is defined by the first file. Columns are counted from its
+    # left side and rows from its bottom.
+    cell_size = my_parent_dtms[0].get_cell_size()
+    x_origin = my_parent_dtms[0].get_x()
+    y_origin = my_parent_dtms[0].get_y()
+    no_data_val = str(my_parent_dtms[0].get_no_data_val())
+    for dtm in my_parent_dtms:
+        if (dtm.get_cell_size() != cell_size
+                or (dtm.get_x() - x_origin) % cell_size != 0
+                or (dtm.get_y() - y_origin) % cell_size != 0):
+            raise ValueError("{} is not aligned with {}".format(
+                dtm.get_name(), my_parent_dtms[0].get_name()))
+        # the cells without data of every file are copied as they are
+        if float(dtm.get_no_data_val()) != float(no_data_val):
+            raise ValueError("{} does not have the no data value of {}".
+                             format(dtm.get_name(),
+                                    my_parent_dtms[0].get_name()))
+
+    # first and last column and row of the files
+    my_bounds = {}
+    for dtm in my_parent_dtms:
+        first_col = (dtm.get_x() - x_origin) // cell_size
+        first_row = (dtm.get_y() - y_origin) // cell_size
+        my_bounds[dtm.get_name()] = (first_col,
+                                     first_col + dtm.get_n_cols() - 1,
+                                     first_row,
+                                     first_row + dtm.get_n_rows() - 1)
+
+    # first and last column and row of the bounding box, within the files
+    first_col = max(math.ceil((xmin - x_origin) / cell_size),
+                    min(bounds[0] for bounds in my_bounds.values()))
+    last_col = min(math.floor((xmax - x_origin) / cell_size),
+                   max(bounds[1] for bounds in my_bounds.values()))
+    first_row = max(math.ceil((ymin - y_origin) / cell_size),
+                    min(bounds[2] for bounds in my_bounds.values()))
+    last_row = min(math.floor((ymax - y_origin) / cell_size),
+                   max(bounds[3] for bounds in my_bounds.values()))
+    if first_col > last_col or first_row > last_row:
+        raise ValueError("the bounding box does not have any cell")
+
+    # only the files that overlap the bounding box are read
+    my_sources = []
+    for dtm in my_parent_dtms:
+        bounds = my_bounds[dtm.get_name()]
+        if (bounds[0] <= last_col and bounds[1] >= first_col
+                and bounds[2] <= last_row and bounds[3] >= first_row):
+            file_path = os.path.join(input_path, dtm.get_name())
+            my_sources.append((file_path, bounds,
+                               row_index(file_path)[1]))
+
+    clip_path = os.path.join(output_path, clip_name)
+    clip_dtm = open(file=clip_path, mode="w", encoding="ascii")
+    clip_dtm.write(dtm_header(last_col - first_col + 1,
+                              last_row - first_row + 1,
+                              x_origin + cell_size * first_col,
+                              y_origin + cell_size * first_row,
+                              cell_size, my_parent_dtms[0].get_no_data_val()))
+
+    # the rows are built from top to bottom, "CLIP_ROWS" at a time
+    for top_row in range(last_row, first_row - 1, -CLIP_ROWS):
+        bottom_row = max(top_row - CLIP_ROWS + 1, first_row)
+        my_lines = [[no_data_val] * (last_col - first_col + 1)
+                    for row in range(top_row - bottom_row + 1)]
+
+        for file_path, bounds, my_offsets in my_sources:
+            # rows and columns of the file inside this chunk
+            high = min(top_row, bounds[3])
+            low = max(bottom_row, bounds[2])
+            if low > high:
+                continue
+            left = max(first_col, bounds[0])
+            right = min(last_col, bounds[1])
+            my_rows = rows_reader(file_path, my_offsets, bounds[3] - high,
+                                  high - low + 1).decode("ascii")
+            for k, line in enumerate(my_rows.splitlines()):
+                my_lines[top_row - high + k][left - first_col:
+                                             right - first_col + 1] = (
+                    line.split()[left - bounds[0]:right - bounds[0] + 1])
+
+        for my_line in my_lines:
+            clip_dtm.write(" ".join(my_line) + "\n")
+
+    clip_dtm.write(END_OF_FILE)
+    clip_dtm.close()
+
+    return clip_path
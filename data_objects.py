@@ -24,6 +24,8 @@ class ParentDtm(object):
         Length of a cell along the x and y axis in meters.
     no_data_val : int
         Value that represents a cell without data.
+    data_offset : int
+        Position of the file where the matrix of data starts, if known.
 
     Methods
     -------
@@ -43,9 +45,16 @@ class ParentDtm(object):
         Returns the length of the cells used in the model.
     get_no_data_val
         Returns the value that represents a cell without data.
+    get_data_offset
+        Returns the position of the file where the matrix of data
+        starts, or None if it is not known.
     """
+    # the attributes are fixed, so the instances take less memory
+    __slots__ = ("name", "n_cols", "n_rows", "x_coord", "y_coord",
+                 "cell_size", "no_data_val", "data_offset")
+
     def __init__(self, name, n_cols, n_rows, x_coord, y_coord,
-                 cell_size, no_data_val):
+                 cell_size, no_data_val, data_offset=None):
         self.name = name
         self.n_cols = n_cols
         self.n_rows = n_rows
@@ -53,6 +62,7 @@ class ParentDtm(object):
         self.y_coord = y_coord
         self.cell_size = cell_size
         self.no_data_val = no_data_val
+        self.data_offset = data_offset
 
     def get_name(self):
         return self.name
@@ -74,3 +84,6 @@ class ParentDtm(object):
 
     def get_no_data_val(self):
         return self.no_data_val
+
+    def get_data_offset(self):
+        return self.data_offset
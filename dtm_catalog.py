@@ -0,0 +1,254 @@
+"""This module defines the "DtmCatalog" class.
+
+A catalog stores the attributes of many "asc" files (the six values of
+their headers and the position where their matrix of data starts) in a
+NumPy array per attribute, and all their names in a single bytes object.
+A list of "ParentDtm" instances needs hundreds of bytes per file; a
+catalog needs about a hundred, and it can be filtered, sorted and
+measured without a loop over the files.
+
+Every file of a catalog can still be taken as a "ParentDtm" instance,
+which is built when it is needed, so the catalog can be used wherever a
+list of them is.
+
+This module contains the following:
+    * DtmCatalog - stores the attributes of many "asc" files
+    * catalog_creator - reads the headers of some files into a catalog
+"""
+
+
+import array
+import os
+import time
+
+import numpy as np
+
+from data_objects import ParentDtm as ParentDtmClass
+from raster_io import header_reader
+
+
+# the columns of a catalog, in the order of the header of an "asc" file
+COLUMNS = ("n_cols", "n_rows", "x_coords", "y_coords", "cell_sizes",
+           "no_data_vals")
+
+
+class DtmCatalog(object):
+    """A class that stores the attributes of many "asc" files in
+    columns.
+
+    Attributes
+    ----------
+    n_cols, n_rows : NumPy array
+        The number of columns and rows of the matrix of data of every
+        file.
+    x_coords, y_coords : NumPy array
+        The UTM coordinates of the cell located at the lower left corner
+        of every file.
+    cell_sizes : NumPy array
+        The length of the cells of every file.
+    no_data_vals : NumPy array
+        The value that represents a cell without data in every file.
+    data_offsets : NumPy array
+        The position where the matrix of data of every file starts, or
+        -1 if it is not known.
+    name_blob : bytes
+        The names of all the files, encoded as UTF-8 one after another.
+    name_offsets : NumPy array
+        Where the name of every file starts in "name_blob" and, at the
+        end, where the last one ends.
+
+    Methods
+    -------
+    get_name
+        Returns the name of a file.
+    names
+        Returns the names of all the files.
+    take
+        Returns a catalog with some of the files.
+    filter
+        Returns a catalog with the files that meet a condition.
+    sort
+        Returns a catalog with the files sorted.
+    max_x, max_y
+        Return the coordinates of the upper right cell of every file.
+    extent
+        Returns the extent of all the files.
+    """
+    def __init__(self, names, n_cols, n_rows, x_coords, y_coords,
+                 cell_sizes, no_data_vals, data_offsets=None):
+        my_names = [name.encode("utf-8") for name in names]
+        self.name_blob = b"".join(my_names)
+        self.name_offsets = np.zeros(len(my_names) + 1, dtype=np.int64)
+        np.cumsum([len(name) for name in my_names],
+                  out=self.name_offsets[1:])
+
+        self.n_cols = np.asarray(n_cols, dtype=np.int64)
+        self.n_rows = np.asarray(n_rows, dtype=np.int64)
+        self.x_coords = np.asarray(x_coords, dtype=np.int64)
+        self.y_coords = np.asarray(y_coords, dtype=np.int64)
+        self.cell_sizes = np.asarray(cell_sizes, dtype=np.int64)
+        self.no_data_vals = np.asarray(no_data_vals, dtype=np.int64)
+        if data_offsets is None:
+            data_offsets = np.full(len(my_names), -1)
+        self.data_offsets = np.asarray(data_offsets, dtype=np.int64)
+
+    def __len__(self):
+        return self.name_offsets.size - 1
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __getitem__(self, index):
+        """Returns a file as a "ParentDtm" instance or, if "index" is a
+        slice, a list of positions or a mask, a catalog with those
+        files.
+        """
+        if not isinstance(index, (int, np.integer)):
+            return self.take(np.arange(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("catalog index out of range")
+
+        data_offset = int(self.data_offsets[index])
+        return ParentDtmClass(
+            name=self.get_name(index), n_cols=int(self.n_cols[index]),
+            n_rows=int(self.n_rows[index]),
+            x_coord=int(self.x_coords[index]),
+            y_coord=int(self.y_coords[index]),
+            cell_size=int(self.cell_sizes[index]),
+            no_data_val=int(self.no_data_vals[index]),
+            data_offset=None if data_offset < 0 else data_offset)
+
+    def get_name(self, index):
+        """Returns the name of a file."""
+        return self.name_blob[self.name_offsets[index]:
+                              self.name_offsets[index + 1]].decode("utf-8")
+
+    def names(self):
+        """Returns the names of all the files as a list."""
+        return [self.get_name(index) for index in range(len(self))]
+
+    def take(self, indices):
+        """Returns a catalog with the files of some positions, in that
+        order.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        return DtmCatalog([self.get_name(index) for index in indices],
+                          *[getattr(self, column)[indices]
+                            for column in COLUMNS],
+                          data_offsets=self.data_offsets[indices])
+
+    def filter(self, mask):
+        """Returns a catalog with the files whose value of a boolean
+        array is True, e.g. "catalog.filter(catalog.cell_sizes == 5)".
+        """
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, keys, reverse=False):
+        """Returns a catalog with the files sorted.
+
+        Parameters
+        ----------
+        keys : str or NumPy array
+            The name of a column (e.g. "n_rows"), "n_cells" or "name",
+            or an array with a value for every file.
+        reverse : bool
+            If True, the biggest values go first. Files with the same
+            value keep their order.
+
+        Returns
+        -------
+        DtmCatalog instance
+        """
+        if isinstance(keys, str):
+            if keys == "name":
+                keys = np.array(self.names())
+            elif keys == "n_cells":
+                keys = self.n_cols * self.n_rows
+            else:
+                keys = getattr(self, keys)
+        keys = np.asarray(keys)
+        if reverse:
+            # the order is reversed twice so that ties keep their order
+            order = np.argsort(keys[::-1], kind="stable")[::-1]
+            return self.take(len(self) - 1 - order)
+        return self.take(np.argsort(keys, kind="stable"))
+
+    def max_x(self):
+        """Returns the UTM X coordinate of the cell located at the right
+        side of every file.
+        """
+        return self.x_coords + self.cell_sizes * (self.n_cols - 1)
+
+    def max_y(self):
+        """Returns the UTM Y coordinate of the cell located at the top of
+        every file.
+        """
+        return self.y_coords + self.cell_sizes * (self.n_rows - 1)
+
+    def extent(self):
+        """Returns the minimum and maximum X coordinates and the minimum
+        and maximum Y coordinates of the cells of all the files.
+
+        Raises
+        ------
+        ValueError
+            If the catalog is empty.
+        """
+        if not len(self):
+            raise ValueError("the catalog is empty")
+        return (int(self.x_coords.min()), int(self.max_x().max()),
+                int(self.y_coords.min()), int(self.max_y().max()))
+
+
+def catalog_creator(input_path, file_names, catalog=None, header_times=None):
+    """Creates an instance of class "DtmCatalog" out of some "asc" files.
+
+    Parameters
+    ----------
+    input_path : str
+        The path that contains the "asc" files. It can be empty if the
+        names are paths.
+    file_names : list
+        The names of the "asc" files, which are the names of the catalog.
+    catalog : HeaderCatalog instance, optional
+        If given, the headers are taken from it, and only the files that
+        are not there or have changed are opened.
+    header_times : dict, optional
+        If given, the seconds spent getting the header of every file are
+        stored in it, by name. When the headers are taken from a
+        "HeaderCatalog", every file gets the same share of the time.
+
+    Returns
+    -------
+    DtmCatalog instance
+    """
+    my_paths = [os.path.join(input_path, name) for name in file_names]
+    if catalog is not None:
+        start_time = time.perf_counter()
+        my_headers = catalog.headers(my_paths)
+        if header_times is not None and file_names:
+            header_time = (time.perf_counter() - start_time) / len(file_names)
+            for name in file_names:
+                header_times[name] = header_time
+
+    # the values are gathered in compact arrays instead of lists
+    my_columns = [array.array("q") for column in COLUMNS]
+    my_offsets = array.array("q")
+    for name, file_path in zip(file_names, my_paths):
+        if catalog is not None:
+            dtm_attributes, data_offset = my_headers[file_path]
+        else:
+            header_time = time.perf_counter()
+            dtm_attributes, data_offset = header_reader(file_path)
+            if header_times is not None:
+                header_times[name] = time.perf_counter() - header_time
+        for my_column, value in zip(my_columns, dtm_attributes):
+            my_column.append(value)
+        my_offsets.append(data_offset)
+
+    return DtmCatalog(file_names, *[np.frombuffer(my_column, dtype=np.int64)
+                                    for my_column in my_columns],
+                      data_offsets=np.frombuffer(my_offsets, dtype=np.int64))
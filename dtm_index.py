@@ -0,0 +1,215 @@
+"""This module builds an index with the position of every row of the
+matrix of data of an "asc" file.
+
+With the index, any row of a file can be read with a single "seek()"
+instead of reading all the rows above it. The index can be stored next
+to the "asc" file, in a "NAME.asc.idx" file, so that it is built only
+once. It is rebuilt whenever the size or the modification time of the
+"asc" file change.
+
+This module contains the following functions:
+    * row_offsets - returns the position of every row of an "asc" file
+    * index_writer - stores the index of an "asc" file in an "idx" file
+    * index_reader - reads the "idx" file of an "asc" file
+    * row_index - returns the index of an "asc" file, building it if needed
+    * rows_reader - reads some consecutive rows of an "asc" file
+"""
+
+
+import os
+import struct
+
+import numpy as np
+
+from auxiliary_functions import dtm_open
+from instrumentation import bytes_counter
+from raster_io import header_reader
+
+
+# number of bytes read at once when looking for the rows of a file
+CHUNK_SIZE = 2 ** 24
+
+# an "idx" file starts with this text, followed by the size and the
+# modification time of the "asc" file, the six values of its header and
+# the number of positions. Then come the positions themselves.
+INDEX_MAGIC = b"ASCIDX01"
+INDEX_HEADER = struct.Struct("<8s2q6qq")
+
+
+def row_offsets(file_path):
+    """Returns the position of every row of the matrix of data of an
+    "asc" file.
+
+    The file is read once, in chunks of "CHUNK_SIZE" bytes, looking for
+    the line breaks.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+
+    Returns
+    -------
+    tuple
+        A list with the six values of the header and an array with
+        "NROWS" + 1 positions: where each row starts and, at the end,
+        where the last one ends.
+
+    Raises
+    ------
+    ValueError
+        If the file has fewer rows than its header says.
+    """
+    dtm_attributes, offset = header_reader(file_path)
+    n_rows = dtm_attributes[1]
+
+    my_offsets = [np.array([offset], dtype=np.int64)]
+    n_found = 0
+    position = offset
+    my_dtm = dtm_open(file_path, mode="rb")
+    my_dtm.seek(offset)
+    while n_found < n_rows:
+        chunk = my_dtm.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        bytes_counter(len(chunk))
+        line_ends = np.flatnonzero(
+            np.frombuffer(chunk, dtype=np.uint8) == ord("\n"))
+        my_offsets.append(line_ends[:n_rows - n_found] + position + 1)
+        n_found += line_ends.size
+        position += len(chunk)
+    my_dtm.close()
+
+    my_offsets = np.concatenate(my_offsets)
+    # the last row might not end with a line break
+    if my_offsets.size == n_rows and position > my_offsets[-1]:
+        my_offsets = np.append(my_offsets, position)
+    if my_offsets.size < n_rows + 1:
+        raise ValueError("{} has fewer than {} rows".format(file_path,
+                                                            n_rows))
+
+    return (dtm_attributes, my_offsets)
+
+
+def index_writer(file_path, dtm_attributes, my_offsets):
+    """Stores the index of an "asc" file in the file "file_path.idx".
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    dtm_attributes : list
+        The six values of the header of the file.
+    my_offsets : NumPy array
+        The positions of the rows, as returned by "row_offsets".
+
+    Returns
+    -------
+    None
+    """
+    file_stat = os.stat(file_path)
+    my_idx = open(file="{}.idx".format(file_path), mode="wb")
+    my_idx.write(INDEX_HEADER.pack(INDEX_MAGIC, file_stat.st_size,
+                                   file_stat.st_mtime_ns, *dtm_attributes,
+                                   my_offsets.size))
+    my_idx.write(my_offsets.astype("<i8").tobytes())
+    my_idx.close()
+
+
+def index_reader(file_path):
+    """Reads the index of an "asc" file from the file "file_path.idx".
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+
+    Returns
+    -------
+    tuple or None
+        The six values of the header and the positions of the rows, or
+        None if there is no "idx" file or it does not match the current
+        size and modification time of the "asc" file.
+    """
+    try:
+        my_idx = open(file="{}.idx".format(file_path), mode="rb")
+    except FileNotFoundError:
+        return None
+    header = my_idx.read(INDEX_HEADER.size)
+    body = my_idx.read()
+    my_idx.close()
+
+    if len(header) < INDEX_HEADER.size:
+        return None
+    index_values = INDEX_HEADER.unpack(header)
+    file_stat = os.stat(file_path)
+    if (index_values[0] != INDEX_MAGIC
+            or index_values[1] != file_stat.st_size
+            or index_values[2] != file_stat.st_mtime_ns
+            or len(body) != index_values[9] * 8):
+        return None
+
+    return (list(index_values[3:9]),
+            np.frombuffer(body, dtype="<i8").astype(np.int64))
+
+
+def row_index(file_path, store=True):
+    """Returns the index of an "asc" file.
+
+    The index is read from the "idx" file when it is up to date.
+    Otherwise, it is built with "row_offsets" and, if "store" is True,
+    written to the "idx" file for the next time. A directory that can not
+    be written does not stop the process.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    store : bool
+        Whether a new index is written to the "idx" file.
+
+    Returns
+    -------
+    tuple
+        The six values of the header and the positions of the rows.
+    """
+    my_index = index_reader(file_path)
+    if my_index is None:
+        my_index = row_offsets(file_path)
+        if store:
+            try:
+                index_writer(file_path, *my_index)
+            except OSError:
+                pass
+
+    return my_index
+
+
+def rows_reader(file_path, my_offsets, first_row, n_rows):
+    """Reads some consecutive rows of an "asc" file with a single
+    "seek()".
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    my_offsets : NumPy array
+        The positions of the rows, as returned by "row_index".
+    first_row : int
+        The first row that will be read, starting at 0 at the top.
+    n_rows : int
+        The number of rows that will be read.
+
+    Returns
+    -------
+    bytes
+        The rows, as they are written in the file.
+    """
+    start = int(my_offsets[first_row])
+    my_dtm = dtm_open(file_path, mode="rb")
+    my_dtm.seek(start)
+    my_rows = my_dtm.read(int(my_offsets[first_row + n_rows]) - start)
+    my_dtm.close()
+    bytes_counter(len(my_rows))
+
+    return my_rows
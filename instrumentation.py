@@ -0,0 +1,257 @@
+"""This module measures where the time goes while the "asc" files are
+sliced.
+
+"sheet_runner" runs a slicing function over a parent file and returns,
+besides its usual result, a record with the time of every phase of the
+work, the bytes read from the parent file, and the number and bytes of
+the child files written. The slicing functions add the time of their
+phases to the "SheetMetrics" of the file being sliced, which they get
+from "current_metrics": reading the parent file ("read"), splitting its
+rows into heights ("tokenize"), building the text of the child files
+("format") and writing them ("write"), besides the phases of some modes
+(e.g. "header" or "overviews"). The readers and writers count the bytes
+as they go, with "bytes_counter" and "tiles_counter", and add the time
+of their own phases with "phase_lap", so the bytes read are the ones
+actually read (every pass of "multi_pass", or the text decompressed out
+of a compressed file) and the child files written are only the ones
+written by this run. When no file is being measured, "current_metrics"
+returns None and all of them skip the measures, so they cost nothing.
+
+The records are dictionaries, so they can be sent to any function (a
+hook). Two of them are defined here: "JsonLinesExporter", which writes
+every record as a line of a JSON-lines file, and "PrometheusExporter",
+which keeps the totals of all the records in a text file that can be
+collected by the "textfile" collector of the Prometheus node exporter.
+
+This module contains the following:
+    * SheetMetrics - the measures of a single parent file
+    * current_metrics - returns the measures of the file being sliced
+    * bytes_counter - counts bytes read from the parent file
+    * tiles_counter - counts child files written and their bytes
+    * phase_lap - adds the time since the last lap to a phase
+    * sheet_runner - runs a slicing function measuring it
+    * JsonLinesExporter - writes the records in a JSON-lines file
+    * PrometheusExporter - writes the totals in a Prometheus text file
+"""
+
+
+import json
+import os
+import time
+
+
+# the measures of the parent file that is being sliced in this process
+_current = None
+
+
+class SheetMetrics(object):
+    """A class that stores the measures of a single parent file.
+
+    Attributes
+    ----------
+    phases : dict
+        The seconds spent in every phase.
+    counters : dict
+        Other measures, like the number of bytes read.
+
+    Methods
+    -------
+    lap
+        Adds the time since the last lap to a phase.
+    count
+        Adds a value to a counter.
+    """
+    def __init__(self):
+        self.phases = {}
+        self.counters = {}
+        self.clock = time.perf_counter()
+
+    def lap(self, phase):
+        """Adds the time since the last lap (or since the file started
+        to be sliced) to a phase.
+        """
+        clock = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + clock - self.clock
+        self.clock = clock
+
+    def count(self, counter, value=1):
+        """Adds a value to a counter."""
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+
+def current_metrics():
+    """Returns the "SheetMetrics" of the parent file that is being
+    measured, or None if it is not being measured.
+    """
+    return _current
+
+
+def bytes_counter(n_bytes):
+    """Adds some bytes read from the parent file being measured, if any.
+    """
+    if _current is not None:
+        _current.count("bytes_read", n_bytes)
+
+
+def tiles_counter(n_bytes, n_tiles=1):
+    """Adds some child files written, and their bytes, to the parent file
+    being measured, if any. The bytes written besides the child files
+    (e.g. the table of a container) are counted with no child files.
+    """
+    if _current is not None:
+        _current.count("bytes_written", n_bytes)
+        _current.count("tiles_written", n_tiles)
+
+
+def phase_lap(phase):
+    """Adds the time since the last lap to a phase of the parent file
+    being measured, if any.
+    """
+    if _current is not None:
+        _current.lap(phase)
+
+
+def sheet_runner(slicer, measure, ParentDtm, x_long, y_long, input_path,
+                 output_path, **kwargs):
+    """Runs a slicing function over a parent file, measuring it.
+
+    Parameters
+    ----------
+    slicer : function
+        The slicing function, which takes the rest of the parameters.
+    measure : bool
+        Whether the file is measured.
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class (or the list of them that
+        "mosaic_slicer" takes).
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    kwargs
+        Other parameters of the slicing function.
+
+    Returns
+    -------
+    tuple
+        The result of the slicing function (the name of the file, its
+        size in MB and its processing time in seconds) and the record of
+        its measures, or None if it was not measured. The record has the
+        name of the file ("sheet"), the time when it finished ("time"),
+        its processing time ("seconds"), the seconds of every phase
+        ("phases"), the bytes read from the parent file ("bytes_read"),
+        the bytes and number of the child files written
+        ("bytes_written" and "tiles_written") and the MB processed per
+        second.
+    """
+    global _current
+    if not measure:
+        return (slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                       **kwargs), None)
+
+    _current = SheetMetrics()
+    start_time = time.perf_counter()
+    try:
+        result = slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                        **kwargs)
+    finally:
+        metrics = _current
+        _current = None
+    seconds = time.perf_counter() - start_time
+
+    # a file without reads or writes still gets all the counters
+    for counter in ("bytes_read", "bytes_written", "tiles_written"):
+        metrics.count(counter, 0)
+
+    record = {"sheet": result[0], "time": time.time(), "seconds": seconds,
+              "phases": metrics.phases, "mb_per_s": result[1] / seconds}
+    record.update(metrics.counters)
+
+    return (result, record)
+
+
+class JsonLinesExporter(object):
+    """A class that writes every record in a line of a JSON-lines file.
+
+    Attributes
+    ----------
+    file_path : str
+        The path of the JSON-lines file. The records are appended.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def __call__(self, record):
+        my_jsonl = open(file=self.file_path, mode="a", encoding="utf-8")
+        my_jsonl.write(json.dumps(record) + "\n")
+        my_jsonl.close()
+
+
+class PrometheusExporter(object):
+    """A class that keeps the totals of the records in a Prometheus text
+    file.
+
+    The file is written again after every record, to a temporary file
+    that is then renamed, so it is never read half written.
+
+    Attributes
+    ----------
+    file_path : str
+        The path of the text file, usually ending with ".prom".
+    sheets : int
+        The number of records received.
+    phases : dict
+        The total seconds of every phase.
+    counters : dict
+        The totals of the bytes read, and of the bytes and number of the
+        child files written.
+    last_mb_per_s : float
+        The MB processed per second in the last record.
+    """
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.sheets = 0
+        self.phases = {}
+        self.counters = {"bytes_read": 0, "bytes_written": 0,
+                         "tiles_written": 0}
+        self.last_mb_per_s = 0.0
+
+    def __call__(self, record):
+        self.sheets += 1
+        for phase, seconds in record["phases"].items():
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+        for counter in self.counters:
+            self.counters[counter] += record.get(counter, 0)
+        self.last_mb_per_s = record["mb_per_s"]
+
+        my_lines = [
+            "# HELP dtm_slicer_sheets_total Parent files sliced.",
+            "# TYPE dtm_slicer_sheets_total counter",
+            "dtm_slicer_sheets_total {}".format(self.sheets),
+            "# HELP dtm_slicer_phase_seconds_total Seconds spent in every "
+            "phase.",
+            "# TYPE dtm_slicer_phase_seconds_total counter"]
+        for phase in sorted(self.phases):
+            my_lines.append("dtm_slicer_phase_seconds_total{{phase=\"{}\"}} "
+                            "{}".format(phase, self.phases[phase]))
+        for counter in sorted(self.counters):
+            my_lines.append("# TYPE dtm_slicer_{}_total counter".format(
+                counter))
+            my_lines.append("dtm_slicer_{}_total {}".format(
+                counter, self.counters[counter]))
+        my_lines += [
+            "# HELP dtm_slicer_last_sheet_mb_per_second MB per second of "
+            "the last parent file.",
+            "# TYPE dtm_slicer_last_sheet_mb_per_second gauge",
+            "dtm_slicer_last_sheet_mb_per_second {}".format(
+                self.last_mb_per_s)]
+
+        my_prom = open(file=self.file_path + ".tmp", mode="w",
+                       encoding="utf-8")
+        my_prom.write("\n".join(my_lines) + "\n")
+        my_prom.close()
+        os.replace(self.file_path + ".tmp", self.file_path)
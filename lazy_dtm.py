@@ -0,0 +1,243 @@
+"""This module gives access to the child files of a parent file without
+writing them.
+
+"LazyDtm" returns the heights of any child file, or of any window of the
+parent file, as a NumPy array. The child files follow the grid of
+"slicer_blueprint" and the numbering of the files written by the
+slicing functions ("NAME_col_row"). Only the rows that are needed are
+read, with the index of "dtm_index.row_index", and every block row read
+is kept in a cache of a bounded size, so the child files that are asked
+for often are taken from memory.
+"""
+
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from auxiliary_functions import child_dtm_attributes, slicer_blueprint
+from dtm_index import row_index, rows_reader
+
+
+class LazyDtm(object):
+    """A class that reads the child files of a parent file on demand.
+
+    The block rows are parsed as 64 bit floats and cached until the
+    cache holds more than "cache_mb" MB, when the ones used least
+    recently are dropped. The arrays returned are read only, because
+    they might be views of the cache. A single instance can be used by
+    several threads at once.
+
+    Attributes
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    file_path : str
+        The path of the parent file.
+    x_long : int
+        The maximum number of columns in the child files.
+    y_long : int
+        The maximum number of rows in the child files.
+    n_sliced_cols : int
+        The number of child files along the x axis.
+    n_sliced_rows : int
+        The number of child files along the y axis.
+    cache_bytes : int
+        The maximum size of the cache in bytes. The last block row read
+        is always kept, even if it is bigger.
+    hits : int
+        The number of block rows taken from the cache or from a read
+        started by another thread.
+    misses : int
+        The number of block rows read from the file.
+
+    Methods
+    -------
+    tile
+        Returns the heights of a child file.
+    window
+        Returns the heights of any window of the parent file.
+    block_row
+        Returns the heights of a block row.
+    """
+    def __init__(self, ParentDtm, input_path, x_long, y_long, cache_mb=256,
+                 store_index=True):
+        self.ParentDtm = ParentDtm
+        self.file_path = os.path.join(input_path, ParentDtm.get_name())
+        self.x_long = x_long
+        self.y_long = y_long
+        self.n_sliced_cols, self.n_sliced_rows = slicer_blueprint(
+            ParentDtm, x_long, y_long)
+        self.cache_bytes = int(cache_mb * 1e+6)
+        self.hits = 0
+        self.misses = 0
+
+        # the index is only read (or built) when the first block row is
+        # needed
+        self.store_index = store_index
+        self.my_offsets = None
+        self.my_blocks = OrderedDict()
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+        # the block rows that are being read, and the lock of the index
+        self.my_loads = {}
+        self.index_lock = threading.Lock()
+
+    def tile(self, col, row):
+        """Returns the heights of a child file.
+
+        Parameters
+        ----------
+        col : int
+            The column of the child file, starting at 1 on the left.
+        row : int
+            The row of the child file, starting at 1 at the bottom.
+
+        Returns
+        -------
+        NumPy array
+            The heights of the child file, with the number of rows and
+            columns given by "child_dtm_attributes".
+
+        Raises
+        ------
+        ValueError
+            If the parent file has no such child file.
+        """
+        if not (1 <= col <= self.n_sliced_cols
+                and 1 <= row <= self.n_sliced_rows):
+            raise ValueError("{} has no child file {}_{}".format(
+                self.ParentDtm.get_name(), col, row))
+        first_col = (col - 1) * self.x_long
+
+        return self.block_row(row)[:, first_col:first_col + self.x_long]
+
+    def window(self, first_row, first_col, n_rows, n_cols):
+        """Returns the heights of any window of the parent file.
+
+        Parameters
+        ----------
+        first_row : int
+            The first row of the window, starting at 0 at the top.
+        first_col : int
+            The first column of the window, starting at 0 on the left.
+        n_rows : int
+            The number of rows of the window.
+        n_cols : int
+            The number of columns of the window.
+
+        Returns
+        -------
+        NumPy array
+            The heights of the window.
+
+        Raises
+        ------
+        ValueError
+            If the window is empty or goes beyond the parent file.
+        """
+        if (n_rows < 1 or n_cols < 1 or first_row < 0 or first_col < 0
+                or first_row + n_rows > self.ParentDtm.get_n_rows()
+                or first_col + n_cols > self.ParentDtm.get_n_cols()):
+            raise ValueError("the window is not inside {}".format(
+                self.ParentDtm.get_name()))
+
+        # the block rows that contain the window, from top to bottom
+        last_row = first_row + n_rows - 1
+        my_parts = []
+        for j in range(self._row_block(first_row),
+                       self._row_block(last_row) - 1, -1):
+            block = self.block_row(j)
+            top = self._block_top(j)
+            my_parts.append(block[max(first_row - top, 0):
+                                  min(last_row - top + 1, block.shape[0]),
+                                  first_col:first_col + n_cols])
+
+        if len(my_parts) == 1:
+            return my_parts[0]
+        return np.concatenate(my_parts)
+
+    def block_row(self, row):
+        """Returns the heights of a block row, starting at 1 at the
+        bottom, reading it if it is not in the cache.
+
+        The block row is read and parsed without holding the lock of the
+        cache, so other threads can take the block rows in the cache
+        meanwhile. The threads that ask for a block row that is being
+        read wait for that read instead of starting another one.
+        """
+        with self.lock:
+            block = self.my_blocks.get(row)
+            if block is not None:
+                self.my_blocks.move_to_end(row)
+                self.hits += 1
+                return block
+            my_load = self.my_loads.get(row)
+            if my_load is not None:
+                self.hits += 1
+                is_reader = False
+            else:
+                self.misses += 1
+                my_load = Future()
+                self.my_loads[row] = my_load
+                is_reader = True
+
+        if not is_reader:
+            return my_load.result()
+        try:
+            block = self._block_reader(row)
+        except Exception as error:
+            with self.lock:
+                del self.my_loads[row]
+            my_load.set_exception(error)
+            raise
+
+        with self.lock:
+            del self.my_loads[row]
+            self.my_blocks[row] = block
+            self.cached_bytes += block.nbytes
+            while (self.cached_bytes > self.cache_bytes
+                   and len(self.my_blocks) > 1):
+                self.cached_bytes -= self.my_blocks.popitem(
+                    last=False)[1].nbytes
+        my_load.set_result(block)
+
+        return block
+
+    def _block_reader(self, row):
+        """Reads and parses a block row, starting at 1 at the bottom.
+        """
+        with self.index_lock:
+            if self.my_offsets is None:
+                self.my_offsets = row_index(self.file_path,
+                                            self.store_index)[1]
+        n_rows = child_dtm_attributes(self.ParentDtm, self.x_long,
+                                      self.y_long, 1, row)[1]
+        block = np.fromstring(
+            rows_reader(self.file_path, self.my_offsets,
+                        self._block_top(row), n_rows),
+            dtype=np.float64, sep=" ")
+        n_cells = n_rows * self.ParentDtm.get_n_cols()
+        if block.size != n_cells:
+            raise ValueError("{} does not have {} cells in {} rows".format(
+                self.file_path, n_cells, n_rows))
+        block = block.reshape(n_rows, self.ParentDtm.get_n_cols())
+        block.flags.writeable = False
+
+        return block
+
+    def _block_top(self, row):
+        """Returns the first row of the parent file, starting at 0 at the
+        top, of a block row.
+        """
+        return max(self.ParentDtm.get_n_rows() - row * self.y_long, 0)
+
+    def _row_block(self, parent_row):
+        """Returns the block row that contains a row of the parent file,
+        starting at 0 at the top.
+        """
+        return ((self.ParentDtm.get_n_rows() - 1 - parent_row) // self.y_long
+                + 1)
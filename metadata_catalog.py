@@ -0,0 +1,127 @@
+"""This module defines the "HeaderCatalog" class.
+
+The headers of the "asc" files are parsed once and stored in an SQLite
+database, together with the position where their matrix of data starts
+and their extents. Every file is identified by its path, its size and
+its modification time, so a header is only parsed again when its file
+changes.
+"""
+
+
+import os
+import sqlite3
+
+from raster_io import header_reader
+
+
+# number of paths looked up in the database with a single query
+QUERY_SIZE = 500
+
+
+class HeaderCatalog(object):
+    """A class that stores the headers of "asc" files in an SQLite
+    database.
+
+    Attributes
+    ----------
+    db_path : str
+        The path of the database. It is created if it does not exist.
+    connection : sqlite3.Connection
+        The connection to the database.
+
+    Methods
+    -------
+    headers
+        Returns the headers of several files, parsing only the new or
+        changed ones.
+    header
+        Returns the header of a single file.
+    extents
+        Returns the extents of several files.
+    close
+        Closes the database.
+    """
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS headers ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, "
+            "n_cols INTEGER, n_rows INTEGER, x_coord INTEGER, "
+            "y_coord INTEGER, cell_size INTEGER, no_data_val INTEGER, "
+            "data_offset INTEGER)")
+        self.connection.commit()
+
+    def headers(self, file_paths):
+        """Returns the headers of several "asc" files.
+
+        The headers that are in the database and whose file has not
+        changed are taken from it. The rest are parsed and stored with a
+        single transaction.
+
+        Parameters
+        ----------
+        file_paths : list
+            The paths of the "asc" files.
+
+        Returns
+        -------
+        dict
+            For every path, a list with the six values of the header and
+            the position where the matrix of data starts.
+        """
+        my_stats = {}
+        for file_path in file_paths:
+            file_stat = os.stat(file_path)
+            my_stats[file_path] = (file_stat.st_size, file_stat.st_mtime_ns)
+
+        my_headers = {}
+        for first in range(0, len(file_paths), QUERY_SIZE):
+            my_paths = file_paths[first:first + QUERY_SIZE]
+            my_rows = self.connection.execute(
+                "SELECT * FROM headers WHERE path IN ({})".format(
+                    ", ".join("?" * len(my_paths))), my_paths)
+            for row in my_rows:
+                if my_stats[row[0]] == (row[1], row[2]):
+                    my_headers[row[0]] = (list(row[3:9]), row[9])
+
+        my_new_rows = []
+        for file_path in file_paths:
+            if file_path not in my_headers:
+                my_headers[file_path] = header_reader(file_path)
+                my_new_rows.append((file_path, *my_stats[file_path],
+                                    *my_headers[file_path][0],
+                                    my_headers[file_path][1]))
+        if my_new_rows:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO headers VALUES "
+                "(?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", my_new_rows)
+            self.connection.commit()
+
+        return my_headers
+
+    def header(self, file_path):
+        """Returns the six values of the header of an "asc" file and the
+        position where its matrix of data starts.
+        """
+        return self.headers([file_path])[file_path]
+
+    def extents(self, file_paths):
+        """Returns the minimum and maximum X and Y coordinates of several
+        "asc" files, as a dictionary of tuples (MIN_X, MAX_X, MIN_Y,
+        MAX_Y) by path.
+        """
+        my_extents = {}
+        for file_path, (dtm_attributes, offset) in self.headers(
+                file_paths).items():
+            my_extents[file_path] = (
+                dtm_attributes[2],
+                dtm_attributes[2] + (dtm_attributes[4]
+                                     * (dtm_attributes[0] - 1)),
+                dtm_attributes[3],
+                dtm_attributes[3] + (dtm_attributes[4]
+                                     * (dtm_attributes[1] - 1)))
+        return my_extents
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,202 @@
+"""This module defines the "mosaic_slicer" function.
+
+Instead of slicing every "asc" file on its own, "mosaic_slicer" lays a
+single grid of child files over all of them. The grid starts at the
+lower left corner of the whole set of files and all its child files have
+"x_long" columns and "y_long" rows, so they line up across the borders of
+the original files. The cells of a child file covered by several
+original files are taken from all of them, and the ones that are not
+covered by any file get the no data value.
+
+The block rows of the grid are built from top to bottom. Every original
+file is read once, from its first row to its last one, as the block rows
+reach it, so only the rows of the current block row are kept in memory.
+"""
+
+
+import os
+import time
+
+from auxiliary_functions import (END_OF_FILE, child_dtm_attributes,
+                                 child_dtm_name, dtm_header, dtm_open,
+                                 stats_printer)
+from data_objects import ParentDtm as ParentDtmClass
+from instrumentation import bytes_counter, current_metrics, tiles_counter
+
+
+def mosaic_slicer(my_parent_dtms, x_long, y_long, input_path, output_path,
+                  mosaic_name="MOSAIC", verbose=True):
+    """Creates new "asc" files on a single grid over several "asc" files.
+
+    All the files must have the same cell size and no data value and
+    their cells must be aligned. Where two files overlap, the cells of
+    the last one in "my_parent_dtms" are kept. The child files that are
+    not covered by any file are not written.
+
+    The new files are stored in "output_path/mosaic_name" and named
+    "mosaic_name_col_row.asc", where the column and the row start at 1 at
+    the lower left corner of the grid.
+
+    Parameters
+    ----------
+    my_parent_dtms : list
+        A list of instances of the "ParentDtm" class.
+    x_long : int
+        The number of columns in the new "asc" files.
+    y_long : int
+        The number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    mosaic_name : str
+        The name of the grid of new files.
+    verbose : bool
+        If True, the size and processing time of the files are printed.
+
+    Returns
+    -------
+    tuple
+        The name of the grid, the size of the original files in MB and
+        the processing time in seconds.
+
+    Raises
+    ------
+    ValueError
+        If the files are not aligned or their no data values differ.
+    """
+    start_time = time.time()
+
+    # the grid is aligned with the first file. Columns are counted from
+    # its left side and rows from its bottom.
+    cell_size = my_parent_dtms[0].get_cell_size()
+    x_origin = my_parent_dtms[0].get_x()
+    y_origin = my_parent_dtms[0].get_y()
+    no_data_val = str(my_parent_dtms[0].get_no_data_val())
+    for dtm in my_parent_dtms:
+        if (dtm.get_cell_size() != cell_size
+                or (dtm.get_x() - x_origin) % cell_size != 0
+                or (dtm.get_y() - y_origin) % cell_size != 0):
+            raise ValueError("{} is not aligned with {}".format(
+                dtm.get_name(), my_parent_dtms[0].get_name()))
+        # the cells without data of every file are copied as they are
+        if float(dtm.get_no_data_val()) != float(no_data_val):
+            raise ValueError("{} does not have the no data value of {}".
+                             format(dtm.get_name(),
+                                    my_parent_dtms[0].get_name()))
+
+    # first and last column and row of the files
+    my_bounds = []
+    for dtm in my_parent_dtms:
+        first_col = (dtm.get_x() - x_origin) // cell_size
+        first_row = (dtm.get_y() - y_origin) // cell_size
+        my_bounds.append((first_col, first_col + dtm.get_n_cols() - 1,
+                          first_row, first_row + dtm.get_n_rows() - 1))
+    first_col = min(bounds[0] for bounds in my_bounds)
+    first_row = min(bounds[2] for bounds in my_bounds)
+    # from now on, columns and rows are counted from the grid
+    my_bounds = [(bounds[0] - first_col, bounds[1] - first_col,
+                  bounds[2] - first_row, bounds[3] - first_row)
+                 for bounds in my_bounds]
+
+    # the grid is a "ParentDtm" whose size is a multiple of the size of
+    # the child files, so all of them are equal
+    n_sliced_cols = max(bounds[1] for bounds in my_bounds) // x_long + 1
+    n_sliced_rows = max(bounds[3] for bounds in my_bounds) // y_long + 1
+    MosaicDtm = ParentDtmClass(
+        name="{}.asc".format(mosaic_name), n_cols=n_sliced_cols * x_long,
+        n_rows=n_sliced_rows * y_long,
+        x_coord=x_origin + cell_size * first_col,
+        y_coord=y_origin + cell_size * first_row, cell_size=cell_size,
+        no_data_val=my_parent_dtms[0].get_no_data_val())
+
+    mosaic_path = os.path.join(output_path, mosaic_name)
+    os.makedirs(mosaic_path, exist_ok=True)
+
+    file_size_mb = sum(os.stat(os.path.join(input_path, dtm.get_name()))[6]
+                       for dtm in my_parent_dtms) / 1e+6
+
+    # the files that are being read
+    my_streams = {}
+    metrics = current_metrics()
+    try:
+        # iterates over the block rows from top to bottom
+        for j in range(n_sliced_rows, 0, -1):
+            low = (j - 1) * y_long
+            high = j * y_long - 1
+
+            # the rows of the child files of the block row that are
+            # covered by any file, by block column
+            my_tiles = {}
+            for k, bounds in enumerate(my_bounds):
+                if bounds[2] > high or bounds[3] < low:
+                    continue
+                if k not in my_streams:
+                    my_streams[k] = dtm_open(os.path.join(
+                        input_path, my_parent_dtms[k].get_name()), mode="r")
+                    # skips the header
+                    for line_counter in range(6):
+                        my_streams[k].readline()
+
+                first_i = bounds[0] // x_long
+                last_i = bounds[1] // x_long
+                for i in range(first_i, last_i + 1):
+                    if i not in my_tiles:
+                        my_tiles[i] = [[no_data_val] * x_long
+                                       for row in range(y_long)]
+
+                # the rows of the file inside the block row, from top to
+                # bottom
+                for row in range(min(high, bounds[3]),
+                                 max(low, bounds[2]) - 1, -1):
+                    line = my_streams[k].readline()
+                    if metrics is not None:
+                        metrics.lap("read")
+                    my_list = line.split()
+                    if metrics is not None:
+                        metrics.lap("tokenize")
+                    for i in range(first_i, last_i + 1):
+                        left = max(i * x_long, bounds[0])
+                        right = min((i + 1) * x_long - 1, bounds[1])
+                        my_tiles[i][high - row][
+                            left - i * x_long:right - i * x_long + 1] = (
+                            my_list[left - bounds[0]:right - bounds[0] + 1])
+                    if metrics is not None:
+                        metrics.lap("format")
+
+                # the file is closed once its last row has been read
+                if bounds[2] >= low:
+                    my_stream = my_streams.pop(k)
+                    bytes_counter(my_stream.buffer.tell())
+                    my_stream.close()
+
+            for i in sorted(my_tiles):
+                n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+                    MosaicDtm, x_long, y_long, i + 1, j)
+                my_text = dtm_header(n_cols, n_rows, x_coord, y_coord,
+                                     cell_size, MosaicDtm.get_no_data_val())
+                my_text += "".join(" ".join(my_list) + "\n"
+                                   for my_list in my_tiles[i])
+                my_text += END_OF_FILE
+                if metrics is not None:
+                    metrics.lap("format")
+                child_dtm = open(
+                    file=os.path.join(mosaic_path,
+                                      child_dtm_name(MosaicDtm, i + 1, j)),
+                    mode="w", encoding="ascii")
+                child_dtm.write(my_text)
+                tiles_counter(child_dtm.tell())
+                child_dtm.close()
+                if metrics is not None:
+                    metrics.lap("write")
+
+    finally:
+        for my_stream in my_streams.values():
+            bytes_counter(my_stream.buffer.tell())
+            my_stream.close()
+
+    abs_process_time = time.time() - start_time
+    if verbose:
+        stats_printer(MosaicDtm, file_size_mb, abs_process_time)
+
+    return (MosaicDtm.get_name(), file_size_mb, abs_process_time)
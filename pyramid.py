@@ -0,0 +1,252 @@
+"""This module builds overviews of the parent files while they are
+sliced.
+
+An overview of factor "f" has cells "f" times bigger than the parent
+file: every cell aggregates (mean, minimum or maximum, ignoring the
+cells without data) a window of "f" x "f" cells of the parent file. The
+windows are laid out from the lower left corner, like the child files,
+so the ones at the top and on the right might be smaller. Overviews are
+built out of the rows of the parent file as they are read, so a single
+read of a parent file produces all of them, and they are sliced into
+child files with the same "x_long" and "y_long" in the directory
+"NAME/x{f}".
+
+This module contains the following:
+    * AGGREGATIONS - the ways in which the cells can be aggregated
+    * OverviewWriter - builds and slices a single overview
+    * pyramid_builder - builds the overviews of a parent file on its own
+"""
+
+
+import os
+
+import numpy as np
+
+from auxiliary_functions import child_dtm_attributes, slicer_blueprint
+from data_objects import ParentDtm as ParentDtmClass
+from instrumentation import phase_lap
+from raster_io import AscReader
+from tile_formats import AscWriter
+
+
+AGGREGATIONS = ("mean", "min", "max")
+
+
+class OverviewWriter(object):
+    """A class that builds an overview of a parent file out of its rows
+    and writes it as "asc" child files.
+
+    The heights of the overview are written with the decimals of the
+    parent file, so the mean of an integer file is rounded.
+
+    Attributes
+    ----------
+    factor : int
+        The number of cells of the parent file along each axis that are
+        aggregated into a single cell.
+    aggregation : str
+        One of "AGGREGATIONS".
+    no_data_val : int
+        Value that represents a cell without data.
+    OverviewDtm : class instance
+        An instance of the "ParentDtm" class with the attributes of the
+        overview, whose child files are written.
+    x_long : int
+        The maximum number of columns in the child files.
+    y_long : int
+        The maximum number of rows in the child files.
+
+    Methods
+    -------
+    add_rows
+        Aggregates the next rows of the parent file.
+    close
+        Checks that the whole overview has been written.
+
+    Raises
+    ------
+    ValueError
+        If the factor is smaller than 2 or the aggregation is unknown.
+    """
+    def __init__(self, factor, ParentDtm, x_long, y_long, dtm_path,
+                 aggregation="mean"):
+        if factor < 2:
+            raise ValueError("the factor of an overview must be at least 2")
+        if aggregation not in AGGREGATIONS:
+            raise ValueError("unknown aggregation: {}".format(aggregation))
+        self.factor = factor
+        self.aggregation = aggregation
+        self.no_data_val = ParentDtm.get_no_data_val()
+        self.x_long = x_long
+        self.y_long = y_long
+
+        # the center of the lower left cell of the overview is the center
+        # of the window of "factor" x "factor" cells of the parent file
+        shift = ParentDtm.get_cell_size() * (factor - 1) / 2
+        if shift == int(shift):
+            shift = int(shift)
+        self.OverviewDtm = ParentDtmClass(
+            name=ParentDtm.get_name(),
+            n_cols=-(-ParentDtm.get_n_cols() // factor),
+            n_rows=-(-ParentDtm.get_n_rows() // factor),
+            x_coord=ParentDtm.get_x() + shift,
+            y_coord=ParentDtm.get_y() + shift,
+            cell_size=ParentDtm.get_cell_size() * factor,
+            no_data_val=self.no_data_val)
+
+        level_path = os.path.join(dtm_path, "x{}".format(factor))
+        os.makedirs(level_path, exist_ok=True)
+        self.writer = AscWriter(level_path, self.OverviewDtm, x_long, y_long)
+        self.n_sliced_cols, self.block_row = slicer_blueprint(
+            self.OverviewDtm, x_long, y_long)
+
+        # the window at the top has the rows left by the other ones
+        self.window = ParentDtm.get_n_rows() % factor or factor
+        self.my_rows = []
+        self.n_pending = 0
+        self.my_overview_rows = []
+
+    def add_rows(self, block, decimals=0):
+        """Aggregates the next rows of the parent file, from top to
+        bottom, and writes the child files of the overview once a block
+        row of them is complete.
+
+        Parameters
+        ----------
+        block : NumPy array
+            The rows of the parent file.
+        decimals : int
+            The number of decimals of the heights.
+
+        Returns
+        -------
+        None
+        """
+        self.my_rows.append(block)
+        self.n_pending += block.shape[0]
+        if self.n_pending < self.window:
+            return
+
+        my_rows = np.concatenate(self.my_rows)
+        start = 0
+        while my_rows.shape[0] - start >= self.window:
+            self.my_overview_rows.append(
+                self._aggregator(my_rows[start:start + self.window],
+                                 decimals))
+            start += self.window
+            self.window = self.factor
+            if len(self.my_overview_rows) == child_dtm_attributes(
+                    self.OverviewDtm, self.x_long, self.y_long, 1,
+                    self.block_row)[1]:
+                self._band_writer(decimals)
+        self.my_rows = [my_rows[start:]]
+        self.n_pending = my_rows.shape[0] - start
+
+    def close(self):
+        """Checks that every row of the overview has been written.
+
+        Raises
+        ------
+        ValueError
+            If the parent file did not have all its rows.
+        """
+        if self.block_row != 0 or self.n_pending:
+            raise ValueError("the overview x{} of {} is not complete".format(
+                self.factor, self.OverviewDtm.get_name()))
+
+    def _aggregator(self, rows, decimals):
+        """Aggregates some rows of the parent file into a row of the
+        overview.
+        """
+        values = rows.astype(np.float64)
+        values[values == self.no_data_val] = np.nan
+        n_missing = -values.shape[1] % self.factor
+        if n_missing:
+            values = np.concatenate(
+                (values, np.full((values.shape[0], n_missing), np.nan)),
+                axis=1)
+        values = values.reshape(values.shape[0], -1, self.factor)
+
+        valid = ~np.isnan(values)
+        n_valid = valid.sum(axis=(0, 2))
+        if self.aggregation == "mean":
+            overview_row = (np.where(valid, values, 0).sum(axis=(0, 2))
+                            / np.maximum(n_valid, 1))
+        elif self.aggregation == "min":
+            overview_row = np.where(valid, values, np.inf).min(axis=(0, 2))
+        else:
+            overview_row = np.where(valid, values, -np.inf).max(axis=(0, 2))
+
+        if not decimals:
+            overview_row = np.rint(overview_row)
+        overview_row[n_valid == 0] = self.no_data_val
+
+        return overview_row
+
+    def _band_writer(self, decimals):
+        """Writes the child files of the block row of the overview that
+        has just been completed. The time spent aggregating its rows is
+        added to the "overviews" phase of the parent file being measured.
+        """
+        phase_lap("overviews")
+        band = np.array(self.my_overview_rows)
+        self.my_overview_rows = []
+        no_data_val = self.no_data_val if decimals else None
+        for i in range(1, self.n_sliced_cols + 1):
+            n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+                self.OverviewDtm, self.x_long, self.y_long, i,
+                self.block_row)
+            n = (i - 1) * self.x_long
+            self.writer.write(i, self.block_row,
+                              [n_cols, n_rows, x_coord, y_coord,
+                               self.OverviewDtm.get_cell_size(),
+                               self.no_data_val],
+                              band[:, n:n + n_cols], decimals, no_data_val)
+        self.block_row -= 1
+
+
+def pyramid_builder(ParentDtm, x_long, y_long, input_path, dtm_path,
+                    pyramid, aggregation="mean"):
+    """Builds the overviews of a parent file reading it once.
+
+    "raster_slicer" builds the overviews while it slices the parent
+    file. This function builds them on their own.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the child files.
+    y_long : int
+        The maximum number of rows in the child files.
+    input_path : str
+        The path that contains the original "asc" files.
+    dtm_path : str
+        The directory that stores the child files of the parent file.
+    pyramid : list
+        The factors of the overviews.
+    aggregation : str
+        One of "AGGREGATIONS".
+
+    Returns
+    -------
+    None
+    """
+    my_overviews = [OverviewWriter(factor, ParentDtm, x_long, y_long,
+                                   dtm_path, aggregation)
+                    for factor in pyramid]
+    reader = AscReader(os.path.join(input_path, ParentDtm.get_name()),
+                       exact=False)
+    try:
+        for j in range(slicer_blueprint(ParentDtm, x_long, y_long)[1], 0,
+                       -1):
+            block = reader.read_rows(child_dtm_attributes(
+                ParentDtm, x_long, y_long, 1, j)[1])
+            for overview in my_overviews:
+                overview.add_rows(block, reader.decimals)
+    finally:
+        reader.close()
+
+    for overview in my_overviews:
+        overview.close()
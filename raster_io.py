@@ -0,0 +1,609 @@
+"""This module reads and writes the matrix of data of "asc" files using
+NumPy arrays.
+
+Instead of splitting every line into a list of strings and joining
+slices of that list again, the heights are parsed in bulk into typed
+arrays (a chunk of rows at a time, so memory stays bounded) and the
+child files are written from views of those arrays.
+
+The text representation of the original file is preserved: integer
+grids are written back as integers and decimal grids with the same
+number of decimals, so the new files match the ones created from the
+text.
+
+This module contains the following:
+    * NEWLINE - the line terminator used in the child files
+    * header_reader - reads the header of an "asc" file
+    * data_format - detects how the heights of an "asc" file are written
+    * AscReader - reads the matrix of data by chunks of rows
+    * array_formatter - writes an array as the lines of an "asc" file
+    * tile_text - returns the bytes of a child file
+    * tile_writer - writes a child file
+    * TileWriter - writes child files, optionally in background threads
+    * LinesReader - reads the lines of a file ahead in a background thread
+"""
+
+
+import itertools
+import os
+import queue
+import re
+import threading
+
+import numpy as np
+
+from auxiliary_functions import END_OF_FILE, dtm_open
+from instrumentation import bytes_counter, phase_lap, tiles_counter
+
+
+# child files are written in text mode by "slicer", so their lines end
+# with the line terminator of the platform
+NEWLINE = os.linesep.encode("ascii")
+
+# number of bytes read at once by "LinesReader"
+READ_AHEAD_BYTES = 2 ** 22
+
+# byte values used by the formatter and the validations
+_SPACE = ord(" ")
+_NEW_LINE = ord("\n")
+_POINT = ord(".")
+_MINUS = ord("-")
+_RETURN = ord("\r")
+_ZERO = ord("0")
+_NINE = ord("9")
+
+# a height of zero written with a minus sign, e.g. "-0.000"
+_NEGATIVE_ZERO = re.compile(rb"(?<![0-9])-0\.0*(?![0-9])")
+
+# "0000" to "9999" and the digits of a group of four that are written
+# when a number has 0 to 4 digits left, as 32 bit integers
+_DIGITS = np.array([list(b"%04d" % number) for number in range(10000)],
+                   dtype=np.uint8).view(np.uint32).ravel()
+_WRITTEN = np.array([[0] * (4 - n) + [1] * n for n in range(5)],
+                    dtype=np.uint8).view(np.uint32).ravel()
+
+
+def header_reader(file_path):
+    """Reads the header of an "asc" file.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+
+    Returns
+    -------
+    tuple
+        A list with the six values of the header (number of columns,
+        number of rows, X coordinate, Y coordinate, cell size and no
+        data value) and the position where the matrix of data starts.
+    """
+    my_dtm = dtm_open(file_path, mode="rb")
+    dtm_attributes = []
+    for line_counter in range(6):
+        dtm_attributes.append(int(my_dtm.readline().split()[1]))
+    offset = my_dtm.tell()
+    my_dtm.close()
+    bytes_counter(offset)
+
+    return (dtm_attributes, offset)
+
+
+def data_format(tokens, no_data_val):
+    """Detects how the heights of an "asc" file are written.
+
+    Parameters
+    ----------
+    tokens : iterable
+        A sample of the heights, as they are written in the file.
+    no_data_val : int
+        Value that represents a cell without data.
+
+    Returns
+    -------
+    tuple
+        The NumPy type of the heights and their number of decimals.
+
+    Raises
+    ------
+    ValueError
+        If the heights are not written with a single precision, since
+        they could not be written back without changing them.
+    """
+    decimals = set()
+    integers = set()
+    for token in set(tokens):
+        if isinstance(token, bytes):
+            token = token.decode("ascii")
+        if "e" in token or "E" in token:
+            raise ValueError("heights in scientific notation are not "
+                             "supported")
+        if "." in token:
+            decimals.add(len(token) - token.index(".") - 1)
+        else:
+            integers.add(int(token))
+
+    if not decimals:
+        return (np.int32, 0)
+    if len(decimals) > 1 or (integers and integers != {no_data_val}):
+        raise ValueError("heights are written with different precisions")
+    return (np.float64, decimals.pop())
+
+
+class AscReader(object):
+    """A class that reads the matrix of data of an "asc" file by chunks
+    of rows.
+
+    The type and precision of the heights are detected out of the first
+    row and checked in every chunk. Integer heights are stored as 32 bit
+    integers, decimal ones as 64 bit floats.
+
+    Attributes
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    n_cols : int
+        The number of columns in the matrix of data.
+    n_rows : int
+        The number of rows in the matrix of data.
+    no_data_val : int
+        Value that represents a cell without data.
+    dtype : NumPy type
+        The type of the arrays returned by "read_rows".
+    decimals : int
+        The number of decimals of the heights.
+    no_data_as_int : bool
+        Whether the cells without data of the last chunk of a decimal
+        file are written as integers (e.g. "-9999" instead of
+        "-9999.000").
+    exact : bool
+        Whether the heights must be written back without changing their
+        text. If False, they are read as 64 bit floats without checking
+        their precision, and "decimals" is the highest number of
+        decimals of the first row.
+
+    Methods
+    -------
+    read_rows
+        Returns the next rows of the matrix of data as an array.
+    close
+        Closes the file.
+    """
+    def __init__(self, file_path, offset=None, exact=True):
+        dtm_attributes, header_offset = header_reader(file_path)
+        self.file_path = file_path
+        self.n_cols = dtm_attributes[0]
+        self.n_rows = dtm_attributes[1]
+        self.no_data_val = dtm_attributes[5]
+        self.dtype = None
+        self.decimals = 0
+        self.no_data_as_int = False
+        self.exact = exact
+        self.my_dtm = dtm_open(file_path, mode="rb")
+        self.my_dtm.seek(header_offset if offset is None else offset)
+
+    def read_rows(self, n_rows):
+        """Returns the next "n_rows" rows of the matrix of data as an
+        array with "n_rows" rows and "n_cols" columns.
+
+        Raises
+        ------
+        ValueError
+            If the file does not have the expected number of cells or
+            its heights could not be written back without changing them.
+        """
+        text = b"".join(itertools.islice(self.my_dtm, n_rows))
+        bytes_counter(len(text))
+        phase_lap("read")
+        n_cells = n_rows * self.n_cols
+        if not self.exact:
+            # the decimals are taken from the longest height of the first
+            # row
+            if self.dtype is None:
+                self.dtype = np.float64
+                self.decimals = max(
+                    [len(token) - token.index(b".") - 1
+                     for token in text.split(b"\n", 1)[0].split()
+                     if b"." in token] or [0])
+            block = np.fromstring(text, dtype=np.float64, sep=" ")
+            if block.size != n_cells:
+                raise ValueError("{} does not have {} cells in {} rows".
+                                 format(self.file_path, n_cells, n_rows))
+            phase_lap("tokenize")
+            return block.reshape(n_rows, self.n_cols)
+
+        if self.dtype is None:
+            self.dtype, self.decimals = data_format(
+                text.split(b"\n", 1)[0].split(), self.no_data_val)
+
+        n_integers = 0
+        if self.decimals:
+            n_integers = n_cells - self._validator(text)
+        elif _POINT in text:
+            raise ValueError("{} mixes integer and decimal heights".
+                             format(self.file_path))
+        self.no_data_as_int = n_integers > 0
+
+        # decimal heights are parsed faster as integers without the point,
+        # unless some of them are written as integers or as "-0.000"
+        if (self.decimals and not self.no_data_as_int
+                and _NEGATIVE_ZERO.search(text) is None):
+            block = np.fromstring(text.replace(b".", b""), dtype=np.int64,
+                                  sep=" ") / 10 ** self.decimals
+        else:
+            block = np.fromstring(text, dtype=self.dtype, sep=" ")
+
+        if block.size != n_cells:
+            raise ValueError("{} does not have {} cells in {} rows".format(
+                self.file_path, n_cells, n_rows))
+        if (self.no_data_as_int
+                and np.count_nonzero(block == self.no_data_val) < n_integers):
+            raise ValueError("{} mixes integer and decimal heights".
+                             format(self.file_path))
+        phase_lap("tokenize")
+
+        return block.reshape(n_rows, self.n_cols)
+
+    def _validator(self, text):
+        """Checks that every decimal height of a chunk has the detected
+        number of decimals, so that it can be written back without
+        changes. Returns the number of decimal heights.
+        """
+        # the padding keeps the characters looked up after the last point
+        # inside the buffer, even if its height has fewer decimals
+        buffer = np.frombuffer(text + b" " * (self.decimals + 1),
+                               dtype=np.uint8)
+        points = np.flatnonzero(buffer == _POINT)
+
+        # the character right after the last decimal must be a separator
+        # and the one before it a digit
+        after = buffer[points + self.decimals + 1]
+        last = buffer[points + self.decimals]
+        if not (np.all((after == _SPACE) | (after == _NEW_LINE)
+                       | (after == _RETURN))
+                and np.all((last >= _ZERO) & (last <= _NINE))):
+            raise ValueError("{} has heights with different precisions".
+                             format(self.file_path))
+
+        return points.size
+
+    def close(self):
+        self.my_dtm.close()
+
+
+def array_formatter(array, decimals=0, no_data_val=None):
+    """Writes an array as the lines of the matrix of data of an "asc"
+    file.
+
+    The text is built with vectorized operations over all the heights at
+    once: every height is laid out in a fixed width row of characters
+    (its digits are taken four at a time from a lookup table) and the
+    unused characters are dropped at the end.
+
+    Parameters
+    ----------
+    array : NumPy array
+        A two dimensional array with the heights.
+    decimals : int
+        The number of decimals of the heights.
+    no_data_val : int, optional
+        If given, the cells with this value are written as integers
+        even though the heights have decimals.
+
+    Returns
+    -------
+    bytes
+        The lines of the matrix of data, ending with "\\n".
+    """
+    n_cols = array.shape[1]
+    values = array.ravel()
+    n_cells = values.size
+    if n_cells == 0:
+        return b""
+
+    # every height is turned into a non negative integer with all its
+    # digits, e.g. -12.5 with 3 decimals becomes 12500
+    if decimals:
+        negative = np.signbit(values)
+        digits_val = np.rint(np.abs(values) * 10 ** decimals).astype(np.int64)
+    else:
+        negative = values < 0
+        digits_val = np.abs(values.astype(np.int64))
+
+    # number of digits written, with at least one before the point
+    n_written = np.full(n_cells, decimals + 1, dtype=np.int64)
+    power = 10 ** (decimals + 1)
+    more_digits = digits_val >= power
+    while more_digits.any():
+        n_written += more_digits
+        power *= 10
+        more_digits = digits_val >= power
+
+    # digits are laid out in groups of four, from right to left
+    n_groups = max((len(str(int(digits_val.max()))) + 3) // 4,
+                   (decimals + 4) // 4)
+    digits = np.empty((n_cells, n_groups), dtype=np.uint32)
+    written = np.empty((n_cells, n_groups), dtype=np.uint32)
+    for group in range(n_groups - 1, -1, -1):
+        digits[:, group] = _DIGITS[digits_val % 10000]
+        written[:, group] = _WRITTEN[np.clip(n_written, 0, 4)]
+        digits_val = digits_val // 10000
+        n_written -= 4
+    digits = digits.view(np.uint8)
+    written = written.view(np.uint8)
+
+    # each height is made of a sign, the integer digits, the point, the
+    # decimals and a separator (a space or "\\n" at the end of a line)
+    n_int = 4 * n_groups - decimals
+    width = 4 * n_groups + (3 if decimals else 2)
+    chars = np.empty((n_cells, width), dtype=np.uint8)
+    valid = np.empty((n_cells, width), dtype=bool)
+    chars[:, 0] = _MINUS
+    valid[:, 0] = negative
+    chars[:, 1:1 + n_int] = digits[:, :n_int]
+    valid[:, 1:1 + n_int] = written[:, :n_int]
+    if decimals:
+        chars[:, 1 + n_int] = _POINT
+        chars[:, 2 + n_int:-1] = digits[:, n_int:]
+        valid[:, 1 + n_int:-1] = True
+        if no_data_val is not None:
+            no_data = values == no_data_val
+            no_data_text = np.frombuffer(str(no_data_val).encode("ascii"),
+                                         dtype=np.uint8)
+            chars[no_data, 1 + n_int - no_data_text.size:1 + n_int] = (
+                no_data_text)
+            valid[no_data, :-1] = False
+            valid[no_data, 1 + n_int - no_data_text.size:1 + n_int] = True
+    chars[:, -1] = _SPACE
+    chars[n_cols - 1::n_cols, -1] = _NEW_LINE
+    valid[:, -1] = True
+
+    return chars[valid].tobytes()
+
+
+def tile_text(header, data):
+    """Returns the bytes of a child file out of its header and its matrix
+    of data.
+
+    Parameters
+    ----------
+    header : str
+        The six lines of the header.
+    data : bytes
+        The lines of the matrix of data, as returned by
+        "array_formatter".
+
+    Returns
+    -------
+    bytes
+        The whole child file, as written by "tile_writer".
+    """
+    header = header.encode("ascii")
+    if NEWLINE != b"\n":
+        header = header.replace(b"\n", NEWLINE)
+        data = data.replace(b"\n", NEWLINE)
+
+    return header + data + END_OF_FILE.encode("ascii")
+
+
+def tile_writer(file_path, header, data):
+    """Writes a child file out of its header and its matrix of data.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the new "asc" file.
+    header : str
+        The six lines of the header.
+    data : bytes
+        The lines of the matrix of data, as returned by
+        "array_formatter".
+
+    Returns
+    -------
+    int
+        The number of bytes written.
+    """
+    text = tile_text(header, data)
+    child_dtm = open(file=file_path, mode="wb")
+    child_dtm.write(text)
+    child_dtm.close()
+    tiles_counter(len(text))
+    phase_lap("write")
+
+    return len(text)
+
+
+class TileWriter(object):
+    """A class that writes the child files, each of them with a single
+    call to "write()".
+
+    If "threads" is bigger than 0, the files are written by that many
+    background threads, so the parent file can be read while the
+    previous child files are written. The files waiting to be written
+    are kept in a queue of "max_pending" files at most, so the memory
+    used is bounded, and every thread keeps a single file open at a
+    time.
+
+    Attributes
+    ----------
+    my_threads : list
+        The background threads, if any.
+    error : Exception
+        The first error raised by a background thread, if any.
+
+    Methods
+    -------
+    write
+        Writes a child file or sends it to the background threads.
+    close
+        Waits until every child file has been written.
+    """
+    def __init__(self, threads=0, max_pending=64):
+        self.error = None
+        self.my_threads = []
+        self.my_queue = queue.Queue(maxsize=max_pending)
+        for k in range(threads):
+            thread = threading.Thread(target=self._worker, daemon=True)
+            thread.start()
+            self.my_threads.append(thread)
+
+    def write(self, file_path, text):
+        """Writes the bytes of a child file. The time spent writing it,
+        or waiting until the queue has room for it, is the "write" phase
+        of the parent file being measured.
+
+        Parameters
+        ----------
+        file_path : str
+            The path of the new file.
+        text : bytes
+            The whole child file, as returned by "tile_text".
+
+        Returns
+        -------
+        None
+        """
+        if self.error is not None:
+            self.close()
+        tiles_counter(len(text))
+        if not self.my_threads:
+            child_dtm = open(file=file_path, mode="wb")
+            child_dtm.write(text)
+            child_dtm.close()
+        else:
+            self.my_queue.put((file_path, text))
+        phase_lap("write")
+
+    def close(self):
+        """Waits until every child file has been written and stops the
+        background threads. It can be called more than once.
+
+        Raises
+        ------
+        OSError
+            If a background thread could not write a child file.
+        """
+        for thread in self.my_threads:
+            self.my_queue.put(None)
+        for thread in self.my_threads:
+            thread.join()
+        self.my_threads = []
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
+
+    def _worker(self):
+        """Writes the child files of the queue until it gets None."""
+        for file_path, text in iter(self.my_queue.get, None):
+            # after an error, the files left are taken out of the queue
+            # but not written
+            if self.error is not None:
+                continue
+            try:
+                child_dtm = open(file=file_path, mode="wb")
+                child_dtm.write(text)
+                child_dtm.close()
+            except Exception as error:
+                self.error = error
+
+
+class LinesReader(object):
+    """A class that reads the lines of a file from a given position.
+
+    If "read_ahead" is bigger than 0, the file is read by a background
+    thread in chunks of "chunk_size" bytes, up to "read_ahead" chunks
+    ahead of the lines returned, so the disk keeps reading while the
+    lines are split and the memory used is bounded. The system is also
+    told that the file will be read sequentially, where
+    "os.posix_fadvise" exists.
+
+    Attributes
+    ----------
+    my_dtm : file object
+        The file, opened in binary mode.
+    chunk_size : int
+        The number of bytes read at once.
+
+    Methods
+    -------
+    readline
+        Returns the next line.
+    close
+        Stops the background thread and closes the file.
+    """
+    def __init__(self, file_path, offset=0, read_ahead=4,
+                 chunk_size=READ_AHEAD_BYTES):
+        self.my_dtm = open(file=file_path, mode="rb")
+        self.my_dtm.seek(offset)
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(self.my_dtm.fileno(), offset, 0,
+                                 os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        self.chunk_size = chunk_size
+        self.my_lines = []
+        self.position = 0
+        self.tail = b""
+        self.finished = False
+
+        self.thread = None
+        self.stop = False
+        if read_ahead:
+            self.my_queue = queue.Queue(maxsize=read_ahead)
+            self.thread = threading.Thread(target=self._worker, daemon=True)
+            self.thread.start()
+
+    def readline(self):
+        """Returns the next line without its line terminator, or an empty
+        bytes object at the end of the file.
+        """
+        while self.position == len(self.my_lines):
+            if self.finished:
+                return b""
+            if self.thread is None:
+                chunk = self.my_dtm.read(self.chunk_size)
+            else:
+                chunk = self.my_queue.get()
+                if isinstance(chunk, Exception):
+                    raise chunk
+            bytes_counter(len(chunk))
+            if chunk:
+                self.my_lines = (self.tail + chunk).split(b"\n")
+                # the last line might go on in the next chunk
+                self.tail = self.my_lines.pop()
+            else:
+                self.my_lines = [self.tail] if self.tail else []
+                self.finished = True
+            self.position = 0
+
+        self.position += 1
+        return self.my_lines[self.position - 1]
+
+    def close(self):
+        """Stops the background thread and closes the file. It can be
+        called more than once.
+        """
+        if self.thread is not None:
+            self.stop = True
+            # the thread might be waiting for room in the queue
+            while self.thread.is_alive():
+                try:
+                    self.my_queue.get_nowait()
+                except queue.Empty:
+                    self.thread.join(0.01)
+            self.thread = None
+        self.my_dtm.close()
+
+    def _worker(self):
+        """Reads the chunks of the file into the queue."""
+        try:
+            while not self.stop:
+                chunk = self.my_dtm.read(self.chunk_size)
+                self.my_queue.put(chunk)
+                if not chunk:
+                    break
+        except Exception as error:
+            self.my_queue.put(error)
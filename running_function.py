@@ -24,14 +24,58 @@ The header has the following elements:
 """
 
 
+import argparse
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
 
 
-from auxiliary_functions import dtm_iterator, parent_dtm_creator
-from slicer import slicer
+from auxiliary_functions import dtm_iterator, is_compressed, stats_printer
+from dtm_catalog import catalog_creator
+from instrumentation import (JsonLinesExporter, PrometheusExporter,
+                             sheet_runner)
+from metadata_catalog import HeaderCatalog
+from mosaic import mosaic_slicer
+from pyramid import AGGREGATIONS
+from slicer import (SLICING_MODES, STREAMING_MODES, raster_slicer,
+                    single_pass_slicer)
+from tile_formats import TILE_FORMATS
+from tiling_planner import plan_printer, tiling_planner
 
 
-def run_slicer(input_path, output_path, x_long, y_long):
+def record_sender(record, hooks, header_times):
+    """Sends the record of the measures of a file to the hooks.
+
+    Parameters
+    ----------
+    record : dict
+        The record of the file (see "instrumentation.sheet_runner"), or
+        None if it was not measured.
+    hooks : list
+        Functions that receive the record.
+    header_times : dict
+        The seconds spent reading the header of every file, which are
+        added to the phases of its record.
+
+    Returns
+    -------
+    None
+    """
+    if record is None:
+        return
+    if record["sheet"] in header_times:
+        record["phases"]["header"] = header_times[record["sheet"]]
+    for hook in hooks:
+        hook(record)
+
+
+def run_slicer(input_path, output_path, x_long, y_long, mode="multi_pass",
+               workers=1, catalog_path=None, tile_format="asc",
+               pyramid=None, aggregation="mean", overlap=0, hooks=None,
+               stats=False, skip_empty=False, writer_threads=0,
+               tile_size=None, target_mb=None, target_tiles=None,
+               target_workers=None):
     """Creates smaller "asc" files by slicing the original ones.
 
     The function iterates over the "asc" files contained in a given
@@ -60,6 +104,79 @@ def run_slicer(input_path, output_path, x_long, y_long):
         The maximum number of cells in the new files along the x axis.
     y_long : int
         The maximum number of cells in the new files along the y axis.
+    mode : str
+        The slicing function that will be used: "multi_pass" reads the
+        original file once per block column, "single_pass" reads it
+        only once and "raster" reads it only once into NumPy arrays.
+        "bands" slices its block rows in parallel and "mmap" writes
+        slices of its bytes. "resumable" keeps a journal of the finished
+        files, so running it again after an interruption only writes the
+        missing ones. All of them produce the same files. Compressed
+        files ("NAME.asc.gz" and "NAME.zip") are read as they are
+        decompressed, so the modes that need to move around the file are
+        replaced by "single_pass" for them. "mosaic" lays a single grid
+        of files of "x_long" x "y_long" cells over all the original files
+        (see "mosaic.mosaic_slicer"), so they line up across the borders
+        of the original files.
+    workers : int
+        The number of processes that slice files at the same time. The
+        biggest files are sliced first, and the stats of every file are
+        printed once all of them are finished. If None, the number of
+        CPUs is used. The "mosaic" mode reads all the files in a single
+        process. With more than one, every file of the "bands" mode
+        slices its block rows with its share of the CPUs.
+    catalog_path : str, optional
+        The path of a "HeaderCatalog" database. If given, the headers of
+        the files are taken from it (and added to it when they are new
+        or have changed) instead of being parsed on every run.
+    tile_format : str
+        The format of the new files, one of the keys of
+        "tile_formats.TILE_FORMATS". Formats other than "asc" are always
+        written by the "raster" mode.
+    pyramid : list, optional
+        The factors of the overviews built while the files are sliced,
+        e.g. [2, 4, 8]. The overview of factor "f" aggregates windows of
+        "f" x "f" cells and is sliced into the directory "NAME/x{f}". The
+        overviews are always built by the "raster" mode.
+    aggregation : str
+        How the cells of the overviews are aggregated, ignoring the cells
+        without data: "mean", "min" or "max".
+    overlap : int
+        The number of cells that every new file shares with each of its
+        neighbours, so its header describes a bigger area. The files
+        that overlap are written by the "single_pass" mode, unless the
+        "raster" mode is chosen or needed.
+    hooks : list, optional
+        Functions that receive the record of the measures of every file
+        once it is sliced (see "instrumentation.sheet_runner"), like
+        "instrumentation.JsonLinesExporter" or
+        "instrumentation.PrometheusExporter". The files are only
+        measured if there are any hooks.
+    stats : bool
+        If True, the stats of the heights of the new files are stored in
+        the "txt" file "output_path/NAME STATS.txt" of every original
+        file. They are only computed by the "multi_pass" mode, for
+        uncompressed files written as "asc" files without overviews or
+        overlap.
+    skip_empty : bool
+        If True, the new files without any cell with data are not
+        written. As with "stats", only the "multi_pass" mode does it.
+    writer_threads : int
+        The number of background threads that write the new files of
+        every original file while it is read by the "multi_pass" mode
+        (see "raster_io.TileWriter"). The other modes ignore it.
+    tile_size : str, optional
+        If "auto", "x_long" and "y_long" are ignored (they can be None)
+        and chosen by "tiling_planner.tiling_planner" for the files of
+        "input_path", whose plan is printed before they are sliced.
+    target_mb : float, optional
+        The maximum size of a new file in MB for the planner.
+    target_tiles : int, optional
+        The number of new files of all the original files for the
+        planner.
+    target_workers : int, optional
+        The number of downstream workers that share the new files, so
+        the planner makes their number a multiple of it.
 
     Returns
     -------
@@ -67,19 +184,114 @@ def run_slicer(input_path, output_path, x_long, y_long):
     """
     start_time = time.time()
 
+    if tile_size not in (None, "auto"):
+        raise ValueError("the tile size can only be \"auto\"")
+
+    if mode == "mosaic" and (tile_format != "asc" or pyramid or overlap):
+        raise ValueError("the \"mosaic\" mode only writes \"asc\" files "
+                         "without overviews or overlap")
+
+    if (stats or skip_empty) and (mode != "multi_pass" or tile_format != "asc"
+                                  or pyramid or overlap):
+        raise ValueError("the stats of the new files are only computed by "
+                         "the \"multi_pass\" mode, without other formats, "
+                         "overviews or overlap")
+
+    # the formats, the overviews and the overlap are only written by the
+    # modes that read the parent file from the beginning to the end
+    if tile_format != "asc" or pyramid:
+        mode = "raster"
+    elif overlap and mode not in STREAMING_MODES:
+        mode = "single_pass"
+    if mode == "raster":
+        slicer = partial(raster_slicer, tile_format=tile_format,
+                         pyramid=pyramid, aggregation=aggregation,
+                         overlap=overlap)
+    elif overlap:
+        slicer = partial(single_pass_slicer, overlap=overlap)
+    elif mode == "multi_pass":
+        slicer = partial(SLICING_MODES[mode], stats=stats,
+                         skip_empty=skip_empty, threads=writer_threads)
+    elif mode != "mosaic":
+        slicer = SLICING_MODES[mode]
+    # compressed files can only be read from the beginning to the end
+    if mode in STREAMING_MODES:
+        stream_slicer = slicer
+    else:
+        stream_slicer = SLICING_MODES["single_pass"]
+
     # creates a list with the names of each DTM file contained in a
     # given directory
     my_dtms = dtm_iterator(input_path)
+    if (stats or skip_empty) and any(is_compressed(dtm) for dtm in my_dtms):
+        raise ValueError("the stats of the new files are only computed for "
+                         "uncompressed files")
 
-    # creates a list of ParentDtm instances
-    my_parent_dtms = []
-    for dtm in my_dtms:
-        my_parent_dtms.append(parent_dtm_creator(input_path, dtm))
+    # creates a catalog with the attributes of all the files, which
+    # gives a ParentDtm instance for each of them
+    catalog = None
+    if catalog_path is not None:
+        catalog = HeaderCatalog(catalog_path)
+    header_times = {}
+    my_parent_dtms = catalog_creator(input_path, my_dtms, catalog,
+                                     header_times)
+    if catalog is not None:
+        catalog.close()
+
+    if tile_size == "auto":
+        my_plan = tiling_planner(my_parent_dtms, input_path, target_mb,
+                                 target_tiles, target_workers, mode,
+                                 output_path)
+        plan_printer(my_plan)
+        x_long = my_plan.x_long
+        y_long = my_plan.y_long
+
+    if workers is None:
+        workers = os.cpu_count()
+    # the processes of the "bands" mode share the CPUs with the ones that
+    # slice other files at the same time, instead of taking all of them
+    if mode == "bands" and workers > 1:
+        slicer = partial(slicer, workers=max(1, os.cpu_count() // workers))
 
     # iterates over the list of ParentDtm instances and creates new
-    # dtm files
-    for ParentDtm in my_parent_dtms:
-        slicer(ParentDtm, x_long, y_long, input_path, output_path)
+    # dtm files, whose records are sent to the hooks as soon as they are
+    # sliced
+    if mode == "mosaic":
+        record_sender(sheet_runner(mosaic_slicer, bool(hooks), my_parent_dtms,
+                                   x_long, y_long, input_path,
+                                   output_path)[1], hooks, header_times)
+    elif workers == 1:
+        for ParentDtm in my_parent_dtms:
+            if is_compressed(ParentDtm.get_name()):
+                my_slicer = stream_slicer
+            else:
+                my_slicer = slicer
+            record_sender(sheet_runner(my_slicer, bool(hooks), ParentDtm,
+                                       x_long, y_long, input_path,
+                                       output_path)[1], hooks, header_times)
+    else:
+        # the biggest files are sent first so that they do not end up
+        # running alone at the end
+        my_jobs = my_parent_dtms.sort(
+            [os.stat(os.path.join(input_path, dtm))[6] for dtm in my_dtms],
+            reverse=True)
+        my_stats = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            my_futures = [executor.submit(
+                sheet_runner, stream_slicer
+                if is_compressed(ParentDtm.get_name()) else slicer,
+                bool(hooks), ParentDtm, x_long, y_long, input_path,
+                output_path, verbose=False) for ParentDtm in my_jobs]
+            # the records are sent in the order in which the files end
+            for future in as_completed(my_futures):
+                (file_name, file_size_mb, abs_process_time), record = (
+                    future.result())
+                record_sender(record, hooks, header_times)
+                my_stats[file_name] = (file_size_mb, abs_process_time)
+
+        # the stats are printed in the order of the files
+        for ParentDtm in my_parent_dtms:
+            stats_printer(ParentDtm, *my_stats[ParentDtm.get_name()])
 
     abs_process_time = time.time() - start_time
     print("")
@@ -100,3 +312,82 @@ def run_slicer(input_path, output_path, x_long, y_long):
               format(round(abs_process_time, 2)))
     print("TIME: {}".format(time.strftime("%H:%M:%S", time.localtime())))
     print("")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Slices the \"asc\" files of a directory.")
+    parser.add_argument("input_path",
+                        help="path that contains the original files")
+    parser.add_argument("output_path",
+                        help="path that will store the new files")
+    parser.add_argument("x_long", type=int, nargs="?",
+                        help="maximum number of cells along the x axis")
+    parser.add_argument("y_long", type=int, nargs="?",
+                        help="maximum number of cells along the y axis")
+    parser.add_argument("--tile-size", choices=["auto"],
+                        help="choose x_long and y_long for the targets "
+                             "below")
+    parser.add_argument("--target-mb", type=float,
+                        help="maximum size of a new file in MB (--tile-size "
+                             "auto only)")
+    parser.add_argument("--target-tiles", type=int,
+                        help="number of new files of all the original files "
+                             "(--tile-size auto only)")
+    parser.add_argument("--target-workers", type=int,
+                        help="number of downstream workers that share the "
+                             "new files (--tile-size auto only)")
+    parser.add_argument("--mode", default="multi_pass",
+                        choices=sorted(list(SLICING_MODES) + ["mosaic"]),
+                        help="slicing function (default: multi_pass)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of files sliced at the same time "
+                             "(default: 1)")
+    parser.add_argument("--catalog",
+                        help="SQLite database that caches the headers")
+    parser.add_argument("--format", default="asc",
+                        choices=sorted(TILE_FORMATS),
+                        help="format of the new files (default: asc)")
+    parser.add_argument("--pyramid", type=int, nargs="+",
+                        help="factors of the overviews, e.g. 2 4 8")
+    parser.add_argument("--aggregation", default="mean",
+                        choices=AGGREGATIONS,
+                        help="how the cells of the overviews are "
+                             "aggregated (default: mean)")
+    parser.add_argument("--overlap", type=int, default=0,
+                        help="number of cells shared by neighbouring files "
+                             "(default: 0)")
+    parser.add_argument("--metrics-jsonl",
+                        help="JSON-lines file that receives the measures "
+                             "of every file")
+    parser.add_argument("--metrics-prom",
+                        help="Prometheus text file with the totals of the "
+                             "measures")
+    parser.add_argument("--stats", action="store_true",
+                        help="store the stats of the heights of the new "
+                             "files (multi_pass mode only)")
+    parser.add_argument("--skip-empty", action="store_true",
+                        help="do not write the new files without data "
+                             "(multi_pass mode only)")
+    parser.add_argument("--writer-threads", type=int, default=0,
+                        help="number of threads that write the new files "
+                             "(multi_pass mode only, default: 0)")
+    args = parser.parse_args()
+    if args.tile_size is None and (args.x_long is None or args.y_long is None):
+        parser.error("x_long and y_long are required without --tile-size")
+
+    my_hooks = []
+    if args.metrics_jsonl:
+        my_hooks.append(JsonLinesExporter(args.metrics_jsonl))
+    if args.metrics_prom:
+        my_hooks.append(PrometheusExporter(args.metrics_prom))
+
+    run_slicer(args.input_path, args.output_path, args.x_long, args.y_long,
+               mode=args.mode, workers=args.workers,
+               catalog_path=args.catalog, tile_format=args.format,
+               pyramid=args.pyramid, aggregation=args.aggregation,
+               overlap=args.overlap, hooks=my_hooks, stats=args.stats,
+               skip_empty=args.skip_empty,
+               writer_threads=args.writer_threads, tile_size=args.tile_size,
+               target_mb=args.target_mb, target_tiles=args.target_tiles,
+               target_workers=args.target_workers)
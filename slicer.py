@@ -1,13 +1,56 @@
-"""This module defines the "slicer" function."""
+"""This module defines the functions that slice "asc" files.
 
+This module contains the following functions:
+    * slicer - reads the parent file once per block column
+    * block_lines - reads the rows of a child file out of the parent file
+    * lines_text - returns the bytes of a child file out of its rows
+    * single_pass_slicer - reads the parent file only once
+    * raster_slicer - reads the parent file only once into arrays
+    * band_slicer - slices the block rows of the parent file in parallel
+    * band_writer - writes the child files of a single block row
+    * mmap_slicer - slices the bytes of the parent file without decoding
+    * height_bounds - finds where the heights of some rows start and end
+    * buffers_writer - writes a list of buffers to a file
+    * resumable_slicer - slices the parent file keeping a journal, so an
+    interrupted run can go on from where it stopped
+    * journal_reader - reads the journal of a parent file
+"""
 
+
+import mmap
 import os
+import shutil
 import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from auxiliary_functions import (END_OF_FILE, child_dtm_attributes,
+                                 child_dtm_name, child_dtm_window,
+                                 dtm_header, dtm_open, slicer_blueprint,
+                                 stats_printer)
+from dtm_index import index_reader, row_index, rows_reader
+from instrumentation import (SheetMetrics, bytes_counter, current_metrics,
+                             phase_lap, tiles_counter)
+from pyramid import OverviewWriter, pyramid_builder
+from raster_io import (NEWLINE, AscReader, LinesReader, TileWriter,
+                       tile_text, tile_writer)
+from tile_formats import TILE_FORMATS
+from tile_stats import TilesStats
 
-from auxiliary_functions import slicer_blueprint
 
+# maximum number of buffers that can be written with a single call to
+# "os.writev"
+if hasattr(os, "sysconf") and "SC_IOV_MAX" in os.sysconf_names:
+    IOV_MAX = os.sysconf("SC_IOV_MAX")
+else:
+    IOV_MAX = 1024
 
-def slicer(ParentDtm, x_long, y_long, input_path, output_path):
+
+def slicer(ParentDtm, x_long, y_long, input_path, output_path,
+           verbose=True, stats=False, skip_empty=False, threads=0,
+           read_ahead=4):
     """Creates new "asc" files.
 
     This function uses the attributes of a "ParentDtm" class to slice
@@ -35,15 +78,43 @@ def slicer(ParentDtm, x_long, y_long, input_path, output_path):
         The path that contains the original "asc" files.
     output_path : str
         The path that will store the new "asc" files.
+    verbose : bool
+        If True, the size and processing time of the file are printed.
+    stats : bool
+        If True, the minimum, maximum, mean and standard deviation of the
+        heights of every new file and its share of cells without data are
+        computed as it is written, and stored in the "txt" file
+        "output_path/NAME STATS.txt" (see "tile_stats.TilesStats").
+    skip_empty : bool
+        If True, the new files without any cell with data are not
+        written.
+    threads : int
+        The number of background threads that write the new files (see
+        "raster_io.TileWriter"). If 0, they are written as they are
+        read.
+    read_ahead : int
+        The number of chunks of the parent file that a background thread
+        reads ahead of the rows being sliced (see
+        "raster_io.LinesReader"). If 0, the rows are read as they are
+        sliced.
 
     Returns
     -------
-    None
+    tuple
+        The name of the file, its size in MB and its processing time in
+        seconds.
     """
     start_time = time.time()
 
+    # the rows of every new file are read before it is created, so its
+    # stats are known when it is written
+    my_stats = None
+    if stats or skip_empty:
+        my_stats = TilesStats(ParentDtm)
+
     # a new directory is created with the name of the origial DTM
-    os.mkdir(os.path.join(output_path, ParentDtm.get_name().split(".")[0]))
+    os.makedirs(os.path.join(output_path, ParentDtm.get_name().split(".")[0]),
+                exist_ok=True)
 
     # size and time variables defined for stats
     file_size = os.stat(os.path.join(input_path, ParentDtm.get_name()))[6]
@@ -54,19 +125,32 @@ def slicer(ParentDtm, x_long, y_long, input_path, output_path):
     n_sliced_cols = blueprint[0]
     n_sliced_rows = blueprint[1]
 
-    # uses the function "tell()" to determine where the heigh data starts.
-    # that value will be assigned to the variable "offset".
-    my_dtm = open(file=os.path.join(input_path, ParentDtm.get_name()),
-                  mode="r")
-    offset = 0
-    line_counter = 0
-    for line in iter(my_dtm.readline, ""):
-        if line_counter < 6:
-            offset = my_dtm.tell()
-            line_counter += 1
-        else:
-            break
-    my_dtm.close()
+    # the position where the heigh data starts is taken from the
+    # "ParentDtm" instance or the index of the file when they know it.
+    # Otherwise, uses the function "tell()" to determine it. That value
+    # will be assigned to the variable "offset".
+    offset = ParentDtm.get_data_offset()
+    if offset is None:
+        my_index = index_reader(os.path.join(input_path,
+                                             ParentDtm.get_name()))
+        if my_index is not None:
+            offset = int(my_index[1][0])
+    if offset is None:
+        my_dtm = open(file=os.path.join(input_path, ParentDtm.get_name()),
+                      mode="r")
+        offset = 0
+        line_counter = 0
+        for line in iter(my_dtm.readline, ""):
+            if line_counter < 6:
+                offset = my_dtm.tell()
+                line_counter += 1
+            else:
+                break
+        my_dtm.close()
+        bytes_counter(offset)
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.lap("header")
 
     # calculates the remaining cells along the x axis
     last_x_cells = ParentDtm.get_n_cols() % x_long
@@ -77,234 +161,113 @@ def slicer(ParentDtm, x_long, y_long, input_path, output_path):
     n = 0
     m = x_long
 
+    # every new file is written at once
+    child_writer = TileWriter(threads)
+    parent_dtm = None
+
     try:
         # iterates over the parent dtm "n_sliced_cols" times
         for i in range(n_sliced_cols):
-            start_reading = offset
+            # the rows of the parent file are read ahead while they are
+            # sliced
+            parent_dtm = LinesReader(os.path.join(input_path,
+                                                  ParentDtm.get_name()),
+                                     offset, read_ahead)
             # iterates over the parent dtm "n_sliced_rows" times
             for j in range(n_sliced_rows, 0, -1):
-                parent_dtm = open(file=os.path.join(input_path,
-                                  ParentDtm.get_name()), mode="r")
-                parent_dtm.seek(start_reading)
+                # the path of the new file and the last four values of its
+                # header
+                child_path = os.path.join(
+                    output_path, "{}\\{}_{}_{}.{}".format(
+                        ParentDtm.get_name().split(".")[0],
+                        ParentDtm.get_name().split(".")[0], i + 1, j,
+                        ParentDtm.get_name().split(".")[1]))
+                my_header = [
+                    ParentDtm.get_x()
+                    + ((ParentDtm.get_cell_size() * x_long) * i),
+                    ParentDtm.get_y()
+                    + ((ParentDtm.get_cell_size() * y_long) * (j - 1)),
+                    ParentDtm.get_cell_size(), ParentDtm.get_no_data_val()]
+
                 # what happens at the top block row
                 if j == n_sliced_rows:
                     # each column of the top block row but the last one
                     if (i + 1) != n_sliced_cols:
                         # there are remaining cells along the Y axis
                         if last_y_cells != 0:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(x_long))
-                            child_dtm.write("NROWS {}\n".format(last_y_cells))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(last_y_cells):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(
+                                parent_dtm, last_y_cells, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [x_long, last_y_cells] + my_header, my_lines))
 
                         # there are not remaining cells along the Y axis
                         else:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(x_long))
-                            child_dtm.write("NROWS {}\n".format(y_long))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(y_long):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(parent_dtm, y_long, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [x_long, y_long] + my_header, my_lines))
 
                     # the last block column at the top block row
                     else:
 
                         # there are remaining cells along the Y and X axis
                         if last_y_cells != 0 and last_x_cells != 0:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(last_x_cells))
-                            child_dtm.write("NROWS {}\n".format(last_y_cells))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(last_y_cells):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(
+                                parent_dtm, last_y_cells, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [last_x_cells, last_y_cells] + my_header,
+                                my_lines))
 
                         # there are remaining cells along the Y axis but not
                         # along the X axis
                         elif last_y_cells != 0 and last_x_cells == 0:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(x_long))
-                            child_dtm.write("NROWS {}\n".format(last_y_cells))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(last_y_cells):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(
+                                parent_dtm, last_y_cells, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [x_long, last_y_cells] + my_header, my_lines))
 
                         # there are remaining cells along the X axis but not
                         # along the Y axis
                         elif last_y_cells == 0 and last_x_cells != 0:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(last_x_cells))
-                            child_dtm.write("NROWS {}\n".format(y_long))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(y_long):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(parent_dtm, y_long, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [last_x_cells, y_long] + my_header, my_lines))
 
                         # there are not remaining cells along either of the
                         # axis
                         else:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(x_long))
-                            child_dtm.write("NROWS {}\n".format(y_long))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(y_long):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(parent_dtm, y_long, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [x_long, y_long] + my_header, my_lines))
 
                 # what happens at any row block but the one on the top
                 else:
@@ -314,113 +277,44 @@ def slicer(ParentDtm, x_long, y_long, input_path, output_path):
 
                         # there are remaining cells along the X axis
                         if last_x_cells != 0:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(last_x_cells))
-                            child_dtm.write("NROWS {}\n".format(y_long))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(y_long):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(parent_dtm, y_long, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [last_x_cells, y_long] + my_header, my_lines))
 
                         # there are not remaining cells along the X axis
                         else:
-                            child_dtm = open(
-                                file=os.path.join(
-                                    output_path,
-                                    "{}\\{}_{}_{}.{}".format(
-                                        ParentDtm.get_name().split(".")[0],
-                                        ParentDtm.get_name().split(".")[0],
-                                        i + 1, j,
-                                        ParentDtm.get_name().split(".")[1])),
-                                mode="w", encoding="ascii")
-                            child_dtm.write("NCOLS {}\n".format(x_long))
-                            child_dtm.write("NROWS {}\n".format(y_long))
-                            child_dtm.write("XLLCENTER {}\n".format(
-                                ParentDtm.get_x()
-                                + ((ParentDtm.get_cell_size() * x_long) * i)))
-                            child_dtm.write("YLLCENTER {}\n".format(
-                                ParentDtm.get_y()
-                                + ((ParentDtm.get_cell_size() * y_long)
-                                    * (j - 1))))
-                            child_dtm.write("CELLSIZE {}\n".format(
-                                ParentDtm.get_cell_size()))
-                            child_dtm.write("NODATA_VALUE {}\n".format(
-                                ParentDtm.get_no_data_val()))
-
-                            for k in range(y_long):
-                                my_line = " "
-                                my_list = parent_dtm.readline().split()[n:m]
-                                my_line = my_line.join(my_list)
-                                child_dtm.write(my_line + "\n")
-                            child_dtm.write("")
-                            child_dtm.close()
-                            start_reading = parent_dtm.tell()
-                            parent_dtm.close()
+                            my_lines = block_lines(parent_dtm, y_long, n, m)
+                            if (my_stats is not None
+                                    and not my_stats.add(i + 1, j, my_lines)
+                                    and skip_empty):
+                                continue
+
+                            child_writer.write(child_path, lines_text(
+                                [x_long, y_long] + my_header, my_lines))
 
                     # any column but the last one
                     else:
-                        child_dtm = open(
-                            file=os.path.join(
-                                output_path,
-                                "{}\\{}_{}_{}.{}".format(
-                                    ParentDtm.get_name().split(".")[0],
-                                    ParentDtm.get_name().split(".")[0],
-                                    i + 1, j,
-                                    ParentDtm.get_name().split(".")[1])),
-                            mode="w", encoding="ascii")
-                        child_dtm.write("NCOLS {}\n".format(x_long))
-                        child_dtm.write("NROWS {}\n".format(y_long))
-                        child_dtm.write("XLLCENTER {}\n".format(
-                            ParentDtm.get_x()
-                            + ((ParentDtm.get_cell_size() * x_long) * i)))
-                        child_dtm.write("YLLCENTER {}\n".format(
-                            ParentDtm.get_y()
-                            + ((ParentDtm.get_cell_size() * y_long)
-                                * (j - 1))))
-                        child_dtm.write("CELLSIZE {}\n".format(
-                            ParentDtm.get_cell_size()))
-                        child_dtm.write("NODATA_VALUE {}\n".format(
-                            ParentDtm.get_no_data_val()))
-
-                        for k in range(y_long):
-                            my_line = " "
-                            my_list = parent_dtm.readline().split()[n:m]
-                            my_line = my_line.join(my_list)
-                            child_dtm.write(my_line + "\n")
-                        child_dtm.write("")
-                        child_dtm.close()
-                        start_reading = parent_dtm.tell()
-                        parent_dtm.close()
+                        my_lines = block_lines(parent_dtm, y_long, n, m)
+                        if (my_stats is not None
+                                and not my_stats.add(i + 1, j, my_lines)
+                                and skip_empty):
+                            continue
+
+                        child_writer.write(child_path, lines_text(
+                            [x_long, y_long] + my_header, my_lines))
 
             # changes the "n" and "m" values along the x axis according to the
             # defined length of the children blocks
             n += x_long
             m += x_long
+            parent_dtm.close()
+
+        child_writer.close()
 
     except PermissionError:
         print("    __File {} is broken__".format(ParentDtm.get_name()))
@@ -430,14 +324,971 @@ def slicer(ParentDtm, x_long, y_long, input_path, output_path):
         my_txt.close()
         pass
 
+    finally:
+        if parent_dtm is not None:
+            parent_dtm.close()
+        child_writer.close()
+
+    if stats:
+        my_stats.write(os.path.join(output_path, "{} STATS.txt".format(
+            ParentDtm.get_name().split(".")[0])))
+
+    # the child files still waiting in the queue have been written
+    if metrics is not None:
+        metrics.lap("write")
+
+    abs_process_time = time.time() - start_time
+    if verbose:
+        stats_printer(ParentDtm, file_size_mb, abs_process_time)
+
+    return (ParentDtm.get_name(), file_size_mb, abs_process_time)
+
+
+def block_lines(parent_dtm, n_rows, n, m):
+    """Reads the next rows of a parent file and returns the heights of
+    each of them from "n" to "m", as bytes without line terminators.
+
+    If the parent file is being measured, the time spent reading the
+    rows, splitting them and joining the heights of the child file is
+    added to the "read", "tokenize" and "format" phases.
+    """
+    metrics = current_metrics()
+    if metrics is None:
+        return [b" ".join(parent_dtm.readline().split()[n:m])
+                for k in range(n_rows)]
+
+    my_lines = []
+    for k in range(n_rows):
+        line = parent_dtm.readline()
+        metrics.lap("read")
+        my_list = line.split()
+        metrics.lap("tokenize")
+        my_lines.append(b" ".join(my_list[n:m]))
+        metrics.lap("format")
+
+    return my_lines
+
+
+def lines_text(dtm_attributes, my_lines):
+    """Returns the bytes of a child file out of the six values of its
+    header and its rows, as bytes without line terminators. The time
+    spent since the last lap is added to the "format" phase of the
+    parent file being measured.
+    """
+    text = tile_text(dtm_header(*dtm_attributes),
+                     b"\n".join(my_lines + [b""]))
+    phase_lap("format")
+
+    return text
+
+
+def single_pass_slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                       verbose=True, overlap=0):
+    """Creates new "asc" files reading the parent file only once.
+
+    Produces the same files as "slicer", but instead of reading the
+    parent file once per block column, it streams each block row once
+    and writes its lines to all the child files of that block row.
+    Hence, every line of the parent file is read and split a single
+    time. Since the parent file is read from the beginning to the end,
+    it might be compressed (see "auxiliary_functions.dtm_open").
+
+    The child files might overlap their neighbours (see
+    "auxiliary_functions.child_dtm_window"). The lines shared by two
+    block rows are kept until both of them are written, so they are
+    still read only once.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    verbose : bool
+        If True, the size and processing time of the file are printed.
+    overlap : int
+        The number of cells that every child file shares with each of
+        its neighbours.
+
+    Returns
+    -------
+    tuple
+        The name of the file, its size in MB and its processing time in
+        seconds.
+    """
+    start_time = time.time()
+
+    # a new directory is created with the name of the origial DTM
+    dtm_path = os.path.join(output_path, ParentDtm.get_name().split(".")[0])
+    os.makedirs(dtm_path, exist_ok=True)
+
+    # size and time variables defined for stats
+    file_size = os.stat(os.path.join(input_path, ParentDtm.get_name()))[6]
+    file_size_mb = file_size / 1e+6
+
+    # gets the number of slices along the x & y axis
+    n_sliced_cols, n_sliced_rows = slicer_blueprint(ParentDtm, x_long, y_long)
+
+    try:
+        parent_dtm = dtm_open(os.path.join(input_path, ParentDtm.get_name()),
+                              mode="r")
+        # skips the header
+        for line_counter in range(6):
+            parent_dtm.readline()
+
+        # the split lines that are kept and the row of the first one
+        my_lines = []
+        first_row = 0
+        metrics = current_metrics()
+
+        # iterates over the block rows from top to bottom
+        for j in range(n_sliced_rows, 0, -1):
+            top, n_rows = child_dtm_window(ParentDtm, x_long, y_long, 1, j,
+                                           overlap)[2:4]
+            # each line is split once and kept while it is needed
+            del my_lines[:top - first_row]
+            first_row = top
+            my_rows = [parent_dtm.readline()
+                       for k in range(n_rows - len(my_lines))]
+            if metrics is not None:
+                metrics.lap("read")
+            my_lines += [line.split() for line in my_rows]
+            if metrics is not None:
+                metrics.lap("tokenize")
+
+            for i in range(1, n_sliced_cols + 1):
+                n, n_cols, top, n_rows, x_coord, y_coord = child_dtm_window(
+                    ParentDtm, x_long, y_long, i, j, overlap)
+                my_text = dtm_header(n_cols, n_rows, x_coord, y_coord,
+                                     ParentDtm.get_cell_size(),
+                                     ParentDtm.get_no_data_val())
+                my_text += "".join(" ".join(my_list[n:n + n_cols]) + "\n"
+                                   for my_list in my_lines[:n_rows])
+                my_text += END_OF_FILE
+                if metrics is not None:
+                    metrics.lap("format")
+                child_dtm = open(
+                    file=os.path.join(dtm_path,
+                                      child_dtm_name(ParentDtm, i, j)),
+                    mode="w", encoding="ascii")
+                child_dtm.write(my_text)
+                tiles_counter(child_dtm.tell())
+                child_dtm.close()
+                if metrics is not None:
+                    metrics.lap("write")
+
+        # the bytes of the file (decompressed, if it is compressed) that
+        # were read
+        bytes_counter(parent_dtm.buffer.tell())
+        parent_dtm.close()
+
+    except PermissionError:
+        print("    __File {} is broken__".format(ParentDtm.get_name()))
+        my_txt = open(file=os.path.join(input_path, "BROKEN FILES.txt"),
+                      mode="a", encoding="ascii")
+        my_txt.write("{}\n".format(ParentDtm.get_name()))
+        my_txt.close()
+
+    abs_process_time = time.time() - start_time
+    if verbose:
+        stats_printer(ParentDtm, file_size_mb, abs_process_time)
+
+    return (ParentDtm.get_name(), file_size_mb, abs_process_time)
+
+
+def raster_slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                  verbose=True, tile_format="asc", pyramid=None,
+                  aggregation="mean", overlap=0):
+    """Creates new "asc" files parsing the parent file into arrays.
+
+    Produces the same files as "single_pass_slicer", but each block row
+    is parsed in bulk into a NumPy array and the child files are written
+    from views of it, without creating a string for every cell. Only one
+    block row (and the rows that overlap it) is kept in memory.
+
+    The child files can be written in any of the formats of
+    "tile_formats.TILE_FORMATS". If the heights of the parent file can
+    not be written back without changing their text (e.g. they mix
+    several precisions), the file is sliced with "single_pass_slicer"
+    instead, and the new files are then converted to the format if it
+    keeps the text (binary formats do not need to).
+
+    Overviews of the parent file (see "pyramid.OverviewWriter") can be
+    built out of the same arrays, so the parent file is still read only
+    once.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    verbose : bool
+        If True, the size and processing time of the file are printed.
+    tile_format : str
+        The format of the new files, one of the keys of
+        "tile_formats.TILE_FORMATS".
+    pyramid : list, optional
+        The factors of the overviews that will be built, e.g. [2, 4, 8].
+    aggregation : str
+        How the cells of the overviews are aggregated: "mean", "min" or
+        "max".
+    overlap : int
+        The number of cells that every child file shares with each of
+        its neighbours.
+
+    Returns
+    -------
+    tuple
+        The name of the file, its size in MB and its processing time in
+        seconds.
+    """
+    start_time = time.time()
+
+    # a new directory is created with the name of the origial DTM
+    dtm_path = os.path.join(output_path, ParentDtm.get_name().split(".")[0])
+    os.makedirs(dtm_path, exist_ok=True)
+
+    # size and time variables defined for stats
+    file_size = os.stat(os.path.join(input_path, ParentDtm.get_name()))[6]
+    file_size_mb = file_size / 1e+6
+
+    # gets the number of slices along the x & y axis
+    n_sliced_cols, n_sliced_rows = slicer_blueprint(ParentDtm, x_long, y_long)
+
+    writer = TILE_FORMATS[tile_format](dtm_path, ParentDtm, x_long, y_long)
+    my_overviews = [OverviewWriter(factor, ParentDtm, x_long, y_long,
+                                   dtm_path, aggregation)
+                    for factor in pyramid or []]
+    try:
+        reader = AscReader(os.path.join(input_path, ParentDtm.get_name()),
+                           exact=writer.text)
+        try:
+            # the rows that are kept and the row of the first one
+            block = None
+            first_row = 0
+            my_formats = set()
+            metrics = current_metrics()
+
+            # iterates over the block rows from top to bottom
+            for j in range(n_sliced_rows, 0, -1):
+                top, n_rows = child_dtm_window(ParentDtm, x_long, y_long,
+                                               1, j, overlap)[2:4]
+                n_kept = 0
+                if block is not None:
+                    block = block[top - first_row:]
+                    n_kept = block.shape[0]
+                first_row = top
+                if n_kept < n_rows:
+                    # the reader and the writer add the time of their own
+                    # phases
+                    new_block = reader.read_rows(n_rows - n_kept)
+                    for overview in my_overviews:
+                        overview.add_rows(new_block, reader.decimals)
+                    if metrics is not None and my_overviews:
+                        metrics.lap("overviews")
+                    if block is None:
+                        block = new_block
+                    else:
+                        block = np.concatenate((block, new_block))
+                    # the rows shared by two block rows must write their
+                    # cells without data in the same way
+                    my_formats.add(reader.no_data_as_int)
+                    if overlap and len(my_formats) > 1:
+                        raise ValueError("{} writes its cells without data "
+                                         "in different ways".format(
+                                             ParentDtm.get_name()))
+                no_data_val = None
+                if reader.no_data_as_int:
+                    no_data_val = ParentDtm.get_no_data_val()
+
+                for i in range(1, n_sliced_cols + 1):
+                    n, n_cols, top, n_rows, x_coord, y_coord = (
+                        child_dtm_window(ParentDtm, x_long, y_long, i, j,
+                                         overlap))
+                    writer.write(i, j, [n_cols, n_rows, x_coord, y_coord,
+                                        ParentDtm.get_cell_size(),
+                                        ParentDtm.get_no_data_val()],
+                                 block[:n_rows, n:n + n_cols],
+                                 reader.decimals, no_data_val)
+        finally:
+            reader.close()
+            writer.close()
+        for overview in my_overviews:
+            overview.close()
+
+    except PermissionError:
+        print("    __File {} is broken__".format(ParentDtm.get_name()))
+        my_txt = open(file=os.path.join(input_path, "BROKEN FILES.txt"),
+                      mode="a", encoding="ascii")
+        my_txt.write("{}\n".format(ParentDtm.get_name()))
+        my_txt.close()
+
+    except ValueError as error:
+        if not writer.text:
+            raise
+        print("    __File {} will be sliced as text: {}__".format(
+            ParentDtm.get_name(), error))
+        shutil.rmtree(dtm_path)
+        my_stats = single_pass_slicer(ParentDtm, x_long, y_long, input_path,
+                                      output_path, verbose, overlap)
+        if tile_format != "asc":
+            # the "asc" files are converted to the chosen format
+            os.makedirs(dtm_path, exist_ok=True)
+            writer = TILE_FORMATS[tile_format](dtm_path, ParentDtm, x_long,
+                                               y_long)
+            for i in range(1, n_sliced_cols + 1):
+                for j in range(1, n_sliced_rows + 1):
+                    child_path = os.path.join(
+                        dtm_path, child_dtm_name(ParentDtm, i, j))
+                    child_dtm = open(file=child_path, mode="rb")
+                    writer.write_text(i, j, child_dtm.read())
+                    child_dtm.close()
+                    os.remove(child_path)
+            writer.close()
+        if pyramid:
+            pyramid_builder(ParentDtm, x_long, y_long, input_path, dtm_path,
+                            pyramid, aggregation)
+        return my_stats
+
+    abs_process_time = time.time() - start_time
+    if verbose:
+        stats_printer(ParentDtm, file_size_mb, abs_process_time)
+
+    return (ParentDtm.get_name(), file_size_mb, abs_process_time)
+
+
+def band_slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                verbose=True, workers=None):
+    """Creates new "asc" files slicing several block rows at the same
+    time.
+
+    First, the position of every row of the parent file is taken from
+    its index (see "dtm_index.row_index"), which is built and stored
+    next to the file the first time. Then, each block row ("y_long" rows
+    of the parent file) is sent to a different process, which reads only
+    that part of the file and writes its child files with "band_writer".
+    The files created are the same as the ones created by "slicer". The
+    seconds of the phases of all the processes are added up, so they can
+    be more than the processing time of the file.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    verbose : bool
+        If True, the size and processing time of the file are printed.
+    workers : int
+        The number of processes that write block rows at the same time.
+        If None, the number of CPUs is used.
+
+    Returns
+    -------
+    tuple
+        The name of the file, its size in MB and its processing time in
+        seconds.
+    """
+    start_time = time.time()
+
+    # a new directory is created with the name of the origial DTM
+    dtm_path = os.path.join(output_path, ParentDtm.get_name().split(".")[0])
+    os.makedirs(dtm_path, exist_ok=True)
+
+    # size and time variables defined for stats
+    file_size = os.stat(os.path.join(input_path, ParentDtm.get_name()))[6]
+    file_size_mb = file_size / 1e+6
+
+    # gets the number of slices along the y axis
+    n_sliced_rows = slicer_blueprint(ParentDtm, x_long, y_long)[1]
+
+    try:
+        my_offsets = row_index(os.path.join(input_path,
+                                            ParentDtm.get_name()))[1]
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            my_futures = []
+            first_row = 0
+            # block rows are sent from top to bottom
+            for j in range(n_sliced_rows, 0, -1):
+                n_rows = child_dtm_attributes(ParentDtm, x_long, y_long,
+                                              1, j)[1]
+                my_futures.append(executor.submit(
+                    band_writer, ParentDtm, x_long, y_long, input_path,
+                    dtm_path, j, my_offsets[first_row:first_row + n_rows + 1]))
+                first_row += n_rows
+            # the child processes do not share the measures, so they
+            # return theirs, and the seconds of their phases are added up
+            metrics = current_metrics()
+            for future in my_futures:
+                bytes_read, bytes_written, n_tiles, my_phases = (
+                    future.result())
+                bytes_counter(bytes_read)
+                tiles_counter(bytes_written, n_tiles)
+                if metrics is not None:
+                    for phase, seconds in my_phases.items():
+                        metrics.phases[phase] = (
+                            metrics.phases.get(phase, 0.0) + seconds)
+
+    except PermissionError:
+        print("    __File {} is broken__".format(ParentDtm.get_name()))
+        my_txt = open(file=os.path.join(input_path, "BROKEN FILES.txt"),
+                      mode="a", encoding="ascii")
+        my_txt.write("{}\n".format(ParentDtm.get_name()))
+        my_txt.close()
+
     abs_process_time = time.time() - start_time
-    rel_process_time = abs_process_time / file_size_mb
-    print("")
-    print("    File name: {}".format(ParentDtm.get_name()))
-    print("    File size: {} MB".format(round(file_size_mb, 2)))
-    print("    ABSOLUTE processing time: {} seconds".
-          format(round(abs_process_time, 2)))
-    print("    RELATIVE processing time: {} sec/MB".
-          format(round(rel_process_time, 2)))
-    print("    TIME: {}".format(time.strftime("%H:%M:%S", time.localtime())))
-    print("")
+    if verbose:
+        stats_printer(ParentDtm, file_size_mb, abs_process_time)
+
+    return (ParentDtm.get_name(), file_size_mb, abs_process_time)
+
+
+def band_writer(ParentDtm, x_long, y_long, input_path, dtm_path, row,
+                my_offsets):
+    """Writes the child files of a single block row of a parent file.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    dtm_path : str
+        The directory that will store the new "asc" files.
+    row : int
+        The block row, starting at 1 at the bottom.
+    my_offsets : NumPy array
+        The positions of the rows of the block row in the parent file,
+        plus the position where the block row ends.
+
+    Returns
+    -------
+    tuple
+        The bytes read from the parent file, the bytes written, the
+        number of child files written and the seconds of the phases of
+        the block row (see "instrumentation.SheetMetrics").
+    """
+    metrics = SheetMetrics()
+    band = rows_reader(os.path.join(input_path, ParentDtm.get_name()),
+                       my_offsets, 0, my_offsets.size - 1)
+    metrics.lap("read")
+
+    n_sliced_cols = slicer_blueprint(ParentDtm, x_long, y_long)[0]
+    my_tiles = [[] for i in range(n_sliced_cols)]
+    for line in band.splitlines():
+        my_list = line.split()
+        metrics.lap("tokenize")
+        n = 0
+        for my_tile in my_tiles:
+            my_tile.append(b" ".join(my_list[n:n + x_long]))
+            n += x_long
+        metrics.lap("format")
+
+    bytes_written = 0
+    for i in range(1, n_sliced_cols + 1):
+        n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+            ParentDtm, x_long, y_long, i, row)
+        my_tiles[i - 1].append(b"")
+        my_header = dtm_header(n_cols, n_rows, x_coord, y_coord,
+                               ParentDtm.get_cell_size(),
+                               ParentDtm.get_no_data_val())
+        my_data = b"\n".join(my_tiles[i - 1])
+        metrics.lap("format")
+        bytes_written += tile_writer(
+            os.path.join(dtm_path, child_dtm_name(ParentDtm, i, row)),
+            my_header, my_data)
+        metrics.lap("write")
+
+    return (len(band), bytes_written, n_sliced_cols, metrics.phases)
+
+
+def mmap_slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                verbose=True):
+    """Creates new "asc" files out of the bytes of the parent file.
+
+    The parent file is mapped into memory with "mmap" and the rows of
+    each block row are located with its index (see
+    "dtm_index.row_index"). The positions where every height starts and
+    ends are found with NumPy, and the slices of bytes that make up each
+    child file are written straight from the mapped file, without
+    decoding them into strings.
+
+    Rows whose heights are not separated by a single space are rebuilt
+    as "slicer" does, so the files created are the same as the ones
+    created by "slicer".
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    verbose : bool
+        If True, the size and processing time of the file are printed.
+
+    Returns
+    -------
+    tuple
+        The name of the file, its size in MB and its processing time in
+        seconds.
+    """
+    start_time = time.time()
+
+    # a new directory is created with the name of the origial DTM
+    dtm_path = os.path.join(output_path, ParentDtm.get_name().split(".")[0])
+    os.makedirs(dtm_path, exist_ok=True)
+
+    # size and time variables defined for stats
+    file_size = os.stat(os.path.join(input_path, ParentDtm.get_name()))[6]
+    file_size_mb = file_size / 1e+6
+
+    # gets the number of slices along the x & y axis
+    n_sliced_cols, n_sliced_rows = slicer_blueprint(ParentDtm, x_long, y_long)
+    end_of_file = END_OF_FILE.encode("ascii")
+
+    try:
+        my_offsets = row_index(os.path.join(input_path,
+                                            ParentDtm.get_name()))[1]
+        parent_dtm = open(file=os.path.join(input_path, ParentDtm.get_name()),
+                          mode="rb")
+        my_map = mmap.mmap(parent_dtm.fileno(), 0, access=mmap.ACCESS_READ)
+        my_view = memoryview(my_map)
+        my_block = None
+        metrics = current_metrics()
+
+        try:
+            first_row = 0
+            # iterates over the block rows from top to bottom
+            for j in range(n_sliced_rows, 0, -1):
+                n_rows = child_dtm_attributes(ParentDtm, x_long, y_long,
+                                              1, j)[1]
+                start = int(my_offsets[first_row])
+                end = int(my_offsets[first_row + n_rows])
+                # the pages of the mapped file are read as the heights
+                # are found, so both are the "tokenize" phase
+                my_block = my_view[start:end]
+                if metrics is not None:
+                    metrics.lap("read")
+                starts, ends, single_spaced = height_bounds(
+                    my_block, ParentDtm.get_n_cols())
+                my_block.release()
+                bytes_counter(end - start)
+                if metrics is not None:
+                    metrics.lap("tokenize")
+                starts += start
+                ends += start
+                first_row += n_rows
+
+                for i in range(1, n_sliced_cols + 1):
+                    n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+                        ParentDtm, x_long, y_long, i, j)
+                    first_col = (i - 1) * x_long
+                    my_buffers = [dtm_header(
+                        n_cols, n_rows, x_coord, y_coord,
+                        ParentDtm.get_cell_size(),
+                        ParentDtm.get_no_data_val()).encode("ascii").replace(
+                            b"\n", NEWLINE)]
+                    for k in range(n_rows):
+                        my_line = my_view[starts[k, first_col]:
+                                          ends[k, first_col + n_cols - 1]]
+                        if not single_spaced[k]:
+                            my_line = b" ".join(bytes(my_line).split())
+                        my_buffers.append(my_line)
+                        my_buffers.append(NEWLINE)
+                    my_buffers.append(end_of_file)
+                    if metrics is not None:
+                        metrics.lap("format")
+                    buffers_writer(
+                        os.path.join(dtm_path,
+                                     child_dtm_name(ParentDtm, i, j)),
+                        my_buffers)
+                    if metrics is not None:
+                        metrics.lap("write")
+        finally:
+            # the slices of the mapped file must be freed before closing it,
+            # even the one still held by the traceback of an error
+            my_buffers = my_line = None
+            if my_block is not None:
+                my_block.release()
+            my_view.release()
+            my_map.close()
+            parent_dtm.close()
+
+    except PermissionError:
+        print("    __File {} is broken__".format(ParentDtm.get_name()))
+        my_txt = open(file=os.path.join(input_path, "BROKEN FILES.txt"),
+                      mode="a", encoding="ascii")
+        my_txt.write("{}\n".format(ParentDtm.get_name()))
+        my_txt.close()
+
+    abs_process_time = time.time() - start_time
+    if verbose:
+        stats_printer(ParentDtm, file_size_mb, abs_process_time)
+
+    return (ParentDtm.get_name(), file_size_mb, abs_process_time)
+
+
+def height_bounds(block, n_cols):
+    """Finds where every height of some rows of an "asc" file starts
+    and ends.
+
+    Parameters
+    ----------
+    block : bytes-like object
+        Some complete rows of the matrix of data of an "asc" file.
+    n_cols : int
+        The number of heights in each row.
+
+    Returns
+    -------
+    tuple
+        Two arrays with one row per row of "block" and "n_cols" columns
+        with the positions where each height starts and ends (its last
+        character plus one), and an array that tells whether the heights
+        of each row are separated by a single space.
+
+    Raises
+    ------
+    ValueError
+        If any of the rows does not have "n_cols" heights.
+    """
+    my_bytes = np.frombuffer(block, dtype=np.uint8)
+    is_height = np.zeros(my_bytes.size + 2, dtype=np.int8)
+    is_height[1:-1] = my_bytes > ord(" ")
+    edges = np.flatnonzero(np.diff(is_height))
+    n_rows = int(np.count_nonzero(my_bytes == ord("\n")))
+    if n_rows == 0 or my_bytes[-1] != ord("\n"):
+        n_rows += 1
+    if edges.size != 2 * n_rows * n_cols:
+        # the array must not keep "block" exported once the error is
+        # raised, so that its mapped file can be closed
+        del my_bytes
+        raise ValueError("the rows do not have {} heights".format(n_cols))
+
+    starts = edges[0::2].reshape(n_rows, n_cols)
+    ends = edges[1::2].reshape(n_rows, n_cols)
+    single_spaced = np.all(starts[:, 1:] == ends[:, :-1] + 1, axis=1)
+    if n_cols > 1:
+        single_spaced &= np.all(my_bytes[ends[:, :-1]] == ord(" "), axis=1)
+    del my_bytes
+
+    return (starts, ends, single_spaced)
+
+
+def buffers_writer(file_path, my_buffers):
+    """Writes a list of buffers to a new file.
+
+    Where "os.writev" is available, the buffers are written straight
+    from memory with as few calls as possible. Otherwise they are joined
+    and written at once.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the new file.
+    my_buffers : list
+        A list of bytes-like objects.
+
+    Returns
+    -------
+    None
+    """
+    if hasattr(os, "writev"):
+        my_file = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                          0o666)
+        try:
+            for first in range(0, len(my_buffers), IOV_MAX):
+                my_chunk = my_buffers[first:first + IOV_MAX]
+                n_bytes = sum(len(buffer) for buffer in my_chunk)
+                written = os.writev(my_file, my_chunk)
+                # a partial write is completed with the remaining bytes
+                if written < n_bytes:
+                    my_rest = b"".join(my_chunk)[written:]
+                    while my_rest:
+                        my_rest = my_rest[os.write(my_file, my_rest):]
+        finally:
+            os.close(my_file)
+    else:
+        my_file = open(file=file_path, mode="wb")
+        my_file.write(b"".join(my_buffers))
+        my_file.close()
+    tiles_counter(sum(len(buffer) for buffer in my_buffers))
+
+
+def resumable_slicer(ParentDtm, x_long, y_long, input_path, output_path,
+                     verbose=True):
+    """Creates new "asc" files keeping a journal of the finished ones.
+
+    Every child file is written to a temporary file that is renamed once
+    it is complete, and then recorded (name, size, CRC32 checksum and
+    modification time) in the journal of the parent file,
+    "NAME.journal", stored in "output_path". The journal starts with the
+    size and modification time of the parent file and the values of
+    "x_long" and "y_long".
+
+    When the journal matches the parent file and the slicing parameters,
+    the child files it records (and that still exist with the same size
+    and checksum, see "journal_reader") are not written again: the
+    parent file is skipped if
+    all of them are finished, and otherwise it is read from the first
+    block row with a missing child file, jumping straight to it with the
+    index of the file (see "dtm_index.row_index"). The files created are
+    the same as the ones created by "slicer". The time spent checking the
+    journal is the "journal" phase of the file being measured.
+
+    Parameters
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    x_long : int
+        The maximum number of columns in the new "asc" files.
+    y_long : int
+        The maximum number of rows in the new "asc" files.
+    input_path : str
+        The path that contains the original "asc" files.
+    output_path : str
+        The path that will store the new "asc" files.
+    verbose : bool
+        If True, the size and processing time of the file are printed.
+
+    Returns
+    -------
+    tuple
+        The name of the file, its size in MB and its processing time in
+        seconds.
+    """
+    start_time = time.time()
+
+    # the directory of the original DTM is created if it does not exist
+    dtm_path = os.path.join(output_path, ParentDtm.get_name().split(".")[0])
+    os.makedirs(dtm_path, exist_ok=True)
+
+    # size and time variables defined for stats
+    file_path = os.path.join(input_path, ParentDtm.get_name())
+    file_stat = os.stat(file_path)
+    file_size_mb = file_stat.st_size / 1e+6
+
+    # gets the number of slices along the x & y axis
+    n_sliced_cols, n_sliced_rows = slicer_blueprint(ParentDtm, x_long, y_long)
+
+    # the child files that are already finished
+    journal_path = os.path.join(
+        output_path, "{}.journal".format(ParentDtm.get_name().split(".")[0]))
+    journal_header = "PARENT {} {} {} {} {}\n".format(
+        ParentDtm.get_name(), file_stat.st_size, file_stat.st_mtime_ns,
+        x_long, y_long)
+    my_finished = journal_reader(journal_path, journal_header, dtm_path)
+    metrics = current_metrics()
+    if metrics is not None:
+        metrics.lap("journal")
+    if my_finished is None:
+        my_journal = open(file=journal_path, mode="w", encoding="utf-8",
+                          newline="\n")
+        my_journal.write(journal_header)
+        my_finished = set()
+    else:
+        my_journal = open(file=journal_path, mode="a", encoding="utf-8",
+                          newline="\n")
+
+    end_of_file = END_OF_FILE.encode("ascii")
+    first_row = 0
+    my_offsets = None
+    try:
+        # iterates over the block rows from top to bottom
+        for j in range(n_sliced_rows, 0, -1):
+            n_rows = child_dtm_attributes(ParentDtm, x_long, y_long, 1, j)[1]
+            my_names = [child_dtm_name(ParentDtm, i, j)
+                        for i in range(1, n_sliced_cols + 1)]
+            if my_finished.issuperset(my_names):
+                first_row += n_rows
+                continue
+
+            if my_offsets is None:
+                my_offsets = row_index(file_path)[1]
+            band = rows_reader(file_path, my_offsets, first_row, n_rows)
+            first_row += n_rows
+            if metrics is not None:
+                metrics.lap("read")
+            my_lines = [line.split() for line in band.splitlines()]
+            if metrics is not None:
+                metrics.lap("tokenize")
+
+            for i in range(1, n_sliced_cols + 1):
+                if my_names[i - 1] in my_finished:
+                    continue
+                n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+                    ParentDtm, x_long, y_long, i, j)
+                n = (i - 1) * x_long
+                my_tile = dtm_header(
+                    n_cols, n_rows, x_coord, y_coord,
+                    ParentDtm.get_cell_size(),
+                    ParentDtm.get_no_data_val()).encode("ascii")
+                my_tile += b"\n".join(b" ".join(my_list[n:n + x_long])
+                                      for my_list in my_lines) + b"\n"
+                my_tile = my_tile.replace(b"\n", NEWLINE) + end_of_file
+                if metrics is not None:
+                    metrics.lap("format")
+
+                # the child file only gets its name once it is complete
+                child_path = os.path.join(dtm_path, my_names[i - 1])
+                child_dtm = open(file=child_path + ".tmp", mode="wb")
+                child_dtm.write(my_tile)
+                child_dtm.close()
+                os.replace(child_path + ".tmp", child_path)
+                tiles_counter(len(my_tile))
+
+                my_journal.write("TILE {} {} {} {}\n".format(
+                    my_names[i - 1], len(my_tile), zlib.crc32(my_tile),
+                    os.stat(child_path).st_mtime_ns))
+                my_journal.flush()
+                if metrics is not None:
+                    metrics.lap("write")
+
+    except PermissionError:
+        print("    __File {} is broken__".format(ParentDtm.get_name()))
+        my_txt = open(file=os.path.join(input_path, "BROKEN FILES.txt"),
+                      mode="a", encoding="ascii")
+        my_txt.write("{}\n".format(ParentDtm.get_name()))
+        my_txt.close()
+
+    finally:
+        my_journal.close()
+
+    abs_process_time = time.time() - start_time
+    if verbose:
+        stats_printer(ParentDtm, file_size_mb, abs_process_time)
+
+    return (ParentDtm.get_name(), file_size_mb, abs_process_time)
+
+
+def journal_reader(journal_path, journal_header, dtm_path):
+    """Reads the journal written by "resumable_slicer".
+
+    A last line cut by an interruption is removed from the journal, so
+    the entries appended later start on a line of their own.
+
+    The child files that still have the size and modification time
+    recorded in the journal are taken as finished without reading them.
+    Only the child file of the last entry, and the ones whose
+    modification time changed or was not recorded, are read again to
+    check their CRC32 checksum.
+
+    Parameters
+    ----------
+    journal_path : str
+        The path of the journal.
+    journal_header : str
+        The first line that the journal must have to be used, with the
+        size and modification time of the parent file and the slicing
+        parameters.
+    dtm_path : str
+        The directory that stores the child files.
+
+    Returns
+    -------
+    set or None
+        The names of the child files that are finished and still have
+        the size and CRC32 checksum recorded in the journal, or None if
+        there is no journal or it belongs to a different parent file or
+        slicing parameters.
+    """
+    try:
+        my_journal = open(file=journal_path, mode="rb")
+    except FileNotFoundError:
+        return None
+    text = my_journal.read()
+    my_journal.close()
+
+    if not text.startswith(journal_header.encode("utf-8")):
+        return None
+
+    # a line cut by an interruption is truncated
+    journal_size = text.rfind(b"\n") + 1
+    if journal_size < len(text):
+        my_journal = open(file=journal_path, mode="r+b")
+        my_journal.truncate(journal_size)
+        my_journal.close()
+
+    # a child file written again has a later entry, which is the one
+    # that counts
+    my_entries = {}
+    last_name = None
+    for line in text[len(journal_header):journal_size].splitlines():
+        try:
+            my_values = line.decode("utf-8").split()[1:]
+            # the entries of older journals have no modification time
+            if len(my_values) == 3:
+                my_values.append(None)
+            tile_name, tile_size, tile_crc, tile_mtime = my_values
+            tile_size = int(tile_size)
+            tile_crc = int(tile_crc)
+            if tile_mtime is not None:
+                tile_mtime = int(tile_mtime)
+        except ValueError:
+            continue
+        my_entries[tile_name] = (tile_size, tile_crc, tile_mtime)
+        last_name = tile_name
+
+    my_finished = set()
+    for tile_name, (tile_size, tile_crc, tile_mtime) in my_entries.items():
+        tile_path = os.path.join(dtm_path, tile_name)
+        try:
+            tile_stat = os.stat(tile_path)
+        except FileNotFoundError:
+            continue
+        if tile_stat.st_size != tile_size:
+            continue
+        # the child files that kept their modification time are trusted,
+        # except the last one, which might not have reached the disk
+        # before an interruption
+        if tile_stat.st_mtime_ns == tile_mtime and tile_name != last_name:
+            my_finished.add(tile_name)
+            continue
+        child_dtm = open(file=tile_path, mode="rb")
+        my_tile = child_dtm.read(tile_size + 1)
+        child_dtm.close()
+        if len(my_tile) == tile_size and zlib.crc32(my_tile) == tile_crc:
+            my_finished.add(tile_name)
+
+    return my_finished
+
+
+# slicing functions that can be chosen in "run_slicer" through its
+# "mode" parameter
+SLICING_MODES = {"multi_pass": slicer, "single_pass": single_pass_slicer,
+                 "raster": raster_slicer, "bands": band_slicer,
+                 "mmap": mmap_slicer, "resumable": resumable_slicer}
+
+# slicing modes that read the parent file from the beginning to the end,
+# so they can slice compressed files as they are decompressed
+STREAMING_MODES = {"single_pass", "raster"}
@@ -0,0 +1,193 @@
+"""This module defines the "TileIndex" class.
+
+The extents written by "features_recorder" ("FILES FEATURES.txt") are
+stored in a uniform grid of buckets. Since the child files of a sheet
+are laid out on the regular grid defined by "slicer_blueprint", a bucket
+the size of a typical child file holds only a few of them, and the
+files that intersect an area of interest are found by looking at a
+handful of buckets instead of scanning every line of the "txt" file.
+"""
+
+
+import numpy as np
+
+
+class TileIndex(object):
+    """A class that finds the "asc" files that intersect a bounding box.
+
+    Attributes
+    ----------
+    extents : NumPy array
+        An array with one row per file and four columns (MIN_X, MAX_X,
+        MIN_Y, MAX_Y), as written by "features_recorder".
+    paths : bytes
+        The paths of the files, encoded in UTF-8 and joined together.
+    path_offsets : NumPy array
+        Where the path of each file starts and ends in "paths".
+    origin : tuple
+        The X and Y coordinates of the lower left corner of the grid.
+    bucket_size : tuple
+        The width and height of the buckets of the grid.
+    n_buckets : tuple
+        The number of buckets along the x and y axis.
+    keys : NumPy array
+        The sorted numbers of the buckets that hold any file.
+    starts : NumPy array
+        Where the files of each bucket of "keys" start in "members".
+    members : NumPy array
+        The files of each bucket, one bucket after another.
+
+    Methods
+    -------
+    from_features
+        Creates an index out of a "FILES FEATURES.txt" file.
+    load
+        Reads an index stored with "save".
+    tiles_in_bbox
+        Returns the paths of the files that intersect a bounding box.
+    save
+        Stores the index in a "npz" file.
+    """
+    def __init__(self, extents, paths, bucket_size=None):
+        self.extents = np.asarray(extents, dtype=np.float64).reshape(-1, 4)
+        my_paths = [path.encode("utf-8") for path in paths]
+        self.paths = b"".join(my_paths)
+        self.path_offsets = np.zeros(len(my_paths) + 1, dtype=np.int64)
+        np.cumsum([len(path) for path in my_paths],
+                  out=self.path_offsets[1:])
+
+        if len(self.extents) == 0:
+            self.origin = (0.0, 0.0)
+            self.bucket_size = (1.0, 1.0)
+            self.n_buckets = (0, 0)
+            self.keys = np.zeros(0, dtype=np.int64)
+            self.starts = np.zeros(1, dtype=np.int64)
+            self.members = np.zeros(0, dtype=np.int64)
+            return
+
+        # by default, the buckets are as big as a typical file
+        if bucket_size is None:
+            bucket_size = (
+                np.median(self.extents[:, 1] - self.extents[:, 0]),
+                np.median(self.extents[:, 3] - self.extents[:, 2]))
+        self.bucket_size = tuple(float(size) if size > 0 else 1.0
+                                 for size in bucket_size)
+        self.origin = (float(self.extents[:, 0].min()),
+                       float(self.extents[:, 2].min()))
+        first_x, last_x = self._bucket_range(self.extents[:, 0],
+                                             self.extents[:, 1], 0)
+        first_y, last_y = self._bucket_range(self.extents[:, 2],
+                                             self.extents[:, 3], 1)
+        self.n_buckets = (int(last_x.max()) + 1, int(last_y.max()) + 1)
+
+        # every file is added to all the buckets it overlaps
+        n_x = last_x - first_x + 1
+        n_y = last_y - first_y + 1
+        n_copies = n_x * n_y
+        my_files = np.repeat(np.arange(len(self.extents)), n_copies)
+        copy = (np.arange(n_copies.sum())
+                - np.repeat(np.cumsum(n_copies) - n_copies, n_copies))
+        bucket_x = first_x[my_files] + copy % n_x[my_files]
+        bucket_y = first_y[my_files] + copy // n_x[my_files]
+        my_keys = bucket_x * self.n_buckets[1] + bucket_y
+
+        order = np.argsort(my_keys, kind="stable")
+        my_keys = my_keys[order]
+        self.members = my_files[order]
+        self.keys, first = np.unique(my_keys, return_index=True)
+        self.starts = np.append(first, my_keys.size).astype(np.int64)
+
+    @classmethod
+    def from_features(cls, txt_path, bucket_size=None):
+        """Creates an index out of a "txt" file written by
+        "features_recorder".
+        """
+        my_txt = open(file=txt_path, mode="r")
+        my_txt.readline()
+        extents = []
+        paths = []
+        for line in my_txt:
+            # paths might contain spaces, so the line is split around them
+            my_line = line.rstrip("\n").split(" ")
+            extents.append([float(value) for value in my_line[:4]])
+            paths.append(" ".join(my_line[4:-3]))
+        my_txt.close()
+
+        return cls(extents, paths, bucket_size)
+
+    @classmethod
+    def load(cls, npz_path):
+        """Reads an index stored with "save"."""
+        my_npz = np.load(npz_path)
+        index = cls.__new__(cls)
+        index.extents = my_npz["extents"]
+        index.paths = my_npz["paths"].tobytes()
+        index.path_offsets = my_npz["path_offsets"]
+        index.origin = tuple(my_npz["origin"].tolist())
+        index.bucket_size = tuple(my_npz["bucket_size"].tolist())
+        index.n_buckets = tuple(my_npz["n_buckets"].tolist())
+        index.keys = my_npz["keys"]
+        index.starts = my_npz["starts"]
+        index.members = my_npz["members"]
+        my_npz.close()
+
+        return index
+
+    def save(self, npz_path):
+        """Stores the index in a "npz" file."""
+        np.savez(npz_path, extents=self.extents,
+                 paths=np.frombuffer(self.paths, dtype=np.uint8),
+                 path_offsets=self.path_offsets,
+                 origin=np.array(self.origin),
+                 bucket_size=np.array(self.bucket_size),
+                 n_buckets=np.array(self.n_buckets), keys=self.keys,
+                 starts=self.starts, members=self.members)
+
+    def tiles_in_bbox(self, xmin, ymin, xmax, ymax):
+        """Returns the paths of the files whose extents intersect a
+        bounding box, in the order they were added to the index.
+        """
+        if self.keys.size == 0:
+            return []
+        first_x, last_x = self._bucket_range(xmin, xmax, 0)
+        first_y, last_y = self._bucket_range(ymin, ymax, 1)
+        first_x, first_y = max(int(first_x), 0), max(int(first_y), 0)
+        last_x = min(int(last_x), self.n_buckets[0] - 1)
+        last_y = min(int(last_y), self.n_buckets[1] - 1)
+        if first_x > last_x or first_y > last_y:
+            return []
+
+        # the buckets that overlap the bounding box
+        my_keys = (np.arange(first_x, last_x + 1)[:, None]
+                   * self.n_buckets[1]
+                   + np.arange(first_y, last_y + 1)[None, :]).ravel()
+        position = np.searchsorted(self.keys, my_keys)
+        found = position < self.keys.size
+        found[found] = self.keys[position[found]] == my_keys[found]
+        position = position[found]
+
+        # the files of all those buckets are gathered at once
+        lengths = self.starts[position + 1] - self.starts[position]
+        first = np.cumsum(lengths) - lengths
+        my_members = (np.repeat(self.starts[position] - first, lengths)
+                      + np.arange(lengths.sum()))
+        my_files = np.unique(self.members[my_members])
+
+        # only the files that really intersect the bounding box are kept
+        extents = self.extents[my_files]
+        my_files = my_files[(extents[:, 0] <= xmax) & (extents[:, 1] >= xmin)
+                            & (extents[:, 2] <= ymax)
+                            & (extents[:, 3] >= ymin)]
+
+        return [self.paths[self.path_offsets[k]:self.path_offsets[k + 1]].
+                decode("utf-8") for k in my_files]
+
+    def _bucket_range(self, low, high, axis):
+        """Returns the first and last bucket along an axis covered by the
+        range from "low" to "high".
+        """
+        first = np.floor((np.asarray(low) - self.origin[axis])
+                         / self.bucket_size[axis]).astype(np.int64)
+        last = np.floor((np.asarray(high) - self.origin[axis])
+                        / self.bucket_size[axis]).astype(np.int64)
+        return (np.maximum(first, 0), np.maximum(last, first))
@@ -0,0 +1,76 @@
+"""Fixtures shared by the tests.
+
+The modules of the program are imported from the root of the repository
+(and the utilities from "utilities.utilities"), as when they are run from
+there. Most tests
+compare the child files written by a slicing function with the ones
+written by "multi_pass", which is the reference of the program.
+"""
+
+
+import os
+import sys
+
+import pytest
+
+ROOT_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_PATH)
+
+from benchmark import dtm_generator  # noqa: E402
+from running_function import run_slicer  # noqa: E402
+
+
+# sizes of the child files used by most tests, which do not divide the
+# parent files, so there are smaller child files at the right and top
+X_LONG = 10
+Y_LONG = 7
+
+
+def read_tiles(output_path):
+    """Returns the bytes of every child file of a directory by its path
+    "NAME/NAME_col_row.asc". The files written by "multi_pass" as
+    "NAME\\NAME_col_row.asc" (a single name outside of Windows) are
+    taken as if they were in their directory.
+    """
+    my_tiles = {}
+    for root, dirs, files in os.walk(output_path):
+        for name in files:
+            if not name.endswith(".asc"):
+                continue
+            file_path = os.path.join(root, name)
+            key = os.path.relpath(file_path, output_path).replace(
+                os.sep, "/").replace("\\", "/")
+            my_file = open(file=file_path, mode="rb")
+            my_tiles[key] = my_file.read()
+            my_file.close()
+    return my_tiles
+
+
+def slice_tiles(input_path, output_path, x_long=X_LONG, y_long=Y_LONG,
+                **options):
+    """Slices the files of "input_path" with "run_slicer" into a new
+    directory and returns its child files (see "read_tiles").
+    """
+    os.makedirs(output_path, exist_ok=True)
+    run_slicer(input_path, output_path, x_long, y_long, **options)
+    return read_tiles(output_path)
+
+
+@pytest.fixture
+def parents(tmp_path):
+    """A directory with an integer and a decimal parent file, with cells
+    without data and sizes that are not multiples of the child files.
+    """
+    input_path = tmp_path / "parents"
+    input_path.mkdir()
+    dtm_generator(str(input_path / "SHEETI.asc"), 53, 47, kind="int",
+                  no_data_density=0.1, seed=1)
+    dtm_generator(str(input_path / "SHEETF.asc"), 41, 37, kind="float",
+                  no_data_density=0.1, x_coord=400265, seed=2)
+    return str(input_path)
+
+
+@pytest.fixture
+def baseline(parents, tmp_path):
+    """The child files written by "multi_pass" out of "parents"."""
+    return slice_tiles(parents, str(tmp_path / "baseline"))
@@ -0,0 +1,21 @@
+import benchmark
+from conftest import X_LONG, Y_LONG, read_tiles
+
+
+def test_case_runner_matches_multi_pass(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    result = benchmark.case_runner(
+        "run_slicer", parents, output_path,
+        {"x_long": X_LONG, "y_long": Y_LONG, "mode": "single_pass"})
+    assert read_tiles(output_path) == baseline
+    assert result["files"] == len(baseline)
+
+
+def test_peak_rss_without_resource(parents, tmp_path, monkeypatch):
+    # as on Windows, where the "resource" module does not exist
+    monkeypatch.setattr(benchmark, "resource", None)
+    result = benchmark.case_runner(
+        "run_slicer", parents, str(tmp_path / "out"),
+        {"x_long": X_LONG, "y_long": Y_LONG})
+    assert result["peak_rss_kb"] is None
+    assert result["baseline_rss_kb"] is None
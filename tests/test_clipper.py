@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from benchmark import dtm_generator
+from clipper import clip
+from dtm_catalog import catalog_creator
+
+
+def asc_parts(text):
+    """Returns the values of the header and the cells of an "asc" file,
+    as text.
+    """
+    my_lines = text.rstrip(b"\x1a").splitlines()
+    header = [float(line.split()[1]) for line in my_lines[:6]]
+    return (header, np.array([line.split() for line in my_lines[6:]]))
+
+
+def clip_parts(my_parent_dtms, bbox, input_path, output_path):
+    clip_path = clip(my_parent_dtms, *bbox, input_path, output_path)
+    my_clip = open(file=clip_path, mode="rb")
+    text = my_clip.read()
+    my_clip.close()
+    return asc_parts(text)
+
+
+def test_tiles_match_multi_pass(parents, baseline, tmp_path):
+    my_parent_dtms = list(catalog_creator(parents, ["SHEETI.asc",
+                                                    "SHEETF.asc"]))
+    for key, text in baseline.items():
+        header, cells = asc_parts(text)
+        n_cols, n_rows, x_coord, y_coord, cell_size = header[:5]
+        # the bounding box of the centers of the cells of the child file
+        bbox = (x_coord, y_coord, x_coord + cell_size * (n_cols - 1),
+                y_coord + cell_size * (n_rows - 1))
+        clip_header, clip_cells = clip_parts(my_parent_dtms, bbox, parents,
+                                             str(tmp_path))
+        assert clip_header == header
+        assert np.array_equal(clip_cells, cells)
+
+
+def test_clip_across_parent_files(parents, tmp_path):
+    sheet_i, sheet_f = catalog_creator(parents, ["SHEETI.asc",
+                                                 "SHEETF.asc"])
+    # the bounding box has cells of both files and cells of none
+    bbox = (400200, 4400100, 400300, 4400200)
+    header, cells = clip_parts([sheet_i, sheet_f], bbox, parents,
+                               str(tmp_path))
+    assert header[:5] == [21, 21, 400200, 4400100, 5]
+
+    left = clip_parts([sheet_i], (400200, 4400100, 400260, 4400200),
+                      parents, str(tmp_path))[1]
+    right = clip_parts([sheet_f], (400265, 4400100, 400300, 4400180),
+                       parents, str(tmp_path))[1]
+    assert np.array_equal(cells[:, :13], left)
+    assert np.array_equal(cells[4:, 13:], right)
+    assert np.all(cells[:4, 13:] == b"-9999")
+
+
+def test_no_data_values_must_match(tmp_path):
+    input_path = tmp_path / "parents"
+    input_path.mkdir()
+    dtm_generator(str(input_path / "WEST.asc"), 20, 20, seed=1)
+    dtm_generator(str(input_path / "EAST.asc"), 20, 20, x_coord=400100,
+                  no_data_val=-32768, seed=2)
+    my_parent_dtms = list(catalog_creator(str(input_path),
+                                          ["WEST.asc", "EAST.asc"]))
+    bbox = (400050, 4400000, 400150, 4400050)
+
+    with pytest.raises(ValueError):
+        clip(my_parent_dtms, *bbox, str(input_path), str(tmp_path))
+
+    # the same files with the same no data value are clipped
+    dtm_generator(str(input_path / "EAST.asc"), 20, 20, x_coord=400100,
+                  seed=2)
+    my_parent_dtms = list(catalog_creator(str(input_path),
+                                          ["WEST.asc", "EAST.asc"]))
+    header, cells = clip_parts(my_parent_dtms, bbox, str(input_path),
+                               str(tmp_path))
+    assert header == [21, 11, 400050, 4400000, 5, -9999]
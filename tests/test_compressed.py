@@ -0,0 +1,52 @@
+import gzip
+import os
+import zipfile
+
+import pytest
+
+from auxiliary_functions import dtm_open
+from conftest import slice_tiles
+
+
+@pytest.fixture
+def compressed(parents, tmp_path):
+    """A directory with the parent files compressed with gzip and zip.
+    """
+    input_path = tmp_path / "compressed"
+    input_path.mkdir()
+    my_file = open(file=os.path.join(parents, "SHEETI.asc"), mode="rb")
+    (input_path / "SHEETI.asc.gz").write_bytes(gzip.compress(my_file.read()))
+    my_file.close()
+    my_zip = zipfile.ZipFile(str(input_path / "SHEETF.zip"), mode="w",
+                             compression=zipfile.ZIP_DEFLATED)
+    my_zip.write(os.path.join(parents, "SHEETF.asc"), "SHEETF.asc")
+    my_zip.close()
+    return str(input_path)
+
+
+@pytest.mark.parametrize("mode", ["multi_pass", "single_pass", "raster",
+                                  "mmap"])
+def test_compressed_parents_match_multi_pass(compressed, baseline, tmp_path,
+                                             mode):
+    tiles = slice_tiles(compressed, str(tmp_path / "out"), mode=mode)
+    assert tiles == baseline
+
+
+def test_dtm_open_reads_the_text(parents, compressed):
+    for file_name, compressed_name in (("SHEETI.asc", "SHEETI.asc.gz"),
+                                       ("SHEETF.asc", "SHEETF.zip")):
+        my_file = open(file=os.path.join(parents, file_name), mode="rb")
+        text = my_file.read()
+        my_file.close()
+        my_dtm = dtm_open(os.path.join(compressed, compressed_name),
+                          mode="rb")
+        assert my_dtm.read() == text
+        my_dtm.close()
+
+
+def test_zip_without_asc_files(tmp_path):
+    my_zip = zipfile.ZipFile(str(tmp_path / "EMPTY.zip"), mode="w")
+    my_zip.writestr("README.txt", "no heights")
+    my_zip.close()
+    with pytest.raises(ValueError):
+        dtm_open(str(tmp_path / "EMPTY.zip"), mode="rb")
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+import pytest
+
+from auxiliary_functions import dtm_iterator, parent_dtm_creator
+from dtm_catalog import catalog_creator
+
+
+GETTERS = ("get_name", "get_n_cols", "get_n_rows", "get_x", "get_y",
+           "get_cell_size", "get_no_data_val")
+
+
+def test_catalog_matches_parent_dtm_creator(parents):
+    my_names = dtm_iterator(parents)
+    my_parent_dtms = catalog_creator(parents, my_names)
+    assert len(my_parent_dtms) == 2
+    assert my_parent_dtms.names() == my_names
+
+    for name, ParentDtm in zip(my_names, my_parent_dtms):
+        OldDtm = parent_dtm_creator(parents, name)
+        assert [getattr(ParentDtm, getter)() for getter in GETTERS] == [
+            getattr(OldDtm, getter)() for getter in GETTERS]
+        # the matrix of data starts where the catalog says
+        my_file = open(file=os.path.join(parents, name), mode="rb")
+        my_lines = my_file.read().split(b"\n")
+        my_file.close()
+        assert ParentDtm.get_data_offset() == sum(
+            len(line) + 1 for line in my_lines[:6])
+
+
+def test_sort_filter_and_extent(parents):
+    my_parent_dtms = catalog_creator(parents, ["SHEETF.asc", "SHEETI.asc"])
+    assert my_parent_dtms.sort("name").names() == ["SHEETF.asc",
+                                                   "SHEETI.asc"]
+    assert my_parent_dtms.sort("n_cells", reverse=True).names() == [
+        "SHEETI.asc", "SHEETF.asc"]
+    assert my_parent_dtms.filter(my_parent_dtms.n_cols > 50).names() == [
+        "SHEETI.asc"]
+    assert my_parent_dtms[-1].get_name() == "SHEETI.asc"
+    assert my_parent_dtms[::-1].names() == ["SHEETI.asc", "SHEETF.asc"]
+    assert np.array_equal(my_parent_dtms.max_x(), [400465, 400260])
+    assert my_parent_dtms.extent() == (400000, 400465, 4400000, 4400230)
+
+    with pytest.raises(IndexError):
+        my_parent_dtms[2]
+    with pytest.raises(ValueError):
+        my_parent_dtms.filter([False, False]).extent()
+
+
+def test_header_times(parents):
+    header_times = {}
+    catalog_creator(parents, ["SHEETI.asc", "SHEETF.asc"],
+                    header_times=header_times)
+    assert sorted(header_times) == ["SHEETF.asc", "SHEETI.asc"]
@@ -0,0 +1,55 @@
+import os
+
+import numpy as np
+
+import dtm_index
+from benchmark import dtm_generator
+from dtm_index import index_reader, row_index, row_offsets, rows_reader
+
+
+def data_lines(file_path):
+    my_file = open(file=file_path, mode="rb")
+    my_lines = my_file.read().splitlines(keepends=True)[6:]
+    my_file.close()
+    return my_lines
+
+
+def test_rows_match_the_file(parents):
+    file_path = os.path.join(parents, "SHEETF.asc")
+    my_lines = data_lines(file_path)
+    header, my_offsets = row_index(file_path)
+    assert header[:2] == [41, 37]
+    assert len(my_offsets) == len(my_lines) + 1
+
+    assert rows_reader(file_path, my_offsets, 0, 1) == my_lines[0]
+    assert rows_reader(file_path, my_offsets, 5, 10) == b"".join(
+        my_lines[5:15])
+    assert rows_reader(file_path, my_offsets, 0, 37) == b"".join(my_lines)
+
+
+def test_small_chunks(parents, monkeypatch):
+    file_path = os.path.join(parents, "SHEETI.asc")
+    my_offsets = row_offsets(file_path)[1]
+    monkeypatch.setattr(dtm_index, "CHUNK_SIZE", 7)
+    assert np.array_equal(row_offsets(file_path)[1], my_offsets)
+
+
+def test_stored_index(parents):
+    file_path = os.path.join(parents, "SHEETI.asc")
+    assert index_reader(file_path) is None
+    my_index = row_index(file_path)
+    assert os.path.exists(file_path + ".idx")
+    stored_index = index_reader(file_path)
+    assert stored_index[0] == my_index[0]
+    assert np.array_equal(stored_index[1], my_index[1])
+
+    # a rewritten file makes the index stale
+    dtm_generator(file_path, 13, 11, seed=5)
+    file_stat = os.stat(file_path)
+    os.utime(file_path, ns=(file_stat.st_atime_ns,
+                            file_stat.st_mtime_ns + 10 ** 9))
+    assert index_reader(file_path) is None
+    header, my_offsets = row_index(file_path)
+    assert header[:2] == [13, 11]
+    assert rows_reader(file_path, my_offsets, 0, 11) == b"".join(
+        data_lines(file_path))
@@ -0,0 +1,85 @@
+import contextlib
+import gzip
+import io
+import os
+
+import numpy as np
+import pytest
+
+from conftest import slice_tiles
+from utilities import utilities
+from utilities.utilities import finder
+
+
+@pytest.fixture
+def tiles_path(parents, baseline, tmp_path):
+    """A directory with the child files of "SHEETI", some of them
+    compressed with gzip.
+    """
+    output_path = str(tmp_path / "out")
+    assert slice_tiles(parents, output_path, mode="single_pass") == baseline
+    tiles_path = os.path.join(output_path, "SHEETI")
+    for name in ("SHEETI_1_1.asc", "SHEETI_3_2.asc"):
+        file_path = os.path.join(tiles_path, name)
+        my_file = open(file=file_path, mode="rb")
+        my_gz = gzip.open(file_path + ".gz", mode="wb")
+        my_gz.write(my_file.read())
+        my_gz.close()
+        my_file.close()
+        os.remove(file_path)
+    return tiles_path
+
+
+def found_files(tiles_path, output_path, prop, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        finder(tiles_path, output_path, prop, "FOUND", **options)
+    my_txt = open(file=os.path.join(output_path, "FOUND.txt"), mode="r")
+    my_names = my_txt.read().splitlines()[1:]
+    my_txt.close()
+    return sorted(my_names)
+
+
+def scanned_files(baseline, check):
+    """Returns the names of the child files of "SHEETI" whose words and
+    heights meet a condition, reading them whole.
+    """
+    my_names = []
+    for key, text in baseline.items():
+        sheet, name = key.split("/")
+        if sheet != "SHEETI":
+            continue
+        my_lines = text.rstrip(b"\x1a").splitlines()
+        heights = np.array(b" ".join(my_lines[6:]).split(), dtype=np.float64)
+        if check(text.split(), heights):
+            if name in ("SHEETI_1_1.asc", "SHEETI_3_2.asc"):
+                name += ".gz"
+            my_names.append(name)
+    return sorted(my_names)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_finder_matches_a_scan(tiles_path, baseline, tmp_path, workers,
+                               monkeypatch):
+    # the compressed files are searched by very small chunks
+    monkeypatch.setattr(utilities, "CHUNK_BYTES", 5)
+    monkeypatch.setattr(utilities, "CHUNK_CELLS", 7)
+    output_path = str(tmp_path)
+    token = baseline["SHEETI/SHEETI_1_1.asc"].splitlines()[8].split()[3]
+
+    assert found_files(tiles_path, output_path, token.decode("ascii"),
+                       workers=workers) == scanned_files(
+        baseline, lambda words, heights: token in words)
+    assert found_files(tiles_path, output_path, "NODATA_VALUE",
+                       workers=workers) == scanned_files(
+        baseline, lambda words, heights: True)
+    assert found_files(tiles_path, output_path, float(token), numeric=True,
+                       workers=workers) == scanned_files(
+        baseline, lambda words, heights: float(token) in heights)
+    assert found_files(tiles_path, output_path, None,
+                       value_range=(100, 150), workers=workers) == \
+        scanned_files(baseline, lambda words, heights: np.any(
+            (heights >= 100) & (heights <= 150)))
+    assert found_files(tiles_path, output_path, None,
+                       no_data_fraction=0.15, workers=workers) == \
+        scanned_files(baseline, lambda words, heights: np.mean(
+            heights == -9999) > 0.15)
@@ -0,0 +1,115 @@
+import gzip
+import json
+import os
+import shutil
+
+import pytest
+
+from auxiliary_functions import slicer_blueprint
+from conftest import X_LONG, Y_LONG, slice_tiles
+from dtm_catalog import catalog_creator
+from instrumentation import JsonLinesExporter, PrometheusExporter
+
+
+# the phases measured by every slicing mode
+PHASES = {"read", "tokenize", "format", "write"}
+
+
+def sheet_records(input_path, output_path, **options):
+    """Slices the files of "input_path" and returns the record of every
+    parent file by its name.
+    """
+    my_records = []
+    slice_tiles(input_path, output_path, hooks=[my_records.append],
+                **options)
+    return {record["sheet"]: record for record in my_records}
+
+
+def tile_sizes(baseline, sheet):
+    my_sizes = [len(text) for key, text in baseline.items()
+                if key.startswith(sheet + "/")]
+    return (len(my_sizes), sum(my_sizes))
+
+
+@pytest.mark.parametrize("mode", ["multi_pass", "single_pass", "raster",
+                                  "bands", "mmap", "resumable"])
+def test_tiles_written_are_the_ones_of_the_run(parents, baseline, tmp_path,
+                                               mode):
+    output_path = tmp_path / "out"
+    records = sheet_records(parents, str(output_path), mode=mode)
+    for sheet in ("SHEETI", "SHEETF"):
+        n_tiles, n_bytes = tile_sizes(baseline, sheet)
+        record = records[sheet + ".asc"]
+        assert record["tiles_written"] == n_tiles
+        assert record["bytes_written"] == n_bytes
+        assert record["bytes_read"] > 0
+
+    # the files left by an earlier run are not counted again
+    (output_path / "SHEETI" / "OLD.asc").write_bytes(b"old")
+    (output_path / "SHEETI" / "NOTES.txt").write_bytes(b"notes")
+    shutil.rmtree(str(output_path / "SHEETF"))
+    records = sheet_records(parents, str(output_path), mode=mode)
+    n_tiles, n_bytes = tile_sizes(baseline, "SHEETI")
+    if mode == "resumable":
+        # the tiles of the journal are not sliced again
+        n_tiles, n_bytes = (0, 0)
+    assert records["SHEETI.asc"]["tiles_written"] == n_tiles
+    assert records["SHEETI.asc"]["bytes_written"] == n_bytes
+    assert records["SHEETF.asc"]["tiles_written"] == tile_sizes(
+        baseline, "SHEETF")[0]
+
+
+@pytest.mark.parametrize("mode", ["multi_pass", "single_pass", "raster",
+                                  "bands", "mmap", "resumable", "mosaic"])
+def test_every_mode_exports_its_phases(parents, tmp_path, mode):
+    jsonl_path = str(tmp_path / "metrics.jsonl")
+    slice_tiles(parents, str(tmp_path / "out"), mode=mode,
+                hooks=[JsonLinesExporter(jsonl_path)])
+    my_jsonl = open(file=jsonl_path, mode="r", encoding="utf-8")
+    my_records = [json.loads(line) for line in my_jsonl]
+    my_jsonl.close()
+
+    assert len(my_records) == (1 if mode == "mosaic" else 2)
+    for record in my_records:
+        assert PHASES <= set(record["phases"])
+        assert all(seconds >= 0 for seconds in record["phases"].values())
+
+
+def test_bytes_read_by_every_pass(parents, tmp_path):
+    catalog = catalog_creator(parents, ["SHEETI.asc"])
+    ParentDtm = catalog[0]
+    file_size = os.path.getsize(os.path.join(parents, "SHEETI.asc"))
+    data_bytes = file_size - ParentDtm.get_data_offset()
+    n_sliced_cols = slicer_blueprint(ParentDtm, X_LONG, Y_LONG)[0]
+
+    records = sheet_records(parents, str(tmp_path / "multi"))
+    assert records["SHEETI.asc"]["bytes_read"] == n_sliced_cols * data_bytes
+
+    records = sheet_records(parents, str(tmp_path / "single"),
+                            mode="single_pass")
+    assert records["SHEETI.asc"]["bytes_read"] == file_size
+
+
+def test_compressed_parents_count_the_text(parents, tmp_path):
+    input_path = tmp_path / "compressed"
+    input_path.mkdir()
+    my_file = open(file=os.path.join(parents, "SHEETF.asc"), mode="rb")
+    text = my_file.read()
+    my_file.close()
+    (input_path / "SHEETF.asc.gz").write_bytes(gzip.compress(text))
+
+    records = sheet_records(str(input_path), str(tmp_path / "out"),
+                            mode="single_pass")
+    assert records["SHEETF.asc.gz"]["bytes_read"] == len(text)
+
+
+def test_prometheus_totals(parents, baseline, tmp_path):
+    prom_path = str(tmp_path / "metrics.prom")
+    slice_tiles(parents, str(tmp_path / "out"),
+                hooks=[PrometheusExporter(prom_path)])
+    my_prom = open(file=prom_path, mode="r", encoding="utf-8")
+    my_lines = my_prom.read().splitlines()
+    my_prom.close()
+    assert "dtm_slicer_sheets_total 2" in my_lines
+    assert "dtm_slicer_tiles_written_total {}".format(
+        len(baseline)) in my_lines
@@ -0,0 +1,76 @@
+import threading
+
+import numpy as np
+
+import lazy_dtm
+from conftest import X_LONG, Y_LONG
+from dtm_catalog import catalog_creator
+from lazy_dtm import LazyDtm
+
+
+def tile_heights(text):
+    """Returns the heights of a child file as the rows of an array.
+    """
+    my_lines = text.rstrip(b"\x1a").splitlines()[6:]
+    return np.array([line.split() for line in my_lines], dtype=np.float64)
+
+
+def sheet_lazy_dtm(parents, sheet, **options):
+    ParentDtm = catalog_creator(parents, ["{}.asc".format(sheet)])[0]
+    return LazyDtm(ParentDtm, parents, X_LONG, Y_LONG, **options)
+
+
+def test_tiles_match_multi_pass(parents, baseline):
+    for sheet in ("SHEETI", "SHEETF"):
+        my_lazy_dtm = sheet_lazy_dtm(parents, sheet, cache_mb=0.001)
+        for key, text in baseline.items():
+            if not key.startswith(sheet + "/"):
+                continue
+            col, row = key[:-len(".asc")].split("_")[-2:]
+            assert np.array_equal(my_lazy_dtm.tile(int(col), int(row)),
+                                  tile_heights(text))
+
+
+def test_window_crosses_block_rows(parents):
+    my_lazy_dtm = sheet_lazy_dtm(parents, "SHEETF")
+    whole = my_lazy_dtm.window(0, 0, my_lazy_dtm.ParentDtm.get_n_rows(),
+                               my_lazy_dtm.ParentDtm.get_n_cols())
+    assert np.array_equal(my_lazy_dtm.window(3, 5, 2 * Y_LONG, 9),
+                          whole[3:3 + 2 * Y_LONG, 5:14])
+
+
+def test_concurrent_reads_of_a_block_row(parents, monkeypatch):
+    my_lazy_dtm = sheet_lazy_dtm(parents, "SHEETI")
+    my_lazy_dtm.block_row(1)
+
+    # the reads of block row 2 wait until they are released
+    release = threading.Event()
+    my_reads = []
+    rows_reader = lazy_dtm.rows_reader
+
+    def slow_reader(*args):
+        my_reads.append(args[2])
+        release.wait(10)
+        return rows_reader(*args)
+
+    monkeypatch.setattr(lazy_dtm, "rows_reader", slow_reader)
+    my_blocks = []
+    my_threads = [threading.Thread(
+        target=lambda: my_blocks.append(my_lazy_dtm.block_row(2)))
+        for k in range(4)]
+    for thread in my_threads:
+        thread.start()
+
+    # a block row in the cache is not held up by the read
+    done = threading.Event()
+    threading.Thread(target=lambda: (my_lazy_dtm.block_row(1),
+                                     done.set())).start()
+    assert done.wait(10)
+
+    release.set()
+    for thread in my_threads:
+        thread.join(10)
+    assert len(my_reads) == 1
+    assert len(my_blocks) == 4
+    assert all(block is my_blocks[0] for block in my_blocks)
+    assert my_lazy_dtm.misses == 2
@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+from conftest import X_LONG, Y_LONG, read_tiles
+from dtm_catalog import catalog_creator
+from raster_io import LinesReader
+from slicer import slicer
+
+
+def file_lines(reader):
+    my_lines = []
+    line = reader.readline()
+    while line:
+        my_lines.append(line)
+        line = reader.readline()
+    reader.close()
+    return my_lines
+
+
+@pytest.mark.parametrize("read_ahead", [0, 1, 4])
+@pytest.mark.parametrize("chunk_size", [1, 13, 2 ** 20])
+def test_lines_match_the_file(parents, read_ahead, chunk_size):
+    file_path = os.path.join(parents, "SHEETF.asc")
+    my_file = open(file=file_path, mode="rb")
+    text = my_file.read()
+    my_file.close()
+    offset = text.index(b"\n") + 1
+
+    reader = LinesReader(file_path, offset, read_ahead, chunk_size)
+    assert file_lines(reader) == text[offset:].split(b"\n")[:-1]
+    # the end of the file is kept
+    reader = LinesReader(file_path, offset, read_ahead, chunk_size)
+    file_lines(reader)
+    assert reader.readline() == b""
+
+
+def test_early_close(parents):
+    reader = LinesReader(os.path.join(parents, "SHEETI.asc"), read_ahead=1,
+                         chunk_size=7)
+    assert reader.readline().startswith(b"NCOLS")
+    reader.close()
+    reader.close()
+
+
+@pytest.mark.parametrize("read_ahead", [0, 2])
+def test_multi_pass_read_ahead(parents, baseline, tmp_path, read_ahead):
+    output_path = str(tmp_path / "out")
+    for ParentDtm in catalog_creator(parents, ["SHEETI.asc", "SHEETF.asc"]):
+        slicer(ParentDtm, X_LONG, Y_LONG, parents, output_path,
+               verbose=False, read_ahead=read_ahead)
+    assert read_tiles(output_path) == baseline
@@ -0,0 +1,30 @@
+import os
+
+from benchmark import dtm_generator
+from conftest import slice_tiles
+from metadata_catalog import HeaderCatalog
+from raster_io import header_reader
+
+
+def test_catalog_matches_multi_pass(parents, baseline, tmp_path):
+    catalog_path = str(tmp_path / "headers.db")
+    # the first run fills the catalog and the second one uses it
+    for run in ("cold", "warm"):
+        tiles = slice_tiles(parents, str(tmp_path / run),
+                            catalog_path=catalog_path)
+        assert tiles == baseline
+
+
+def test_changed_files_are_parsed_again(parents, tmp_path):
+    file_path = os.path.join(parents, "SHEETI.asc")
+    catalog = HeaderCatalog(str(tmp_path / "headers.db"))
+    assert catalog.header(file_path) == header_reader(file_path)
+
+    dtm_generator(file_path, 13, 11, x_coord=400100, seed=5)
+    file_stat = os.stat(file_path)
+    os.utime(file_path, ns=(file_stat.st_atime_ns,
+                            file_stat.st_mtime_ns + 10 ** 9))
+    assert catalog.header(file_path) == header_reader(file_path)
+    assert catalog.extents([file_path]) == {
+        file_path: (400100, 400160, 4400000, 4400050)}
+    catalog.close()
@@ -0,0 +1,61 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from benchmark import dtm_generator
+from conftest import X_LONG, Y_LONG, slice_tiles
+
+
+def tile_cells(text):
+    """Returns the header and the cells of a child file, as text.
+    """
+    my_lines = text.rstrip(b"\x1a").splitlines()
+    return (my_lines[:6], np.array([line.split() for line in my_lines[6:]]))
+
+
+def test_single_parent_matches_multi_pass(parents, baseline, tmp_path):
+    input_path = tmp_path / "single"
+    input_path.mkdir()
+    shutil.copy(os.path.join(parents, "SHEETF.asc"), str(input_path))
+    tiles = slice_tiles(str(input_path), str(tmp_path / "out"),
+                        mode="mosaic")
+    header = tile_cells(baseline["SHEETF/SHEETF_1_1.asc"])[0]
+    no_data_val = header[5].split()[1]
+
+    assert len(tiles) == len([key for key in baseline
+                              if key.startswith("SHEETF/")])
+    for key, text in baseline.items():
+        if not key.startswith("SHEETF/"):
+            continue
+        col, row = key[:-len(".asc")].split("_")[-2:]
+        cells = tile_cells(text)[1]
+        mosaic_cells = tile_cells(tiles["MOSAIC/MOSAIC_{}_{}.asc".format(
+            col, row)])[1]
+        # the child files at the right and the top are filled up with
+        # the no data value
+        assert mosaic_cells.shape == (Y_LONG, X_LONG)
+        n_rows, n_cols = cells.shape
+        assert np.array_equal(mosaic_cells[Y_LONG - n_rows:, :n_cols],
+                              cells)
+        assert np.all(mosaic_cells[:Y_LONG - n_rows] == no_data_val)
+        assert np.all(mosaic_cells[:, n_cols:] == no_data_val)
+
+
+def test_no_data_values_must_match(tmp_path):
+    input_path = tmp_path / "parents"
+    input_path.mkdir()
+    dtm_generator(str(input_path / "WEST.asc"), 20, 20, seed=1)
+    dtm_generator(str(input_path / "EAST.asc"), 20, 20, x_coord=400100,
+                  no_data_val=-32768, seed=2)
+
+    with pytest.raises(ValueError):
+        slice_tiles(str(input_path), str(tmp_path / "out"), mode="mosaic")
+
+    # the same files with the same no data value are sliced
+    dtm_generator(str(input_path / "EAST.asc"), 20, 20, x_coord=400100,
+                  seed=2)
+    tiles = slice_tiles(str(input_path), str(tmp_path / "out"),
+                        mode="mosaic")
+    assert len(tiles) == 12
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from auxiliary_functions import child_dtm_window
+from conftest import X_LONG, Y_LONG, slice_tiles
+from dtm_catalog import catalog_creator
+
+
+OVERLAP = 2
+
+
+def tile_parts(text):
+    """Returns the header lines and the cells of a child file, as text.
+    """
+    my_lines = text.rstrip(b"\x1a").splitlines()
+    return (my_lines[:6], np.array([line.split() for line in my_lines[6:]]))
+
+
+@pytest.mark.parametrize("mode", ["single_pass", "raster", "multi_pass"])
+def test_overlapping_tiles_match_the_parent_files(parents, baseline,
+                                                  tmp_path, mode):
+    tiles = slice_tiles(parents, str(tmp_path / "out"), mode=mode,
+                        overlap=OVERLAP)
+    assert sorted(tiles) == sorted(baseline)
+    # the whole parent files, as a single child file each
+    wholes = slice_tiles(parents, str(tmp_path / "whole"), 100, 100)
+
+    my_parent_dtms = catalog_creator(parents, ["SHEETI.asc", "SHEETF.asc"])
+    for ParentDtm in my_parent_dtms:
+        sheet = ParentDtm.get_name()[:-len(".asc")]
+        cells = tile_parts(wholes["{0}/{0}_1_1.asc".format(sheet)])[1]
+        for key, text in tiles.items():
+            if not key.startswith(sheet + "/"):
+                continue
+            col, row = key[:-len(".asc")].split("_")[-2:]
+            first_col, n_cols, first_row, n_rows, x_coord, y_coord = (
+                child_dtm_window(ParentDtm, X_LONG, Y_LONG, int(col),
+                                 int(row), OVERLAP))
+            header, tile_cells = tile_parts(text)
+            assert [line.split()[1] for line in header] == [
+                str(value).encode("ascii") for value in (
+                    n_cols, n_rows, x_coord, y_coord,
+                    ParentDtm.get_cell_size(), ParentDtm.get_no_data_val())]
+            assert np.array_equal(
+                tile_cells, cells[first_row:first_row + n_rows,
+                                  first_col:first_col + n_cols])
+
+            # without the overlap, it is the child file of "multi_pass"
+            core_col, core_cols, core_row, core_rows = child_dtm_window(
+                ParentDtm, X_LONG, Y_LONG, int(col), int(row))[:4]
+            assert np.array_equal(
+                tile_cells[core_row - first_row:
+                           core_row - first_row + core_rows,
+                           core_col - first_col:
+                           core_col - first_col + core_cols],
+                tile_parts(baseline[key])[1])
@@ -0,0 +1,79 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import X_LONG, Y_LONG, read_tiles, slice_tiles
+from dtm_catalog import catalog_creator
+from pyramid import pyramid_builder
+
+
+# child files big enough to hold a whole parent file
+BIG_LONG = 100
+
+
+def tile_parts(text):
+    """Returns the values of the header and the heights of a child file.
+    """
+    my_lines = text.rstrip(b"\x1a").splitlines()
+    header = [float(line.split()[1]) for line in my_lines[:6]]
+    return (header, np.array([line.split() for line in my_lines[6:]],
+                             dtype=np.float64))
+
+
+def overview(heights, factor, aggregation, no_data_val):
+    """Aggregates windows of "factor" x "factor" cells laid out from the
+    lower left corner, ignoring the cells without data.
+    """
+    values = np.where(heights == no_data_val, np.nan, heights)[::-1]
+    n_rows = -(-values.shape[0] // factor) * factor
+    n_cols = -(-values.shape[1] // factor) * factor
+    padded = np.full((n_rows, n_cols), np.nan)
+    padded[:values.shape[0], :values.shape[1]] = values
+    windows = padded.reshape(n_rows // factor, factor, n_cols // factor,
+                             factor).swapaxes(1, 2).reshape(
+        n_rows // factor, n_cols // factor, -1)
+    empty = np.all(np.isnan(windows), axis=2)
+    windows[empty] = 0
+    result = {"mean": np.nanmean, "min": np.nanmin,
+              "max": np.nanmax}[aggregation](windows, axis=2)
+    result[empty] = no_data_val
+    return result[::-1]
+
+
+@pytest.mark.parametrize("aggregation", ["mean", "min", "max"])
+def test_overviews_match_the_parent_files(parents, tmp_path, aggregation):
+    baseline = slice_tiles(parents, str(tmp_path / "baseline"), BIG_LONG,
+                           BIG_LONG)
+    tiles = slice_tiles(parents, str(tmp_path / "out"), BIG_LONG, BIG_LONG,
+                        pyramid=[2, 4], aggregation=aggregation)
+    assert {key: text for key, text in tiles.items()
+            if key.count("/") == 1} == baseline
+
+    for sheet, decimals in (("SHEETI", 0), ("SHEETF", 3)):
+        header, heights = tile_parts(baseline["{0}/{0}_1_1.asc".format(
+            sheet)])
+        for factor in (2, 4):
+            level_header, level_heights = tile_parts(
+                tiles["{0}/x{1}/{0}_1_1.asc".format(sheet, factor)])
+            expected = overview(heights, factor, aggregation, header[5])
+            if not decimals:
+                expected = np.rint(expected)
+            assert level_header == [
+                expected.shape[1], expected.shape[0],
+                header[2] + header[4] * (factor - 1) / 2,
+                header[3] + header[4] * (factor - 1) / 2,
+                header[4] * factor, header[5]]
+            assert np.allclose(level_heights, expected, rtol=0,
+                               atol=0.501 * 10 ** -decimals)
+
+
+def test_pyramid_builder_matches_the_slicer(parents, tmp_path):
+    tiles = slice_tiles(parents, str(tmp_path / "out"), pyramid=[3])
+    ParentDtm = catalog_creator(parents, ["SHEETF.asc"])[0]
+    dtm_path = str(tmp_path / "builder" / "SHEETF")
+    os.makedirs(dtm_path)
+    pyramid_builder(ParentDtm, X_LONG, Y_LONG, parents, dtm_path, [3])
+    my_levels = read_tiles(str(tmp_path / "builder"))
+    assert my_levels == {key: text for key, text in tiles.items()
+                         if key.startswith("SHEETF/x3/")}
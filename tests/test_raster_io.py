@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import Y_LONG, slice_tiles
+from raster_io import AscReader, array_formatter
+
+
+def test_raster_mode_matches_multi_pass(parents, baseline, tmp_path):
+    tiles = slice_tiles(parents, str(tmp_path / "out"), mode="raster")
+    assert tiles == baseline
+
+
+def test_array_formatter_round_trip(parents):
+    reader = AscReader(os.path.join(parents, "SHEETF.asc"))
+    block = reader.read_rows(reader.n_rows)
+    reader.close()
+
+    text = array_formatter(block, reader.decimals,
+                           -9999 if reader.no_data_as_int else None)
+    heights = np.array(text.split(), dtype=np.float64)
+    assert np.array_equal(heights, block.ravel())
+
+
+def test_uneven_decimals_at_the_end_of_the_file(tmp_path):
+    # the last height has fewer decimals than the ones detected
+    input_path = tmp_path / "parents"
+    input_path.mkdir()
+    (input_path / "ODD.asc").write_bytes(
+        b"NCOLS 3\nNROWS 2\nXLLCENTER 0\nYLLCENTER 0\nCELLSIZE 5\n"
+        b"NODATA_VALUE -9999\n1.250 2.500 3.750\n4.000 -9999 9.5\n")
+
+    reader = AscReader(str(input_path / "ODD.asc"))
+    with pytest.raises(ValueError):
+        reader.read_rows(2)
+    reader.close()
+
+    # the raster mode falls back to slicing the file as text
+    tiles = slice_tiles(str(input_path), str(tmp_path / "raster"), 2, 1,
+                        mode="raster")
+    baseline = slice_tiles(str(input_path), str(tmp_path / "baseline"), 2,
+                           1)
+    assert len(tiles) == 4
+    assert tiles == baseline
+
+
+def test_chunked_reads_match_a_single_read(parents):
+    file_path = os.path.join(parents, "SHEETI.asc")
+    reader = AscReader(file_path)
+    whole = reader.read_rows(reader.n_rows)
+    reader.close()
+
+    reader = AscReader(file_path)
+    parts = [reader.read_rows(Y_LONG)
+             for k in range(reader.n_rows // Y_LONG)]
+    parts.append(reader.read_rows(reader.n_rows % Y_LONG))
+    reader.close()
+    assert np.array_equal(np.concatenate(parts), whole)
@@ -0,0 +1,94 @@
+import os
+
+from conftest import read_tiles, slice_tiles
+
+
+def tile_editor(tile_path, text, mtime_ns):
+    """Writes other heights in a child file, with the same size, and
+    gives it a modification time.
+    """
+    my_file = open(file=tile_path, mode="wb")
+    my_file.write(text.replace(b"1", b"2"))
+    my_file.close()
+    os.utime(tile_path, ns=(mtime_ns, mtime_ns))
+
+
+def journal_lines(output_path, sheet):
+    my_journal = open(file=os.path.join(output_path,
+                                        "{}.journal".format(sheet)),
+                      mode="rb")
+    text = my_journal.read()
+    my_journal.close()
+    return text
+
+
+def test_resumable_matches_multi_pass(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    tiles = slice_tiles(parents, output_path, mode="resumable")
+    # the journals are not child files
+    assert {key: text for key, text in tiles.items()
+            if key.endswith(".asc")} == baseline
+
+
+def test_missing_and_changed_tiles_are_sliced_again(parents, baseline,
+                                                    tmp_path):
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, mode="resumable")
+
+    sheet_path = os.path.join(output_path, "SHEETI")
+    os.remove(os.path.join(sheet_path, "SHEETI_1_1.asc"))
+    # same size, other heights and a later modification time: only the
+    # checksum tells them apart
+    tile_path = os.path.join(sheet_path, "SHEETI_2_3.asc")
+    tile_editor(tile_path, baseline["SHEETI/SHEETI_2_3.asc"],
+                os.stat(tile_path).st_mtime_ns + 10 ** 9)
+
+    slice_tiles(parents, output_path, mode="resumable")
+    tiles = read_tiles(output_path)
+    for key in baseline:
+        assert tiles[key] == baseline[key]
+
+
+def test_torn_journal_line(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, mode="resumable")
+
+    # the interruption cut the last line of the journal
+    text = journal_lines(output_path, "SHEETF")
+    journal_path = os.path.join(output_path, "SHEETF.journal")
+    my_journal = open(file=journal_path, mode="wb")
+    my_journal.write(text[:-5])
+    my_journal.close()
+    last_name = text.splitlines()[-1].split()[1].decode("utf-8")
+    os.remove(os.path.join(output_path, "SHEETF", last_name))
+
+    slice_tiles(parents, output_path, mode="resumable")
+    tiles = read_tiles(output_path)
+    for key in baseline:
+        assert tiles[key] == baseline[key]
+
+    # the entry appended after the cut has a line of its own, with the
+    # modification time of the new child file
+    assert [line.split()[:4] for line in journal_lines(
+        output_path, "SHEETF").splitlines()] == [
+        line.split()[:4] for line in text.splitlines()]
+
+
+def test_only_unconfirmed_tiles_are_read_again(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, mode="resumable")
+
+    # the first and last child files of the journal are edited without
+    # changing their size or modification time
+    my_lines = journal_lines(output_path, "SHEETI").splitlines()
+    first_key, last_key = ["SHEETI/{}".format(line.split()[1].decode(
+        "utf-8")) for line in (my_lines[1], my_lines[-1])]
+    for key in (first_key, last_key):
+        tile_path = os.path.join(output_path, key)
+        tile_editor(tile_path, baseline[key], os.stat(tile_path).st_mtime_ns)
+
+    slice_tiles(parents, output_path, mode="resumable")
+    tiles = read_tiles(output_path)
+    # only the last one is checked, and sliced again
+    assert tiles[first_key] != baseline[first_key]
+    assert tiles[last_key] == baseline[last_key]
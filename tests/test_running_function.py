@@ -0,0 +1,64 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import running_function
+from conftest import slice_tiles
+from slicer import SLICING_MODES, band_slicer, single_pass_slicer
+
+
+def test_workers_match_multi_pass(parents, baseline, tmp_path):
+    my_records = []
+    tiles = slice_tiles(parents, str(tmp_path / "out"), workers=2,
+                        hooks=[my_records.append])
+    assert tiles == baseline
+
+    # the measures of every file come back from its process
+    assert sorted(record["sheet"] for record in my_records) == [
+        "SHEETF.asc", "SHEETI.asc"]
+    assert sum(record["tiles_written"] for record in my_records) == len(
+        baseline)
+
+
+def test_workers_with_single_pass(parents, baseline, tmp_path):
+    tiles = slice_tiles(parents, str(tmp_path / "out"), workers=2,
+                        mode="single_pass")
+    assert tiles == baseline
+
+
+def test_hooks_run_before_a_later_file_fails(parents, monkeypatch, tmp_path):
+    my_sheets = []
+
+    def failing_slicer(ParentDtm, *args, **kwargs):
+        # the second file fails once the first one is sliced
+        my_sheets.append(ParentDtm.get_name())
+        if len(my_sheets) == 2:
+            raise ValueError("{} is corrupt".format(ParentDtm.get_name()))
+        return single_pass_slicer(ParentDtm, *args, **kwargs)
+
+    monkeypatch.setitem(SLICING_MODES, "single_pass", failing_slicer)
+    my_records = []
+    with pytest.raises(ValueError):
+        slice_tiles(parents, str(tmp_path / "out"), mode="single_pass",
+                    hooks=[my_records.append])
+    assert [record["sheet"] for record in my_records] == my_sheets[:1]
+
+
+def test_bands_share_the_cpus_with_the_workers(parents, baseline, monkeypatch,
+                                               tmp_path):
+    my_workers = []
+
+    def band_recorder(*args, **kwargs):
+        my_workers.append(kwargs["workers"])
+        return band_slicer(*args, **kwargs)
+
+    # the files are sliced by threads, so the calls can be seen
+    monkeypatch.setattr(running_function, "ProcessPoolExecutor",
+                        ThreadPoolExecutor)
+    monkeypatch.setattr(os, "cpu_count", lambda: 4)
+    monkeypatch.setitem(SLICING_MODES, "bands", band_recorder)
+    tiles = slice_tiles(parents, str(tmp_path / "out"), workers=2,
+                        mode="bands")
+    assert tiles == baseline
+    assert my_workers == [2, 2]
@@ -0,0 +1,27 @@
+import pytest
+
+from benchmark import dtm_generator
+from conftest import slice_tiles
+
+
+@pytest.mark.parametrize("mode", ["single_pass", "bands", "mmap"])
+def test_modes_match_multi_pass(parents, baseline, tmp_path, mode):
+    tiles = slice_tiles(parents, str(tmp_path / "out"), mode=mode)
+    assert tiles == baseline
+
+
+def test_mmap_reports_a_corrupt_parent(tmp_path):
+    input_path = tmp_path / "parents"
+    input_path.mkdir()
+    file_path = str(input_path / "BROKEN.asc")
+    dtm_generator(file_path, 20, 20, seed=3)
+    # a height is dropped from the last row
+    my_file = open(file=file_path, mode="rb")
+    text = my_file.read()
+    my_file.close()
+    my_file = open(file=file_path, mode="wb")
+    my_file.write(text[:text.rindex(b" ")] + b"\n")
+    my_file.close()
+
+    with pytest.raises(ValueError):
+        slice_tiles(str(input_path), str(tmp_path / "out"), mode="mmap")
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from conftest import slice_tiles
+from spatial_index import TileIndex
+from utilities.utilities import features_recorder
+
+
+@pytest.fixture
+def features(parents, baseline, tmp_path):
+    """Slices the parent files and returns the "txt" file written by
+    "features_recorder" over their child files.
+    """
+    output_path = str(tmp_path / "out")
+    assert slice_tiles(parents, output_path, mode="single_pass") == baseline
+    features_recorder(output_path, str(tmp_path))
+    return str(tmp_path / "FILES FEATURES.txt")
+
+
+def scan(txt_path, xmin, ymin, xmax, ymax):
+    """Returns the paths of the "txt" file that intersect a bounding box,
+    reading every line.
+    """
+    my_txt = open(file=txt_path, mode="r")
+    my_lines = my_txt.read().splitlines()[1:]
+    my_txt.close()
+    my_paths = []
+    for line in my_lines:
+        my_line = line.split(" ")
+        min_x, max_x, min_y, max_y = [float(value) for value in my_line[:4]]
+        if min_x <= xmax and max_x >= xmin and min_y <= ymax and \
+                max_y >= ymin:
+            my_paths.append(" ".join(my_line[4:-3]))
+    return sorted(my_paths)
+
+
+@pytest.mark.parametrize("bbox", [(400000, 4400000, 400000, 4400000),
+                                  (400040, 4400030, 400120, 4400100),
+                                  (400260, 4400000, 400300, 4400010),
+                                  (399000, 4399000, 402000, 4402000),
+                                  (500000, 4500000, 500100, 4500100)])
+def test_bbox_matches_a_scan(features, tmp_path, bbox):
+    index = TileIndex.from_features(features)
+    assert sorted(index.tiles_in_bbox(*bbox)) == scan(features, *bbox)
+
+    index.save(str(tmp_path / "index.npz"))
+    index = TileIndex.load(str(tmp_path / "index.npz"))
+    assert sorted(index.tiles_in_bbox(*bbox)) == scan(features, *bbox)
+
+
+def test_every_tile_is_found(features, baseline):
+    index = TileIndex.from_features(features)
+    my_paths = index.tiles_in_bbox(0, 0, 10 ** 7, 10 ** 7)
+    assert sorted(os.path.basename(path) for path in my_paths) == sorted(
+        key.split("/")[1] for key in baseline)
@@ -0,0 +1,88 @@
+import gzip
+import os
+
+import numpy as np
+import pytest
+
+from conftest import slice_tiles
+from tile_formats import tiled_reader
+
+
+def tile_parts(text):
+    """Returns the values of the header and the heights of a child file.
+    """
+    my_lines = text.rstrip(b"\x1a").splitlines()
+    header = [float(line.split()[1]) for line in my_lines[:6]]
+    return (header, np.array([line.split() for line in my_lines[6:]],
+                             dtype=np.float64))
+
+
+def format_files(output_path, extension):
+    """Returns the bytes of the files of a format by the path of the
+    child file they stand for ("NAME/NAME_col_row.asc").
+    """
+    my_files = {}
+    for root, dirs, files in os.walk(output_path):
+        for name in files:
+            if not name.endswith("." + extension):
+                continue
+            my_file = open(file=os.path.join(root, name), mode="rb")
+            my_files["{}/{}.asc".format(
+                os.path.basename(root),
+                name[:-len(extension) - 1])] = my_file.read()
+            my_file.close()
+    return my_files
+
+
+def test_asc_gz(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, tile_format="asc.gz")
+    my_files = format_files(output_path, "asc.gz")
+    assert {key: gzip.decompress(data) for key, data in my_files.items()} \
+        == baseline
+
+
+def test_asc_zst(parents, baseline, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, tile_format="asc.zst")
+    decompressor = zstandard.ZstdDecompressor()
+    my_files = format_files(output_path, "asc.zst")
+    assert {key: decompressor.decompress(data)
+            for key, data in my_files.items()} == baseline
+
+
+def test_flt(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, tile_format="flt")
+    my_flts = format_files(output_path, "flt")
+    my_hdrs = format_files(output_path, "hdr")
+    assert sorted(my_flts) == sorted(my_hdrs) == sorted(baseline)
+
+    for key, text in baseline.items():
+        header, heights = tile_parts(text)
+        hdr_lines = my_hdrs[key].decode("ascii").splitlines()
+        assert [float(line.split()[1]) for line in hdr_lines[:6]] == header
+        assert hdr_lines[6] == "BYTEORDER LSBFIRST"
+        assert np.array_equal(
+            np.frombuffer(my_flts[key], dtype="<f4").reshape(heights.shape),
+            heights.astype(np.float32))
+
+
+def test_tiled(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    slice_tiles(parents, output_path, tile_format="tiled")
+
+    for key, text in baseline.items():
+        header, heights = tile_parts(text)
+        sheet, name = key.split("/")
+        col, row = name[:-len(".asc")].split("_")[-2:]
+        tiled_header, tiled_heights = tiled_reader(
+            os.path.join(output_path, sheet, "{}.tiles".format(sheet)),
+            int(col), int(row))
+        assert tiled_header == header
+        assert np.array_equal(tiled_heights, heights.astype(np.float32))
+
+    with pytest.raises(ValueError):
+        tiled_reader(os.path.join(output_path, "SHEETI", "SHEETI.tiles"),
+                     99, 1)
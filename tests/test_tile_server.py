@@ -0,0 +1,72 @@
+import os
+import threading
+import urllib.request
+
+from benchmark import dtm_generator
+from conftest import X_LONG, Y_LONG, slice_tiles
+from tile_server import TileServer, TileStore
+
+
+def store_tiles(store, baseline):
+    """Returns the child files of "store" with the paths of "baseline".
+    """
+    my_tiles = {}
+    for key in baseline:
+        sheet, name = key.split("/")
+        col, row = name[:-len(".asc")].split("_")[-2:]
+        my_tiles[key] = store.tile(sheet, int(col), int(row))
+    return my_tiles
+
+
+def test_tiles_match_multi_pass(parents, baseline, tmp_path):
+    store = TileStore(parents, X_LONG, Y_LONG, str(tmp_path / "cache"))
+    assert store_tiles(store, baseline) == baseline
+    assert store.counters["sliced"] == len(baseline)
+
+    # a new store takes them from the disk
+    store = TileStore(parents, X_LONG, Y_LONG, str(tmp_path / "cache"))
+    assert store_tiles(store, baseline) == baseline
+    assert store.counters["disk"] == len(baseline)
+
+
+def test_http_server(parents, baseline):
+    server = TileServer(("127.0.0.1", 0),
+                        TileStore(parents, X_LONG, Y_LONG), workers=2)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = "http://127.0.0.1:{}/SHEETI/2/3.asc".format(
+            server.server_address[1])
+        assert urllib.request.urlopen(url).read() == baseline[
+            "SHEETI/SHEETI_2_3.asc"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_other_sizes_do_not_share_the_cache(parents, tmp_path):
+    cache_path = str(tmp_path / "cache")
+    store = TileStore(parents, X_LONG, Y_LONG, cache_path)
+    store.tile("SHEETI", 1, 1)
+
+    baseline = slice_tiles(parents, str(tmp_path / "baseline"), 20, 20)
+    store = TileStore(parents, 20, 20, cache_path)
+    assert store_tiles(store, baseline) == baseline
+
+
+def test_changed_parents_are_not_served_stale(parents, tmp_path):
+    cache_path = str(tmp_path / "cache")
+    store = TileStore(parents, X_LONG, Y_LONG, cache_path)
+    store.tile("SHEETI", 1, 1)
+
+    # the parent file is rewritten with other heights and another size
+    file_path = os.path.join(parents, "SHEETI.asc")
+    dtm_generator(file_path, 31, 29, seed=7)
+    file_stat = os.stat(file_path)
+    os.utime(file_path, ns=(file_stat.st_atime_ns,
+                            file_stat.st_mtime_ns + 10 ** 9))
+    baseline = slice_tiles(parents, str(tmp_path / "baseline"))
+
+    assert store_tiles(store, baseline) == baseline
+    store = TileStore(parents, X_LONG, Y_LONG, cache_path)
+    assert store_tiles(store, baseline) == baseline
+    assert store.counters["disk"] == len(baseline)
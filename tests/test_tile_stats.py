@@ -0,0 +1,60 @@
+import os
+
+import numpy as np
+
+from conftest import slice_tiles
+
+
+def stats_lines(output_path, sheet):
+    my_txt = open(file=os.path.join(output_path,
+                                    "{} STATS.txt".format(sheet)), mode="r")
+    my_lines = my_txt.read().splitlines()
+    my_txt.close()
+    return my_lines
+
+
+def tile_heights(text):
+    my_lines = text.rstrip(b"\x1a").splitlines()
+    return np.array(b" ".join(my_lines[6:]).split(), dtype=np.float64)
+
+
+def test_stats_match_the_multi_pass_tiles(parents, baseline, tmp_path):
+    output_path = str(tmp_path / "out")
+    assert slice_tiles(parents, output_path, stats=True) == baseline
+
+    for sheet in ("SHEETI", "SHEETF"):
+        my_lines = stats_lines(output_path, sheet)
+        assert my_lines[0] == "NAME MIN MAX MEAN STDDEV NODATA_RATIO"
+        my_stats = {line.split()[0]: [float(value)
+                                      for value in line.split()[1:]]
+                    for line in my_lines[1:]}
+        my_names = sorted(key.split("/")[1] for key in baseline
+                          if key.startswith(sheet + "/"))
+        assert sorted(my_stats) == my_names
+
+        for name in my_names:
+            heights = tile_heights(baseline["{}/{}".format(sheet, name)])
+            valid = heights[heights != -9999]
+            assert np.allclose(my_stats[name], [
+                valid.min(), valid.max(), valid.mean(), valid.std(),
+                1 - valid.size / heights.size], rtol=0, atol=0.001)
+
+
+def test_empty_tiles_are_skipped(tmp_path):
+    # the left half of the file has no data
+    input_path = tmp_path / "parents"
+    input_path.mkdir()
+    (input_path / "HALF.asc").write_bytes(
+        b"NCOLS 4\nNROWS 2\nXLLCENTER 0\nYLLCENTER 0\nCELLSIZE 5\n"
+        b"NODATA_VALUE -9999\n-9999 -9999 1 2\n-9999 -9999 3 -9999\n")
+    baseline = slice_tiles(str(input_path), str(tmp_path / "baseline"), 2,
+                           1)
+    output_path = str(tmp_path / "out")
+    tiles = slice_tiles(str(input_path), output_path, 2, 1, stats=True,
+                        skip_empty=True)
+    assert sorted(tiles) == ["HALF/HALF_2_1.asc", "HALF/HALF_2_2.asc"]
+    assert tiles == {key: baseline[key] for key in tiles}
+
+    my_lines = stats_lines(output_path, "HALF")
+    assert "HALF_1_1.asc -9999 -9999 -9999 -9999 1.0" in my_lines
+    assert "HALF_2_1.asc 3.0 3.0 3.0 0.0 0.5" in my_lines
@@ -0,0 +1,26 @@
+import os
+
+import pytest
+
+from conftest import slice_tiles
+from raster_io import TileWriter
+
+
+@pytest.mark.parametrize("writer_threads", [1, 3])
+def test_writer_threads_match_multi_pass(parents, baseline, tmp_path,
+                                         writer_threads):
+    tiles = slice_tiles(parents, str(tmp_path / "out"),
+                        writer_threads=writer_threads)
+    assert tiles == baseline
+
+
+def test_background_errors_are_raised(tmp_path):
+    writer = TileWriter(threads=2, max_pending=2)
+    writer.write(str(tmp_path / "A.asc"), b"A")
+    writer.write(str(tmp_path / "missing" / "B.asc"), b"B")
+    with pytest.raises(OSError):
+        writer.close()
+    assert os.listdir(str(tmp_path)) == ["A.asc"]
+
+    # the writer can be closed again once the error is raised
+    writer.close()
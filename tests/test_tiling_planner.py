@@ -0,0 +1,67 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import tiling_planner
+from auxiliary_functions import dtm_iterator
+from conftest import read_tiles, slice_tiles
+from dtm_catalog import catalog_creator
+from running_function import run_slicer
+from tiling_planner import file_timer
+
+
+def parent_plan(input_path, **targets):
+    my_parent_dtms = catalog_creator(input_path, dtm_iterator(input_path))
+    return tiling_planner.tiling_planner(my_parent_dtms, input_path,
+                                         **targets)
+
+
+def test_auto_tile_size_matches_multi_pass(parents, tmp_path):
+    plan = parent_plan(parents, target_mb=0.001)
+
+    # the output directory does not exist yet
+    output_path = str(tmp_path / "missing" / "out")
+    with contextlib.redirect_stdout(io.StringIO()):
+        run_slicer(parents, output_path, None, None, tile_size="auto",
+                   target_mb=0.001)
+    tiles = read_tiles(output_path)
+    baseline = slice_tiles(parents, str(tmp_path / "baseline"), plan.x_long,
+                           plan.y_long)
+    assert tiles == baseline
+
+    assert len(tiles) == plan.n_tiles
+    tile_mb = max(len(text) for text in tiles.values()) / 1e+6
+    assert tile_mb <= plan.tile_mb <= 0.001
+    output_mb = sum(len(text) for text in tiles.values()) / 1e+6
+    assert output_mb == pytest.approx(plan.output_mb, rel=0.1)
+
+
+@pytest.mark.parametrize("mode", ["multi_pass", "single_pass", "raster"])
+def test_the_size_does_not_depend_on_the_times(parents, monkeypatch, mode):
+    plan = parent_plan(parents, target_mb=0.002, mode=mode)
+
+    # files as slow to create as a whole parent file
+    monkeypatch.setattr(tiling_planner, "file_timer",
+                        lambda temp_path=None: 10.0)
+    slow_plan = parent_plan(parents, target_mb=0.002, mode=mode)
+    assert (slow_plan.x_long, slow_plan.y_long) == (plan.x_long,
+                                                    plan.y_long)
+    assert slow_plan.seconds > plan.seconds
+
+
+def test_target_tiles(parents, tmp_path):
+    plan = parent_plan(parents, target_tiles=12, target_workers=4)
+    tiles = slice_tiles(parents, str(tmp_path / "out"), plan.x_long,
+                        plan.y_long)
+    assert len(tiles) == plan.n_tiles
+
+    with pytest.raises(ValueError):
+        parent_plan(parents, target_tiles=0)
+
+
+def test_file_timer_creates_its_directory(tmp_path):
+    temp_path = str(tmp_path / "missing")
+    assert file_timer(temp_path) > 0
+    assert os.listdir(temp_path) == []
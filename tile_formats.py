@@ -0,0 +1,301 @@
+"""This module defines the formats in which the child files can be
+written.
+
+Every format is a class with the same methods ("write" and "close"), so
+the slicing functions can write any of them out of the arrays created by
+"raster_io.AscReader". The following formats are available:
+    * "asc" - the usual "asc" files
+    * "asc.gz" - "asc" files compressed with gzip
+    * "asc.zst" - "asc" files compressed with Zstandard (it needs the
+    "zstandard" package)
+    * "flt" - ESRI binary grids: the heights as 32 bit floats in a "flt"
+    file and the header in a "hdr" file
+    * "tiled" - all the child files of a parent file as 32 bit floats
+    compressed with zlib in a single "tiles" file, with a table of the
+    position of every child file at the end (see "tiled_reader")
+
+The child files keep the names "NAME_col_row" with the extension of
+their format, except for "tiled", where they are found by their column
+and row.
+
+Building the bytes of a child file (and compressing them) is the
+"format" phase of the parent file being measured, and writing them its
+"write" phase (see "instrumentation").
+"""
+
+
+import gzip
+import os
+import struct
+import zlib
+
+import numpy as np
+
+from auxiliary_functions import child_dtm_name, dtm_header, slicer_blueprint
+from instrumentation import phase_lap, tiles_counter
+from raster_io import array_formatter, tile_text
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# compression level of the "asc.gz", "asc.zst" and "tiled" formats
+COMPRESS_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# a "tiles" file starts with this text, followed by the six values of
+# the header of the parent file, "x_long", "y_long", the number of child
+# files along the x and y axis and the position of the table. Every entry
+# of the table has the position and length of a child file and its
+# number of columns, number of rows, X and Y coordinates.
+TILES_MAGIC = b"ASCTIL01"
+TILES_HEADER = struct.Struct("<8s6q4qq")
+TILES_ENTRY = struct.Struct("<6q")
+
+
+class AscWriter(object):
+    """A class that writes the child files as "asc" files.
+
+    Attributes
+    ----------
+    dtm_path : str
+        The directory that stores the child files.
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    extension : str
+        The extension of the child files.
+    text : bool
+        Whether the child files keep the text of the heights.
+
+    Methods
+    -------
+    write
+        Writes a child file out of an array.
+    write_text
+        Writes a child file out of the bytes of an "asc" file.
+    close
+        Finishes the child files.
+    """
+    extension = "asc"
+    text = True
+
+    def __init__(self, dtm_path, ParentDtm, x_long, y_long):
+        self.dtm_path = dtm_path
+        self.ParentDtm = ParentDtm
+
+    def write(self, col, row, dtm_attributes, block, decimals=0,
+              no_data_val=None):
+        """Writes the child file of a column and a row.
+
+        Parameters
+        ----------
+        col : int
+            The column of the child file, starting at 1 on the left.
+        row : int
+            The row of the child file, starting at 1 at the bottom.
+        dtm_attributes : list
+            The six values of the header of the child file.
+        block : NumPy array
+            The heights of the child file.
+        decimals : int
+            The number of decimals of the heights.
+        no_data_val : int, optional
+            If given, the cells with this value are written as integers.
+
+        Returns
+        -------
+        None
+        """
+        text = tile_text(dtm_header(*dtm_attributes),
+                         array_formatter(block, decimals, no_data_val))
+        self.write_text(col, row, text)
+
+    def write_text(self, col, row, text):
+        """Writes the child file of a column and a row out of the bytes
+        of an "asc" file.
+        """
+        data = self.compress(text)
+        phase_lap("format")
+        child_dtm = open(file=self.tile_path(col, row), mode="wb")
+        child_dtm.write(data)
+        child_dtm.close()
+        tiles_counter(len(data))
+        phase_lap("write")
+
+    def compress(self, text):
+        return text
+
+    def tile_path(self, col, row):
+        """Returns the path of the child file of a column and a row."""
+        return os.path.join(self.dtm_path, "{}.{}".format(
+            child_dtm_name(self.ParentDtm, col, row).rsplit(".", 1)[0],
+            self.extension))
+
+    def close(self):
+        pass
+
+
+class GzipWriter(AscWriter):
+    """A class that writes the child files as "asc" files compressed with
+    gzip ("NAME_col_row.asc.gz").
+    """
+    extension = "asc.gz"
+
+    def compress(self, text):
+        return gzip.compress(text, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+
+class ZstdWriter(AscWriter):
+    """A class that writes the child files as "asc" files compressed with
+    Zstandard ("NAME_col_row.asc.zst").
+
+    Raises
+    ------
+    ImportError
+        If the "zstandard" package is not installed.
+    """
+    extension = "asc.zst"
+
+    def __init__(self, dtm_path, ParentDtm, x_long, y_long):
+        if zstandard is None:
+            raise ImportError("the \"zstandard\" package is needed to write "
+                              "\"asc.zst\" files")
+        AscWriter.__init__(self, dtm_path, ParentDtm, x_long, y_long)
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+
+    def compress(self, text):
+        return self.compressor.compress(text)
+
+
+class FltWriter(AscWriter):
+    """A class that writes the child files as ESRI binary grids: the
+    heights as little endian 32 bit floats, from the top row to the
+    bottom one, in "NAME_col_row.flt" and the header in
+    "NAME_col_row.hdr".
+    """
+    extension = "flt"
+    text = False
+
+    def write(self, col, row, dtm_attributes, block, decimals=0,
+              no_data_val=None):
+        data = block.astype("<f4").tobytes()
+        phase_lap("format")
+
+        file_path = self.tile_path(col, row)
+        my_hdr = open(file="{}.hdr".format(file_path[:-4]), mode="w",
+                      encoding="ascii")
+        my_hdr.write(dtm_header(*dtm_attributes))
+        my_hdr.write("BYTEORDER LSBFIRST\n")
+        hdr_bytes = my_hdr.tell()
+        my_hdr.close()
+
+        my_flt = open(file=file_path, mode="wb")
+        my_flt.write(data)
+        my_flt.close()
+        tiles_counter(hdr_bytes + len(data))
+        phase_lap("write")
+
+
+class TiledWriter(AscWriter):
+    """A class that writes all the child files of a parent file in a
+    single "NAME.tiles" file.
+
+    Every child file is stored as little endian 32 bit floats compressed
+    with zlib, in the order they are written. The table with their
+    positions is written at the end by "close", so any child file can be
+    read with two "seek()" (see "tiled_reader").
+    """
+    extension = "tiles"
+    text = False
+
+    def __init__(self, dtm_path, ParentDtm, x_long, y_long):
+        AscWriter.__init__(self, dtm_path, ParentDtm, x_long, y_long)
+        self.x_long = x_long
+        self.y_long = y_long
+        self.n_sliced_cols, self.n_sliced_rows = slicer_blueprint(
+            ParentDtm, x_long, y_long)
+        self.my_table = np.zeros(
+            (self.n_sliced_cols * self.n_sliced_rows, 6), dtype=np.int64)
+        self.my_tiles = open(file=os.path.join(dtm_path, "{}.{}".format(
+            ParentDtm.get_name().split(".")[0], self.extension)), mode="wb")
+        self.my_tiles.write(b"\0" * TILES_HEADER.size)
+
+    def write(self, col, row, dtm_attributes, block, decimals=0,
+              no_data_val=None):
+        data = zlib.compress(block.astype("<f4").tobytes(), COMPRESS_LEVEL)
+        phase_lap("format")
+        self.my_table[(row - 1) * self.n_sliced_cols + col - 1] = (
+            self.my_tiles.tell(), len(data), *dtm_attributes[:4])
+        self.my_tiles.write(data)
+        tiles_counter(len(data))
+        phase_lap("write")
+
+    def close(self):
+        table_offset = self.my_tiles.tell()
+        self.my_tiles.write(self.my_table.astype("<i8").tobytes())
+        self.my_tiles.seek(0)
+        self.my_tiles.write(TILES_HEADER.pack(
+            TILES_MAGIC, self.ParentDtm.get_n_cols(),
+            self.ParentDtm.get_n_rows(), self.ParentDtm.get_x(),
+            self.ParentDtm.get_y(), self.ParentDtm.get_cell_size(),
+            self.ParentDtm.get_no_data_val(), self.x_long, self.y_long,
+            self.n_sliced_cols, self.n_sliced_rows, table_offset))
+        self.my_tiles.close()
+        # the header and the table are not child files
+        tiles_counter(TILES_HEADER.size + self.my_table.nbytes, 0)
+        phase_lap("write")
+
+
+def tiled_reader(file_path, col, row):
+    """Reads a child file out of a "tiles" file written by "TiledWriter".
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "tiles" file.
+    col : int
+        The column of the child file, starting at 1 on the left.
+    row : int
+        The row of the child file, starting at 1 at the bottom.
+
+    Returns
+    -------
+    tuple
+        A list with the six values of the header of the child file and
+        an array with its heights.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a "tiles" file or it has no such child file.
+    """
+    my_tiles = open(file=file_path, mode="rb")
+    try:
+        tiles_values = TILES_HEADER.unpack(my_tiles.read(TILES_HEADER.size))
+        if tiles_values[0] != TILES_MAGIC:
+            raise ValueError("{} is not a \"tiles\" file".format(file_path))
+        n_sliced_cols, n_sliced_rows = tiles_values[9:11]
+        if not (1 <= col <= n_sliced_cols and 1 <= row <= n_sliced_rows):
+            raise ValueError("{} has no child file {}_{}".format(
+                file_path, col, row))
+
+        my_tiles.seek(tiles_values[11] + TILES_ENTRY.size
+                      * ((row - 1) * n_sliced_cols + col - 1))
+        offset, length, n_cols, n_rows, x_coord, y_coord = (
+            TILES_ENTRY.unpack(my_tiles.read(TILES_ENTRY.size)))
+        my_tiles.seek(offset)
+        data = zlib.decompress(my_tiles.read(length))
+    finally:
+        my_tiles.close()
+
+    return ([n_cols, n_rows, x_coord, y_coord, tiles_values[5],
+             tiles_values[6]],
+            np.frombuffer(data, dtype="<f4").reshape(n_rows, n_cols))
+
+
+# formats in which the child files can be written
+TILE_FORMATS = {"asc": AscWriter, "asc.gz": GzipWriter,
+                "asc.zst": ZstdWriter, "flt": FltWriter,
+                "tiled": TiledWriter}
@@ -0,0 +1,434 @@
+"""This module serves the child files of the parent files over HTTP
+without slicing them beforehand.
+
+A child file is asked for as "/NAME/col/row.asc", following the naming
+of the files written by the slicing functions ("NAME_col_row.asc"). It
+is sliced out of the rows of the parent file that it needs, found with
+the index of "dtm_index.row_index", and it is the same file that
+"slicer" would write. The child files are kept in a cache in memory and,
+optionally, in a directory with the layout of the slicing functions
+under a directory for every size of the child files
+("X_LONGxY_LONG/NAME/NAME_col_row.asc"). Both caches have a bounded size
+and drop the files used least recently. The child files of a parent
+file that has changed (a different size or modification time) are
+dropped from both caches. The requests are served by a pool of threads.
+
+This module contains the following:
+    * parent_stamp - returns the size and modification time of a file
+    * stamp_reader - reads the stamp of the cache of a parent file
+    * stamp_writer - writes the stamp of the cache of a parent file
+    * TileStore - slices the child files on demand and caches them
+    * TileRequestHandler - answers the HTTP requests
+    * TileServer - an HTTP server with a pool of threads
+"""
+
+
+import argparse
+import http.server
+import os
+import re
+import shutil
+import threading
+import urllib.parse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from auxiliary_functions import (child_dtm_attributes, child_dtm_name,
+                                 dtm_iterator, parent_dtm_creator,
+                                 slicer_blueprint)
+from dtm_index import row_index, rows_reader
+from slicer import lines_text
+
+
+# the path of a child file: "/NAME/col/row.asc"
+TILE_PATH = re.compile(r"^/([^/]+)/([0-9]+)/([0-9]+)\.asc$")
+
+# the file of the cache on disk of a parent file with the size and the
+# modification time of the parent file its child files come from
+PARENT_STAMP = "PARENT.stamp"
+
+
+def parent_stamp(file_path):
+    """Returns the size and the modification time in nanoseconds of a
+    parent file.
+    """
+    file_stat = os.stat(file_path)
+    return (file_stat.st_size, file_stat.st_mtime_ns)
+
+
+def stamp_reader(sheet_path):
+    """Returns the size and modification time of the parent file whose
+    child files are cached in "sheet_path", or None if they are not
+    known.
+    """
+    try:
+        my_stamp = open(file=os.path.join(sheet_path, PARENT_STAMP),
+                        mode="r", encoding="ascii")
+    except FileNotFoundError:
+        return None
+    my_values = my_stamp.read().split()
+    my_stamp.close()
+    if len(my_values) != 2 or not all(value.isdigit()
+                                      for value in my_values):
+        return None
+    return (int(my_values[0]), int(my_values[1]))
+
+
+def stamp_writer(sheet_path, stamp):
+    """Writes the size and modification time of the parent file whose
+    child files are cached in "sheet_path".
+    """
+    temp_path = os.path.join(sheet_path, "{}.{}.tmp".format(
+        PARENT_STAMP, threading.get_ident()))
+    my_stamp = open(file=temp_path, mode="w", encoding="ascii")
+    my_stamp.write("{} {}\n".format(*stamp))
+    my_stamp.close()
+    os.replace(temp_path, os.path.join(sheet_path, PARENT_STAMP))
+
+
+class TileStore(object):
+    """A class that slices the child files of the parent files of a
+    directory on demand and caches them.
+
+    Attributes
+    ----------
+    input_path : str
+        The path that contains the parent files.
+    x_long : int
+        The maximum number of columns in the child files.
+    y_long : int
+        The maximum number of rows in the child files.
+    cache_path : str
+        The directory of the cache on disk for "x_long" and "y_long"
+        ("X_LONGxY_LONG" inside the directory given), or None.
+    memory_bytes : int
+        The maximum size of the cache in memory in bytes.
+    disk_bytes : int
+        The maximum size of the cache on disk in bytes.
+    my_sheets : dict
+        The "ParentDtm" instance of every parent file, by the name of
+        its child files ("NAME").
+    my_stamps : dict
+        The size and modification time in nanoseconds of every parent
+        file when its child files were cached, by "NAME".
+    counters : dict
+        The number of child files taken from memory ("memory"), from
+        disk ("disk") and sliced ("sliced").
+
+    Methods
+    -------
+    tile
+        Returns the bytes of a child file.
+    """
+    def __init__(self, input_path, x_long, y_long, cache_path=None,
+                 memory_mb=64, disk_mb=1024):
+        self.input_path = input_path
+        self.x_long = x_long
+        self.y_long = y_long
+        self.cache_path = None
+        if cache_path is not None:
+            # the child files of other sizes are kept apart
+            self.cache_path = os.path.join(cache_path, "{}x{}".format(
+                x_long, y_long))
+        self.memory_bytes = int(memory_mb * 1e+6)
+        self.disk_bytes = int(disk_mb * 1e+6)
+        self.counters = {"memory": 0, "disk": 0, "sliced": 0}
+
+        self.my_sheets = {}
+        self.my_stamps = {}
+        for dtm in dtm_iterator(input_path):
+            sheet = dtm.split(".")[0]
+            self.my_sheets[sheet] = parent_dtm_creator(input_path, dtm)
+            self.my_stamps[sheet] = parent_stamp(os.path.join(input_path,
+                                                              dtm))
+        # the indexes are read (or built) when a parent file is first
+        # needed
+        self.my_offsets = {}
+
+        self.my_memory = OrderedDict()
+        self.memory_size = 0
+        self.my_disk = OrderedDict()
+        self.disk_size = 0
+        if self.cache_path is not None:
+            os.makedirs(self.cache_path, exist_ok=True)
+            my_files = []
+            for sheet in os.scandir(self.cache_path):
+                if not sheet.is_dir():
+                    continue
+                # the child files of a parent file that has changed, or
+                # that is gone, are dropped
+                if (self.my_stamps.get(sheet.name) is None
+                        or stamp_reader(sheet.path)
+                        != self.my_stamps[sheet.name]):
+                    shutil.rmtree(sheet.path, ignore_errors=True)
+                    continue
+                for entry in os.scandir(sheet.path):
+                    if entry.name.endswith(".asc"):
+                        my_files.append((entry.stat().st_mtime,
+                                         entry.path, entry.stat()[6]))
+            # the files left by earlier runs are dropped oldest first
+            for mtime, file_path, size in sorted(my_files):
+                self.my_disk[file_path] = size
+                self.disk_size += size
+        self.lock = threading.Lock()
+        self.index_lock = threading.Lock()
+
+    def tile(self, sheet, col, row):
+        """Returns the bytes of a child file, taken from the caches or
+        sliced out of its parent file.
+
+        Parameters
+        ----------
+        sheet : str
+            The name of the parent file without its extension.
+        col : int
+            The column of the child file, starting at 1 on the left.
+        row : int
+            The row of the child file, starting at 1 at the bottom.
+
+        Returns
+        -------
+        bytes
+            The whole child file.
+
+        Raises
+        ------
+        KeyError
+            If there is no such parent file.
+        ValueError
+            If the parent file has no such child file.
+        """
+        ParentDtm, stamp = self._parent_checker(sheet)
+        n_sliced_cols, n_sliced_rows = slicer_blueprint(
+            ParentDtm, self.x_long, self.y_long)
+        if not (1 <= col <= n_sliced_cols and 1 <= row <= n_sliced_rows):
+            raise ValueError("{} has no child file {}_{}".format(
+                ParentDtm.get_name(), col, row))
+
+        key = (sheet, col, row)
+        file_path = None
+        if self.cache_path is not None:
+            file_path = os.path.join(self.cache_path, sheet,
+                                     child_dtm_name(ParentDtm, col, row))
+        with self.lock:
+            text = self.my_memory.get(key)
+            if text is not None:
+                self.my_memory.move_to_end(key)
+                self.counters["memory"] += 1
+                return text
+            on_disk = file_path in self.my_disk
+            if on_disk:
+                self.my_disk.move_to_end(file_path)
+
+        text = None
+        source = "disk"
+        if on_disk:
+            try:
+                child_dtm = open(file=file_path, mode="rb")
+                text = child_dtm.read()
+                child_dtm.close()
+            except FileNotFoundError:
+                pass
+        if text is None:
+            text = self._slicer(ParentDtm, col, row)
+            source = "sliced"
+            if file_path is not None:
+                self._disk_writer(file_path, text, sheet, stamp)
+
+        with self.lock:
+            self.counters[source] += 1
+            # a child file of a parent file that changed meanwhile is not
+            # cached
+            if key not in self.my_memory and self.my_stamps[sheet] == stamp:
+                self.my_memory[key] = text
+                self.memory_size += len(text)
+            while self.memory_size > self.memory_bytes and self.my_memory:
+                self.memory_size -= len(self.my_memory.popitem(
+                    last=False)[1])
+
+        return text
+
+    def _parent_checker(self, sheet):
+        """Returns the "ParentDtm" instance of a parent file and its size
+        and modification time, dropping its child files from the caches
+        if it has changed since they were cached.
+        """
+        ParentDtm = self.my_sheets[sheet]
+        file_path = os.path.join(self.input_path, ParentDtm.get_name())
+        stamp = parent_stamp(file_path)
+        with self.lock:
+            if stamp == self.my_stamps[sheet]:
+                return ParentDtm, stamp
+
+            ParentDtm = parent_dtm_creator(self.input_path,
+                                           ParentDtm.get_name())
+            self.my_sheets[sheet] = ParentDtm
+            self.my_stamps[sheet] = stamp
+            self.my_offsets.pop(file_path, None)
+            for key in [key for key in self.my_memory if key[0] == sheet]:
+                self.memory_size -= len(self.my_memory.pop(key))
+            if self.cache_path is not None:
+                sheet_path = os.path.join(self.cache_path, sheet)
+                for cached_path in [cached_path for cached_path
+                                    in self.my_disk if os.path.dirname(
+                                        cached_path) == sheet_path]:
+                    self.disk_size -= self.my_disk.pop(cached_path)
+                shutil.rmtree(sheet_path, ignore_errors=True)
+
+        return ParentDtm, stamp
+
+    def _slicer(self, ParentDtm, col, row):
+        """Slices a child file out of the rows of its parent file."""
+        file_path = os.path.join(self.input_path, ParentDtm.get_name())
+        with self.index_lock:
+            if file_path not in self.my_offsets:
+                self.my_offsets[file_path] = row_index(file_path)[1]
+
+        n_cols, n_rows, x_coord, y_coord = child_dtm_attributes(
+            ParentDtm, self.x_long, self.y_long, col, row)
+        first_col = (col - 1) * self.x_long
+        my_rows = rows_reader(
+            file_path, self.my_offsets[file_path],
+            ParentDtm.get_n_rows() - (row - 1) * self.y_long - n_rows,
+            n_rows).split(b"\n")[:n_rows]
+        my_lines = [b" ".join(my_row.split()[first_col:first_col + n_cols])
+                    for my_row in my_rows]
+
+        return lines_text([n_cols, n_rows, x_coord, y_coord,
+                           ParentDtm.get_cell_size(),
+                           ParentDtm.get_no_data_val()], my_lines)
+
+    def _disk_writer(self, file_path, text, sheet, stamp):
+        """Stores a child file in the cache on disk, dropping the files
+        used least recently if it is full.
+        """
+        sheet_path = os.path.dirname(file_path)
+        os.makedirs(sheet_path, exist_ok=True)
+        if stamp_reader(sheet_path) != stamp:
+            stamp_writer(sheet_path, stamp)
+        # the file is renamed once written, so it is never read half
+        # written
+        temp_path = "{}.{}.tmp".format(file_path, threading.get_ident())
+        child_dtm = open(file=temp_path, mode="wb")
+        child_dtm.write(text)
+        child_dtm.close()
+        os.replace(temp_path, file_path)
+
+        my_dropped = []
+        with self.lock:
+            if self.my_stamps[sheet] != stamp:
+                # the parent file changed while it was being sliced
+                my_dropped.append(file_path)
+            else:
+                self.disk_size += len(text) - self.my_disk.pop(file_path, 0)
+                self.my_disk[file_path] = len(text)
+            while self.disk_size > self.disk_bytes and len(self.my_disk) > 1:
+                dropped_path, size = self.my_disk.popitem(last=False)
+                self.disk_size -= size
+                my_dropped.append(dropped_path)
+        for dropped_path in my_dropped:
+            try:
+                os.remove(dropped_path)
+            except FileNotFoundError:
+                pass
+
+
+class TileRequestHandler(http.server.BaseHTTPRequestHandler):
+    """A class that answers the requests of child files ("GET
+    /NAME/col/row.asc") with the "TileStore" of its server.
+    """
+    def do_GET(self):
+        match = TILE_PATH.match(urllib.parse.urlsplit(self.path).path)
+        if match is None:
+            self.send_error(404, "the path must be /NAME/col/row.asc")
+            return
+        try:
+            text = self.server.store.tile(match.group(1), int(match.group(2)),
+                                          int(match.group(3)))
+        except (KeyError, ValueError):
+            self.send_error(404, "no such child file")
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; charset=ascii")
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            http.server.BaseHTTPRequestHandler.log_message(self, format,
+                                                           *args)
+
+
+class TileServer(http.server.HTTPServer):
+    """An HTTP server that serves the child files of a "TileStore" with a
+    pool of threads.
+
+    Attributes
+    ----------
+    store : TileStore instance
+        The source of the child files.
+    verbose : bool
+        Whether every request is printed.
+    executor : ThreadPoolExecutor instance
+        The threads that answer the requests.
+    """
+    def __init__(self, address, store, workers=8, verbose=False):
+        http.server.HTTPServer.__init__(self, address, TileRequestHandler)
+        self.store = store
+        self.verbose = verbose
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._request_worker, request, client_address)
+
+    def _request_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        http.server.HTTPServer.server_close(self)
+        self.executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serves the child files of the \"asc\" files of a "
+                    "directory as /NAME/col/row.asc.")
+    parser.add_argument("input_path",
+                        help="path that contains the original files")
+    parser.add_argument("x_long", type=int,
+                        help="maximum number of cells along the x axis")
+    parser.add_argument("y_long", type=int,
+                        help="maximum number of cells along the y axis")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address of the server (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="port of the server (default: 8000)")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="number of threads (default: 8)")
+    parser.add_argument("--cache", help="directory of the cache on disk")
+    parser.add_argument("--memory-mb", type=float, default=64,
+                        help="size of the cache in memory (default: 64)")
+    parser.add_argument("--disk-mb", type=float, default=1024,
+                        help="size of the cache on disk (default: 1024)")
+    parser.add_argument("--verbose", action="store_true",
+                        help="print every request")
+    args = parser.parse_args()
+
+    server = TileServer((args.host, args.port),
+                        TileStore(args.input_path, args.x_long, args.y_long,
+                                  args.cache, args.memory_mb, args.disk_mb),
+                        args.workers, args.verbose)
+    print("Serving {} on http://{}:{}/NAME/col/row.asc".format(
+        args.input_path, *server.server_address[:2]))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
@@ -0,0 +1,95 @@
+"""This module computes the statistics of the child files while they are
+written.
+
+"TilesStats" takes the heights of every child file of a parent file as
+they are sliced, so no other pass over the files is needed to check them,
+and writes the statistics of all of them in a "txt" file. The cells
+without data are left out of the statistics.
+
+The information is stored using the following format:
+    NAME MIN MAX MEAN STDDEV NODATA_RATIO
+"""
+
+
+import numpy as np
+
+from auxiliary_functions import child_dtm_name
+
+
+class TilesStats(object):
+    """A class that stores the statistics of the child files of a parent
+    file.
+
+    Attributes
+    ----------
+    ParentDtm : class instance
+        An instance of the "ParentDtm" class.
+    no_data_val : int
+        Value that represents a cell without data.
+    my_stats : list
+        The name of every child file followed by its minimum, maximum,
+        mean and standard deviation of the heights and its share of
+        cells without data.
+
+    Methods
+    -------
+    add
+        Computes the statistics of a child file.
+    write
+        Writes the statistics of all the child files in a "txt" file.
+    """
+    def __init__(self, ParentDtm):
+        self.ParentDtm = ParentDtm
+        self.no_data_val = ParentDtm.get_no_data_val()
+        self.my_stats = []
+
+    def add(self, col, row, my_lines):
+        """Computes the statistics of a child file.
+
+        Parameters
+        ----------
+        col : int
+            The column of the child file, starting at 1 on the left.
+        row : int
+            The row of the child file, starting at 1 at the bottom.
+        my_lines : list
+            The rows of the child file, as bytes.
+
+        Returns
+        -------
+        bool
+            Whether the child file has any cell with data.
+        """
+        heights = np.array(b" ".join(my_lines).split(), dtype=np.float64)
+        valid = heights[heights != self.no_data_val]
+        if valid.size:
+            my_values = [valid.min(), valid.max(), round(valid.mean(), 3),
+                         round(valid.std(), 3)]
+        else:
+            # a child file without data gets the no data value
+            my_values = [self.no_data_val] * 4
+        self.my_stats.append([child_dtm_name(self.ParentDtm, col, row)]
+                             + my_values
+                             + [round(1 - valid.size / heights.size, 6)])
+
+        return valid.size > 0
+
+    def write(self, file_path):
+        """Writes the statistics of all the child files in a "txt" file.
+
+        Parameters
+        ----------
+        file_path : str
+            The path of the "txt" file.
+
+        Returns
+        -------
+        None
+        """
+        my_lines = ["NAME MIN MAX MEAN STDDEV NODATA_RATIO\n"]
+        for my_values in self.my_stats:
+            my_lines.append("{} {} {} {} {} {}\n".format(*my_values))
+
+        my_txt = open(file=file_path, mode="w", encoding="ascii")
+        my_txt.write("".join(my_lines))
+        my_txt.close()
@@ -0,0 +1,442 @@
+"""This module proposes the size of the child files ("x_long" and
+"y_long") for the "asc" files of a directory.
+
+The size is chosen for a target size of the child files, a target number
+of child files or a number of downstream workers that will share them.
+Sizes that divide the parent files exactly are preferred, since the
+other ones leave smaller child files at the right side and at the top of
+every parent file (see "slicer_blueprint"). The size is chosen with a
+static cost model, so the same files always get the same size. The size
+of the output and the slicing time are predicted out of a few rows of
+the biggest parent files, and the time is only reported.
+
+This module contains the following:
+    * TilingPlan - the size of the child files and its predictions
+    * dtm_sampler - measures a few rows of a parent file
+    * file_timer - measures how long a child file takes to be created
+    * size_candidates - returns the sizes worth trying along an axis
+    * tiling_planner - proposes the size of the child files
+    * plan_printer - prints a plan
+"""
+
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from auxiliary_functions import (END_OF_FILE, dtm_header, dtm_iterator,
+                                 dtm_open, is_compressed, slicer_blueprint)
+from dtm_catalog import catalog_creator
+from raster_io import NEWLINE, AscReader, array_formatter
+
+
+# size of the child files when no target is given
+DEFAULT_TILE_MB = 16
+
+# number of rows of every parent file that are measured, and number of
+# parent files measured (the biggest ones)
+SAMPLE_ROWS = 64
+SAMPLE_DTMS = 16
+
+# number of empty child files written to measure how long a file takes
+SAMPLE_FILES = 16
+
+# number of sizes tried along each axis, besides the exact divisors
+GRID_SIZES = 64
+
+# number of different sizes of parent files whose divisors are tried
+DIVISOR_SIZES = 8
+
+# weights of the penalties added to the distance to the target: child
+# files cut short by the side of their parent file, child files far from
+# square, a last round of downstream jobs with idle workers and a higher
+# slicing cost
+RAGGED_WEIGHT = 2.0
+ASPECT_WEIGHT = 0.25
+BALANCE_WEIGHT = 1.0
+COST_WEIGHT = 0.25
+
+# static costs of the slicing, in units of a cell joined into a child
+# file: splitting a cell out of a row of the parent file and creating a
+# child file
+SPLIT_COST = 1.0
+FILE_COST = 2000.0
+
+
+class TilingPlan(object):
+    """A class that stores the size of the child files proposed for some
+    parent files and what slicing them is expected to produce.
+
+    Attributes
+    ----------
+    x_long : int
+        The maximum number of columns in the child files.
+    y_long : int
+        The maximum number of rows in the child files.
+    n_tiles : int
+        The number of child files of all the parent files.
+    full_share : float
+        The share of the child files that are not cut short by the
+        right side or the top of their parent file.
+    tile_mb : float
+        The biggest size a child file can have in MB, taking every cell
+        as wide as the widest one measured.
+    output_mb : float
+        The predicted size of all the child files in MB.
+    seconds : float
+        The predicted slicing time in seconds.
+    """
+    def __init__(self, x_long, y_long, n_tiles, full_share, tile_mb,
+                 output_mb, seconds):
+        self.x_long = x_long
+        self.y_long = y_long
+        self.n_tiles = n_tiles
+        self.full_share = full_share
+        self.tile_mb = tile_mb
+        self.output_mb = output_mb
+        self.seconds = seconds
+
+
+def dtm_sampler(file_path, data_offset=None, sample_rows=SAMPLE_ROWS,
+                arrays=False):
+    """Measures the first rows of the matrix of data of a parent file.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the parent file.
+    data_offset : int, optional
+        The position where the matrix of data starts. If None, the
+        header is skipped.
+    sample_rows : int
+        The number of rows that are measured.
+    arrays : bool
+        If True, the rows are also parsed into an array and written back
+        as the "raster" mode does (see "raster_io.AscReader").
+
+    Returns
+    -------
+    tuple
+        The number of cells measured, the bytes they take in a child
+        file (with their separators), the bytes of the widest cell (with
+        a line break after it), the seconds needed to split them out of
+        the parent file and to join them into child files and, if
+        "arrays" is True, the seconds needed to parse and write them back
+        (or None if the "raster" mode would slice them as text).
+    """
+    if data_offset is None or is_compressed(file_path):
+        my_dtm = dtm_open(file_path, mode="rb")
+        for line_counter in range(6):
+            my_dtm.readline()
+    else:
+        my_dtm = open(file=file_path, mode="rb")
+        my_dtm.seek(data_offset)
+
+    my_rows = []
+    split_time = time.perf_counter()
+    for row_counter in range(sample_rows):
+        my_tokens = my_dtm.readline().split()
+        if not my_tokens:
+            break
+        my_rows.append(my_tokens)
+    split_time = time.perf_counter() - split_time
+    my_dtm.close()
+
+    join_time = time.perf_counter()
+    my_lines = [b" ".join(my_tokens) for my_tokens in my_rows]
+    join_time = time.perf_counter() - join_time
+
+    array_time = None
+    if arrays and my_rows:
+        array_time = time.perf_counter()
+        reader = AscReader(file_path)
+        try:
+            array_formatter(reader.read_rows(len(my_rows)), reader.decimals)
+            array_time = time.perf_counter() - array_time
+        except ValueError:
+            array_time = None
+        finally:
+            reader.close()
+
+    # every cell is followed by a space or, at the end of a row, by a
+    # line break
+    return (sum(len(my_tokens) for my_tokens in my_rows),
+            sum(len(line) + 1 for line in my_lines),
+            max((len(token) for my_tokens in my_rows
+                 for token in my_tokens), default=0) + len(NEWLINE),
+            split_time, join_time, array_time)
+
+
+def file_timer(temp_path=None):
+    """Measures the seconds needed to create, write and close a child
+    file, writing some empty ones in a temporary directory.
+
+    Parameters
+    ----------
+    temp_path : str, optional
+        The directory where the temporary directory is created, e.g. the
+        output directory, since the time depends on the file system. It
+        is created if it does not exist. If None, the temporary directory
+        of the system is used.
+
+    Returns
+    -------
+    float
+    """
+    header = dtm_header(1, 1, 0, 0, 1, 0).encode("ascii")
+    if temp_path is not None:
+        os.makedirs(temp_path, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=temp_path) as sample_path:
+        file_time = time.perf_counter()
+        for file_counter in range(SAMPLE_FILES):
+            child_dtm = open(file=os.path.join(
+                sample_path, "{}.asc".format(file_counter)), mode="wb")
+            child_dtm.write(header)
+            child_dtm.close()
+        file_time = time.perf_counter() - file_time
+
+    return file_time / SAMPLE_FILES
+
+
+def size_candidates(my_lengths, target):
+    """Returns the sizes worth trying along an axis: the exact divisors
+    of the most common lengths of the parent files and a geometric grid
+    from 1 to the longest one, which includes the target.
+
+    Parameters
+    ----------
+    my_lengths : NumPy array
+        The number of columns (or rows) of every parent file.
+    target : float
+        The size closest to the target along that axis.
+
+    Returns
+    -------
+    NumPy array
+        The sizes, sorted and without repetitions.
+    """
+    longest = int(my_lengths.max())
+    my_sizes = [np.geomspace(1, longest, GRID_SIZES),
+                [min(max(target, 1), longest)]]
+
+    lengths, counts = np.unique(my_lengths, return_counts=True)
+    for length in lengths[np.argsort(counts, kind="stable")[::-1]][
+            :DIVISOR_SIZES]:
+        low = np.arange(1, int(np.sqrt(length)) + 1)
+        low = low[length % low == 0]
+        my_sizes.extend([low, length // low])
+
+    return np.unique(np.round(np.concatenate(my_sizes)).astype(np.int64))
+
+
+def tiling_planner(my_parent_dtms, input_path, target_mb=None,
+                   target_tiles=None, target_workers=None, mode="multi_pass",
+                   temp_path=None, sample_rows=SAMPLE_ROWS):
+    """Proposes the size of the child files of some parent files.
+
+    Every pair of sizes worth trying (see "size_candidates") gets a
+    score: how far the mean child file is from the target, plus
+    penalties for the child files cut short by the side of their parent
+    file, for child files far from square, for a last round of
+    downstream jobs that leaves workers idle and for a higher slicing
+    cost. The pair with the lowest score is chosen. The cost counts the
+    cells split and joined and the child files created ("SPLIT_COST" and
+    "FILE_COST"): the "multi_pass" mode splits every row of a parent
+    file once per block column, so narrow child files cost more with
+    it. No time is measured to choose the size, so the same files
+    always get the same one.
+
+    The sizes of the cells and the predictions come from the first rows
+    of the biggest parent files (see "dtm_sampler" and "file_timer").
+    The child files are never bigger than "target_mb" if no cell is
+    wider than the widest one measured. The predictions assume that
+    every parent file is sliced on its own, without overviews or
+    overlap.
+
+    Parameters
+    ----------
+    my_parent_dtms : DtmCatalog instance
+        The parent files.
+    input_path : str
+        The path that contains the parent files.
+    target_mb : float, optional
+        The maximum size of a child file in MB. The child files are as
+        close to it as possible unless "target_tiles" is given.
+    target_tiles : int, optional
+        The number of child files of all the parent files.
+    target_workers : int, optional
+        The number of downstream workers that share the child files, so
+        their number should be a multiple of it.
+    mode : str
+        The slicing mode the prediction of the time is made for.
+    temp_path : str, optional
+        The directory where the sample child files are written.
+    sample_rows : int
+        The number of rows of every parent file that are measured.
+
+    Returns
+    -------
+    TilingPlan instance
+
+    Raises
+    ------
+    ValueError
+        If there are no parent files or a target is not positive.
+    """
+    if not len(my_parent_dtms):
+        raise ValueError("there are no files to plan the slicing of")
+    for target in (target_mb, target_tiles, target_workers):
+        if target is not None and target <= 0:
+            raise ValueError("the targets of the slicing must be positive")
+    if target_mb is None and target_tiles is None:
+        target_mb = DEFAULT_TILE_MB
+
+    n_cols = my_parent_dtms.n_cols
+    n_rows = my_parent_dtms.n_rows
+    my_cells = n_cols * n_rows
+    total_cells = int(my_cells.sum())
+
+    # the biggest parent files are measured, since they take most of the
+    # time and their child files are the biggest ones
+    n_sampled = 0
+    n_bytes = 0
+    split_time = 0
+    join_time = 0
+    max_cell_bytes = 0
+    header_bytes = 0
+    for ParentDtm in my_parent_dtms.sort("n_cells", reverse=True)[
+            :SAMPLE_DTMS]:
+        sample = dtm_sampler(os.path.join(input_path, ParentDtm.get_name()),
+                             ParentDtm.get_data_offset(), sample_rows,
+                             mode == "raster")
+        n_sampled += sample[0]
+        n_bytes += sample[1]
+        max_cell_bytes = max(max_cell_bytes, sample[2])
+        if sample[5] is None:
+            split_time += sample[3]
+            join_time += sample[4]
+        else:
+            join_time += sample[5]
+        header_bytes = max(header_bytes, len(dtm_header(
+            ParentDtm.get_n_cols(), ParentDtm.get_n_rows(),
+            ParentDtm.get_x(), ParentDtm.get_y(), ParentDtm.get_cell_size(),
+            ParentDtm.get_no_data_val()).encode("ascii").replace(
+                b"\n", NEWLINE)) + len(END_OF_FILE))
+    n_sampled = max(n_sampled, 1)
+    bytes_per_cell = n_bytes / n_sampled
+    split_time /= n_sampled
+    join_time /= n_sampled
+
+    max_cells = np.inf
+    if target_mb is not None:
+        max_cells = max((target_mb * 1e+6 - header_bytes)
+                        / max(max_cell_bytes, 1), 1)
+    if target_tiles is not None:
+        target_cells = total_cells / target_tiles
+    else:
+        target_cells = max_cells
+    target_cells = min(max(target_cells, 1), total_cells)
+
+    target_side = np.sqrt(target_cells)
+    x_sizes = size_candidates(n_cols, target_side)[:, np.newaxis]
+    y_sizes = size_candidates(n_rows, target_side)[np.newaxis, :]
+
+    # the child files of every pair of sizes, as "slicer_blueprint"
+    # counts them, added over all the parent files
+    my_tile_cols = -(-n_cols[:, np.newaxis] // x_sizes.T)
+    my_tile_rows = -(-n_rows[:, np.newaxis] // y_sizes)
+    n_tiles = my_tile_cols.T @ my_tile_rows
+    # the child files cut short by the right side or the top of a parent
+    # file are not full, unless they take the whole side
+    full_tiles = np.where(n_cols[:, np.newaxis] < x_sizes.T, 1,
+                          n_cols[:, np.newaxis] // x_sizes.T).T @ np.where(
+        n_rows[:, np.newaxis] < y_sizes, 1, n_rows[:, np.newaxis] // y_sizes)
+
+    # a size bigger than every parent file is the same as the longest
+    x_cells = np.minimum(x_sizes, n_cols.max())
+    y_cells = np.minimum(y_sizes, n_rows.max())
+
+    split_cells = total_cells
+    if mode == "multi_pass":
+        split_cells = (my_cells @ my_tile_cols)[:, np.newaxis]
+    cost = SPLIT_COST * split_cells + total_cells + FILE_COST * n_tiles
+
+    score = (np.abs(np.log(total_cells / n_tiles / target_cells))
+             + RAGGED_WEIGHT * (1 - full_tiles / n_tiles)
+             + ASPECT_WEIGHT * np.abs(np.log(x_cells / y_cells))
+             + COST_WEIGHT * np.log(cost / cost.min()))
+    if target_workers is not None:
+        score = score + BALANCE_WEIGHT * (
+            -(-n_tiles // target_workers) * target_workers / n_tiles - 1)
+    score = np.where(x_cells * y_cells > max_cells, np.inf, score)
+
+    i, j = np.unravel_index(np.argmin(score), score.shape)
+    x_long = int(x_sizes[i, 0])
+    y_long = int(y_sizes[0, j])
+
+    # the chosen sizes are checked against "slicer_blueprint" itself
+    n_plan_tiles = 0
+    for ParentDtm in my_parent_dtms:
+        n_sliced_cols, n_sliced_rows = slicer_blueprint(ParentDtm, x_long,
+                                                        y_long)
+        n_plan_tiles += n_sliced_cols * n_sliced_rows
+
+    # the times measured only predict how long the chosen size takes
+    if mode == "multi_pass":
+        split_cells = split_cells[i, 0]
+    seconds = (split_time * split_cells + join_time * total_cells
+               + file_timer(temp_path) * n_plan_tiles)
+
+    return TilingPlan(
+        x_long, y_long, n_plan_tiles,
+        float(full_tiles[i, j] / n_plan_tiles),
+        (int(x_cells[i, 0] * y_cells[0, j]) * max_cell_bytes
+         + header_bytes) / 1e+6,
+        (total_cells * bytes_per_cell + n_plan_tiles * header_bytes) / 1e+6,
+        float(seconds))
+
+
+def plan_printer(TilingPlan):
+    """Prints the size of the child files of a plan and its predictions.
+    """
+    print("")
+    print("    Tile size: {} x {} cells".format(
+        TilingPlan.x_long, TilingPlan.y_long))
+    print("    Number of tiles: {} ({} % not cut short)".format(
+        TilingPlan.n_tiles, round(TilingPlan.full_share * 100, 1)))
+    print("    Biggest tile: {} MB".format(round(TilingPlan.tile_mb, 2)))
+    print("    PREDICTED output size: {} MB".format(
+        round(TilingPlan.output_mb, 2)))
+    print("    PREDICTED processing time: {} seconds".format(
+        round(TilingPlan.seconds, 2)))
+    print("")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Proposes the size of the new files of the \"asc\" "
+                    "files of a directory.")
+    parser.add_argument("input_path",
+                        help="path that contains the original files")
+    parser.add_argument("--target-mb", type=float,
+                        help="maximum size of a new file in MB (default: "
+                             "{} unless --target-tiles is given)".format(
+                                 DEFAULT_TILE_MB))
+    parser.add_argument("--target-tiles", type=int,
+                        help="number of new files of all the original "
+                             "files")
+    parser.add_argument("--target-workers", type=int,
+                        help="number of downstream workers that share the "
+                             "new files")
+    parser.add_argument("--mode", default="multi_pass",
+                        help="slicing mode the time is predicted for "
+                             "(default: multi_pass)")
+    args = parser.parse_args()
+
+    plan_printer(tiling_planner(
+        catalog_creator(args.input_path, dtm_iterator(args.input_path)),
+        args.input_path, args.target_mb, args.target_tiles,
+        args.target_workers, args.mode))
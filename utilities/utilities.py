@@ -6,15 +6,34 @@ It was designed for handling DTM data writen in "asc" format.
 This module contains the following functions:
     * mover - copies and pastes "asc" files.
     * finder - looks if a property is met in "asc" files.
+    * file_checker - checks if a property is met in a single file.
+    * token_finder - looks for a word in the bytes of an "asc" file.
+    * array_finder - looks for heights in the data of an "asc" file.
     * remover - removes directories created out of broken files.
     * features_recorder - creates a "txt" file with the main features
     of each "asc" file
 """
 
 
+import mmap
 import os
+import re
 import shutil
 import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from auxiliary_functions import DTM_EXTENSIONS, dtm_open, is_compressed
+from dtm_catalog import catalog_creator
+from raster_io import AscReader
+
+
+# number of cells read at once when the data of a file is parsed
+CHUNK_CELLS = 1000000
+
+# number of bytes of a compressed file that are searched at once
+CHUNK_BYTES = 2 ** 24
 
 
 def mover(input_path, output_path, txt_path):
@@ -51,7 +70,8 @@ def mover(input_path, output_path, txt_path):
                          dst=output_path)
 
 
-def finder(input_path, output_path, prop, txt_name):
+def finder(input_path, output_path, prop, txt_name, numeric=False,
+           value_range=None, no_data_fraction=None, workers=1):
     """This function creates a "txt" file with the names of those "asc"
     files that fulfill a given property.
 
@@ -66,9 +86,23 @@ def finder(input_path, output_path, prop, txt_name):
     output_path : str
         The path for the destination directory.
     prop : str
-        The property that will be checked.
+        The property that will be checked: a word that must appear in
+        the file (see "token_finder"), or a height if "numeric" is True.
     txt_name : str
         The name that we want to give to the "txt" file.
+    numeric : bool
+        If True, "prop" is taken as a height and only the matrix of data
+        is checked. It is parsed into arrays by chunks, so "10" also
+        matches "10.000".
+    value_range : tuple, optional
+        If given, "prop" is ignored and the files with any height
+        between these two values (both included) are written.
+    no_data_fraction : float, optional
+        If given, "prop" is ignored and the files whose share of cells
+        without data is above this value are written.
+    workers : int
+        The number of processes that check files at the same time. If
+        None, the number of CPUs is used.
 
     Returns
     -------
@@ -78,23 +112,160 @@ def finder(input_path, output_path, prop, txt_name):
                   mode="w")
     my_txt.write("FILE NAME\n")
 
-    my_directory = os.scandir(input_path)
-    for entry in my_directory:
-        start_time = time.time()
-        my_dtm = open(file=os.path.join(input_path, entry.name), mode="r")
-        for line in my_dtm:
-            my_line = line.split()
-            if prop in my_line:
-                print("File {} was INCLUDED".format(entry.name))
-                my_txt.write("{}\n".format(entry.name))
-                break
-        processing_time = time.time() - start_time
-        print("File {} took {} seconds".format(entry.name, processing_time))
-        my_dtm.close()
+    # other files, like the indexes of the "asc" files, are skipped
+    my_names = [entry.name for entry in os.scandir(input_path)
+                if entry.name.endswith(DTM_EXTENSIONS)]
+    my_args = (prop, numeric, value_range, no_data_fraction)
+
+    if workers == 1:
+        my_results = (file_checker(os.path.join(input_path, name), *my_args)
+                      for name in my_names)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        my_results = executor.map(file_checker,
+                                  [os.path.join(input_path, name)
+                                   for name in my_names],
+                                  *[[arg] * len(my_names) for arg in my_args])
 
+    for name, (included, processing_time) in zip(my_names, my_results):
+        if included:
+            print("File {} was INCLUDED".format(name))
+            my_txt.write("{}\n".format(name))
+        print("File {} took {} seconds".format(name, processing_time))
+
+    if workers != 1:
+        executor.shutdown()
     my_txt.close()
 
 
+def file_checker(file_path, prop, numeric=False, value_range=None,
+                 no_data_fraction=None):
+    """Checks if an "asc" file fulfills the property given to "finder".
+
+    Returns
+    -------
+    tuple
+        Whether the property is met and the seconds it took to check it.
+    """
+    start_time = time.time()
+    if numeric or value_range is not None or no_data_fraction is not None:
+        included = array_finder(file_path, None if not numeric else
+                                float(prop), value_range, no_data_fraction)
+    else:
+        included = token_finder(file_path, prop)
+
+    return (included, time.time() - start_time)
+
+
+def token_finder(file_path, token):
+    """Checks if a word appears in an "asc" file.
+
+    The bytes of the file are searched for the word surrounded by spaces
+    or line breaks (so "10" does not match "100" or "10.5"), without
+    splitting the lines. Uncompressed files are mapped into memory and
+    compressed ones are searched by chunks of "CHUNK_BYTES" bytes. The
+    search stops at the first match.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    token : str
+        The word that will be looked for.
+
+    Returns
+    -------
+    bool
+        Whether the word was found.
+    """
+    token = token.encode("ascii")
+    pattern = re.compile(rb"(?<!\S)" + re.escape(token) + rb"(?!\S)")
+
+    if not is_compressed(file_path):
+        if os.stat(file_path)[6] == 0:
+            return False
+        my_dtm = open(file=file_path, mode="rb")
+        my_map = mmap.mmap(my_dtm.fileno(), 0, access=mmap.ACCESS_READ)
+        found = pattern.search(my_map) is not None
+        my_map.close()
+        my_dtm.close()
+        return found
+
+    found = False
+    my_dtm = dtm_open(file_path, mode="rb")
+    tail = b""
+    while not found:
+        chunk = my_dtm.read(CHUNK_BYTES)
+        buffer = tail + chunk
+        for match in pattern.finditer(buffer):
+            # a word at the end of the chunk might go on in the next one
+            if match.end() < len(buffer) or not chunk:
+                found = True
+                break
+        if not chunk:
+            break
+        tail = buffer[-len(token) - 1:]
+    my_dtm.close()
+
+    return found
+
+
+def array_finder(file_path, value=None, value_range=None,
+                 no_data_fraction=None):
+    """Checks the heights of the matrix of data of an "asc" file.
+
+    The matrix of data is parsed into arrays by chunks of rows and every
+    chunk is checked at once. The search stops as soon as the result is
+    known. Only one of the conditions should be given.
+
+    Parameters
+    ----------
+    file_path : str
+        The path of the "asc" file.
+    value : float, optional
+        A height that must appear in the file.
+    value_range : tuple, optional
+        The lowest and highest values (both included) of a height that
+        must appear in the file. Cells without data are not taken into
+        account.
+    no_data_fraction : float, optional
+        The share of cells without data that the file must exceed.
+
+    Returns
+    -------
+    bool
+        Whether the condition is met.
+    """
+    reader = AscReader(file_path, exact=False)
+    chunk_rows = max(1, CHUNK_CELLS // reader.n_cols)
+    n_cells = reader.n_cols * reader.n_rows
+    n_no_data = 0
+    found = False
+    try:
+        for first_row in range(0, reader.n_rows, chunk_rows):
+            block = reader.read_rows(min(chunk_rows,
+                                         reader.n_rows - first_row))
+            if value is not None:
+                found = bool(np.any(block == value))
+            elif value_range is not None:
+                found = bool(np.any((block >= value_range[0])
+                                    & (block <= value_range[1])
+                                    & (block != reader.no_data_val)))
+            else:
+                n_no_data += np.count_nonzero(block == reader.no_data_val)
+                n_left = n_cells - (first_row + block.shape[0]) * reader.n_cols
+                found = n_no_data > no_data_fraction * n_cells
+                # the share can not be exceeded with the cells left
+                if n_no_data + n_left <= no_data_fraction * n_cells:
+                    break
+            if found:
+                break
+    finally:
+        reader.close()
+
+    return found
+
+
 def remover(remove_path, files_to_remove):
     """This function removes directories.
 
@@ -126,7 +297,7 @@ def remover(remove_path, files_to_remove):
         shutil.rmtree(path="{}\\{}".format(remove_path, entry))
 
 
-def features_recorder(input_path, output_path):
+def features_recorder(input_path, output_path, catalog=None):
     """Creates a "txt" file with the main features of each "asc" file.
 
     This function creates a "txt" file with information of every "asc"
@@ -142,18 +313,13 @@ def features_recorder(input_path, output_path):
         The path for the source directory
     output_path : str
         The path where the "txt" file will be stored.
+    catalog : HeaderCatalog instance, optional
+        If given, the headers are taken from the catalog, and only the
+        files that are not there or have changed are opened.
     Returns
     -------
     None
     """
-    my_txt = open(file=os.path.join(output_path, "FILES FEATURES.txt"),
-                  mode="w", encoding="ascii")
-    my_txt.write("{} {} {} {} {} {} {} {}\n".format("MIN_X", "MAX_X", "MIN_Y",
-                                                    "MAX_Y", "PATH",
-                                                    "CELLSIZE", "NROWS",
-                                                    "NCOLS"))
-    my_txt.close()
-
     my_dtms = []
     my_entries = os.scandir(input_path)
     for entry in my_entries:
@@ -161,32 +327,31 @@ def features_recorder(input_path, output_path):
             my_files = os.scandir(entry.path)
             for file in my_files:
                 if file.is_file():
-                    my_dtms.append(file)
+                    my_dtms.append(file.path)
                 else:
                     pass
         else:
             pass
 
-    for dtm in my_dtms:
-        my_dtm = open(file=dtm.path, mode="r")
-        dtm_features = []
-        line_counter = 0
-        for line in my_dtm:
-            if line_counter < 5:
-                dtm_features.append(int(line.split()[1]))
-                line_counter += 1
-            else:
-                break
-        my_dtm.close()
+    # the headers are gathered in a catalog, so the coordinates of all
+    # the files are computed at once
+    my_catalog = catalog_creator("", my_dtms, catalog)
+
+    # the whole file is written at once
+    my_lines = ["{} {} {} {} {} {} {} {}\n".format("MIN_X", "MAX_X", "MIN_Y",
+                                                   "MAX_Y", "PATH",
+                                                   "CELLSIZE", "NROWS",
+                                                   "NCOLS")]
+    for dtm_features in zip(my_catalog.x_coords.tolist(),
+                            my_catalog.max_x().tolist(),
+                            my_catalog.y_coords.tolist(),
+                            my_catalog.max_y().tolist(), my_dtms,
+                            my_catalog.cell_sizes.tolist(),
+                            my_catalog.n_rows.tolist(),
+                            my_catalog.n_cols.tolist()):
+        my_lines.append("{} {} {} {} {} {} {} {}\n".format(*dtm_features))
 
-        my_txt = open(file=os.path.join(output_path, "FILES FEATURES.txt"),
-                      mode="a")
-        my_txt.write("{} {} {} {} {} {} {} {}\n".format(dtm_features[2],
-                     dtm_features[2] + (dtm_features[4]
-                                        * (dtm_features[0] - 1)),
-                     dtm_features[3],
-                     dtm_features[3] + (dtm_features[4]
-                                        * (dtm_features[1] - 1)),
-                     dtm.path,
-                     dtm_features[4], dtm_features[1], dtm_features[0]))
-        my_txt.close()
+    my_txt = open(file=os.path.join(output_path, "FILES FEATURES.txt"),
+                  mode="w", encoding="ascii")
+    my_txt.write("".join(my_lines))
+    my_txt.close()